@@ -36,6 +36,8 @@ MODULE_MAPPINGS = {
     "promptengineeing": "modules.promptengineeing",
     "pythonmenu": "modules.pythonmenu",
     "testingagent": "modules.testingagent",
+    "aiops": "modules.aiops",
+    "jobs": "modules.jobs",
     "project": "modules.project",
     "webdev": "modules.webdev"
 }
@@ -386,11 +388,18 @@ with st.sidebar:
         "✍️ Prompt Engineering": "promptengineeing",
         "🌐 Github Automation": "github_automation",
         "🌐 Web Development": "webdev",
-        "📝 Projects": "project"
+        "📝 Projects": "project",
+        "🧵 Jobs": "jobs"
     }
     
     selected = st.selectbox("Select a Module", list(categories.keys()))
     
+    # Alert rules evaluate in the background; surface firing alerts on every page
+    if "aiops" in loaded_modules:
+        loaded_modules["aiops"].show_firing_banner()
+    if "jobs" in loaded_modules:
+        loaded_modules["jobs"].show_running_banner()
+    
     # Module status in sidebar
     st.markdown("---")
     st.markdown("### 📈 Module Status")
@@ -575,7 +584,7 @@ elif category == "kubernetesmenue":
     run_module_safely("kubernetesmenue")
 elif category == "aiops":
     show_loading()
-    run_module_safely("testingagent")
+    run_module_safely("aiops")
 elif category == "iac":
     show_loading()
     run_module_safely("iac")
@@ -606,6 +615,8 @@ elif category == "webdev":
 elif category == "project":
     show_loading()
     project.run()
+elif category == "jobs":
+    run_module_safely("jobs")
 
 def show_webdev_tools():
     st.header("🌐 Web Development & JavaScript Tools")
@@ -0,0 +1,246 @@
+import streamlit as st
+import time
+import pandas as pd
+from modules import metrics_sampler, metrics_store, anomaly_detector, alert_rules
+
+def run():
+    """Main function to run the AIOps module"""
+
+    st.title("🔁 AIOps - Real-time Analytics")
+    st.markdown("Streaming anomaly detection and alert rules over the metrics collected by the background sampler")
+
+    # Sidebar navigation
+    st.sidebar.title("🔁 AIOps Tools")
+
+    tool_category = st.sidebar.selectbox(
+        "Select Category:",
+        ["🚨 Live Anomalies", "🔔 Alert Rules", "📅 Seasonal Baselines"]
+    )
+
+    detector = anomaly_detector.get_detector(metrics_store.get_store())
+
+    if tool_category == "🚨 Live Anomalies":
+        show_live_anomalies(detector)
+    elif tool_category == "🔔 Alert Rules":
+        show_alert_rules(alert_rules.get_engine())
+    elif tool_category == "📅 Seasonal Baselines":
+        show_seasonal_baselines(detector)
+
+def detection_settings(detector):
+    """This session's display thresholds, starting from the shared detector's"""
+    return st.session_state.setdefault("aiops_settings", {
+        "threshold": float(detector.threshold),
+        "seasonal_threshold": float(detector.seasonal_threshold),
+        "alpha": float(detector.alpha),
+    })
+
+def show_live_anomalies(detector):
+    """Show current anomaly scores and recent anomaly events"""
+    st.header("🚨 Live Anomalies")
+
+    # Settings are per session: they change what this viewer sees, not the shared detector
+    settings = detection_settings(detector)
+    with st.expander("⚙️ Detection Settings"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            settings["threshold"] = st.slider("EWMA z-score threshold", 2.0, 8.0, settings["threshold"], 0.5)
+        with col2:
+            settings["seasonal_threshold"] = st.slider("Seasonal z-score threshold", 1.0, 6.0, settings["seasonal_threshold"], 0.5)
+        with col3:
+            settings["alpha"] = st.slider("Chart smoothing (alpha)", 0.01, 0.5, settings["alpha"], 0.01)
+        threshold, seasonal_threshold, alpha = settings["threshold"], settings["seasonal_threshold"], settings["alpha"]
+        st.caption(f"Anomaly events are recorded by the shared detector at z ≥ {detector.threshold:g} "
+                   f"(seasonal ≥ {detector.seasonal_threshold:g}, alpha {detector.alpha:g}).")
+
+    scores = detector.scores(threshold=threshold, seasonal_threshold=seasonal_threshold)
+    events = detector.events(limit=200)
+    active = scores[scores["anomalous"]]
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Series Tracked", detector.series_count())
+    with col2:
+        st.metric("Active Anomalies", len(active))
+    with col3:
+        st.metric("Events (recent)", len(events))
+    with col4:
+        st.metric("Update Cost", f"{detector.last_update_us:.0f} µs")
+
+    if scores.empty:
+        st.info("Detector is warming up - the first scores appear after a few samples.")
+        return
+
+    if not active.empty:
+        st.error(f"{len(active)} series currently anomalous: {', '.join(active['metric'])}")
+
+    st.subheader("📊 Current Scores")
+    show_all = st.checkbox("Show all series", value=False)
+    table = scores if show_all else scores.head(15)
+    st.dataframe(table.round({"value": 2, "ewma": 2, "std": 3, "z": 2, "seasonal_z": 2}), use_container_width=True, hide_index=True)
+
+    st.subheader("📈 Series Detail")
+    metric = st.selectbox("Metric:", scores["metric"].tolist())
+    sampler = metrics_sampler.get_sampler()
+    history = sampler.frame([metric], seconds=600)
+    if not history.empty:
+        series = history[metric]
+        band = series.ewm(alpha=alpha).mean()
+        spread = series.ewm(alpha=alpha).std().bfill() * threshold
+        st.line_chart(pd.DataFrame({"value": series, "ewma": band, "upper": band + spread, "lower": band - spread}))
+
+    st.subheader("🗒️ Anomaly Events")
+    if events:
+        events_df = pd.DataFrame(events)
+        events_df["ended"] = events_df["ended"].fillna("ongoing")
+        st.dataframe(events_df, use_container_width=True, hide_index=True)
+    else:
+        st.success("No anomalies detected so far.")
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        auto_refresh = st.checkbox("Auto-refresh (2s)")
+    with col2:
+        st.button("🔄 Refresh")
+    if auto_refresh:
+        time.sleep(2)
+        st.rerun()
+
+def format_alert_time(timestamp):
+    return pd.to_datetime(timestamp, unit="s").strftime("%Y-%m-%d %H:%M:%S")
+
+def show_alert_rules(engine):
+    """Manage alert rules and silences and show firing alerts"""
+    st.header("🔔 Alert Rules")
+    st.markdown("Rules run in the background against every sample, whether or not a page is open.")
+
+    active = engine.active_alerts()
+    notifying = [a for a in active if not a["silenced"]]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Rules", len(engine.rules()))
+    with col2:
+        st.metric("Firing", len(notifying))
+    with col3:
+        st.metric("Silenced", len(active) - len(notifying))
+    with col4:
+        st.metric("Eval Cost", f"{engine.last_update_us:.0f} µs")
+
+    st.subheader("🔥 Firing Alerts")
+    if active:
+        active_df = pd.DataFrame(active)
+        active_df["started"] = active_df["started"].map(format_alert_time)
+        st.dataframe(active_df[["rule", "instance", "severity", "value", "started", "silenced"]], use_container_width=True, hide_index=True)
+    else:
+        st.success("No alerts firing.")
+
+    st.subheader("➕ Add Rule")
+    with st.expander("Rule syntax"):
+        st.markdown("""
+        - `<metric> <op> <value>[%|KB|MB|GB][/s] [for <n>s|m|h]` - e.g. `container mem > 90% for 2m`
+        - `<metric> rising|falling` over the last 5 minutes - e.g. `disk free < 10% and falling`
+        - Combine with `and` / `or` (`and` binds tighter)
+        """)
+        st.write("**Metric aliases:**", ", ".join(f"`{k}`" for k in alert_rules.METRIC_ALIASES))
+        st.caption("Any sampled metric name also works, with `*` wildcards (e.g. `container.*.cpu.percent`).")
+    col1, col2, col3 = st.columns([2, 3, 1])
+    with col1:
+        rule_name = st.text_input("Rule name:", placeholder="Container memory high")
+    with col2:
+        rule_expression = st.text_input("Condition:", placeholder="container mem > 90% for 2m")
+    with col3:
+        rule_severity = st.selectbox("Severity:", ["warning", "critical", "info"])
+    if st.button("➕ Add Rule"):
+        if rule_name and rule_expression:
+            try:
+                engine.add_rule(rule_name, rule_expression, rule_severity)
+                if engine.watches_containers():
+                    metrics_sampler.get_container_sampler()
+                st.success(f"Rule '{rule_name}' added")
+            except alert_rules.RuleError as e:
+                st.error(str(e))
+        else:
+            st.warning("Please enter a rule name and condition")
+
+    rules = engine.rules()
+    if rules:
+        st.subheader("📋 Rules")
+        st.dataframe(pd.DataFrame(rules)[["name", "expression", "severity", "compiled"]], use_container_width=True, hide_index=True)
+        rule_to_remove = st.selectbox("Remove rule:", [r["id"] for r in rules],
+                                      format_func=lambda rule_id: next(r["name"] for r in rules if r["id"] == rule_id))
+        if st.button("🗑️ Remove Rule"):
+            engine.remove_rule(rule_to_remove)
+            st.rerun()
+
+    st.subheader("🔕 Silences")
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 2])
+    with col1:
+        silence_rule = st.text_input("Rule name pattern:", value="*")
+    with col2:
+        silence_instance = st.text_input("Instance pattern:", value="*")
+    with col3:
+        silence_minutes = st.number_input("Minutes:", min_value=1, value=60)
+    with col4:
+        silence_comment = st.text_input("Comment:")
+    if st.button("🔕 Add Silence"):
+        engine.add_silence(silence_rule, silence_instance, silence_minutes, silence_comment)
+        st.success("Silence added")
+    silences = engine.silences()
+    if silences:
+        silences_df = pd.DataFrame(silences)
+        silences_df["until"] = silences_df["until"].map(format_alert_time)
+        st.dataframe(silences_df, use_container_width=True, hide_index=True)
+        silence_to_remove = st.selectbox("Remove silence:", [s["id"] for s in silences])
+        if st.button("🗑️ Remove Silence"):
+            engine.remove_silence(silence_to_remove)
+            st.rerun()
+
+    st.subheader("🗒️ Firing History")
+    history = engine.history(limit=500)
+    if history:
+        history_df = pd.DataFrame(history)
+        history_df["at"] = history_df["at"].map(format_alert_time)
+        columns = [c for c in ["at", "state", "rule", "instance", "severity", "value", "duration_s", "silenced"] if c in history_df]
+        st.dataframe(history_df[columns], use_container_width=True, hide_index=True)
+    else:
+        st.info("No alerts have fired yet.")
+
+def show_firing_banner():
+    """Compact sidebar summary of firing alerts, shown on every page"""
+    try:
+        alerts = alert_rules.get_engine().active_alerts(include_silenced=False)
+    except Exception:
+        return
+    if alerts:
+        st.sidebar.error(f"🔔 {len(alerts)} alert(s) firing: " + ", ".join(
+            f"{a['rule']}" + (f" [{a['instance']}]" if a["instance"] else "") for a in alerts[:5]))
+
+def show_seasonal_baselines(detector):
+    """Show the time-of-day baseline learned for a metric"""
+    st.header("📅 Seasonal Baselines")
+    st.markdown("Each metric keeps a mean and deviation per 5-minute slot of the day (UTC), seeded from stored 1-minute rollups.")
+
+    scores = detector.scores()
+    if scores.empty:
+        st.info("Detector is warming up - refresh in a few seconds.")
+        return
+
+    metric = st.selectbox("Metric:", sorted(scores["metric"].tolist()))
+    baseline = detector.seasonal_baseline(metric)
+    if baseline is None:
+        st.info("No baseline for this metric yet.")
+        return
+
+    offsets, mean, std, counts = baseline
+    seasonal_threshold = detection_settings(detector)["seasonal_threshold"]
+    frame = pd.DataFrame({
+        "mean": mean,
+        "upper": mean + seasonal_threshold * std,
+        "lower": mean - seasonal_threshold * std,
+    }, index=pd.to_datetime(offsets, unit="s").strftime("%H:%M"))
+    frame = frame[counts > 0]
+    if frame.empty:
+        st.info("No samples recorded for this metric's time slots yet.")
+    else:
+        st.line_chart(frame)
+        warm = int((counts >= anomaly_detector.SEASONAL_MIN_SAMPLES).sum())
+        st.caption(f"{warm} of {len(counts)} slots have enough samples to gate alerts")
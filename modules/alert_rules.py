@@ -0,0 +1,418 @@
+import os
+import re
+import json
+import time
+import uuid
+import fnmatch
+import operator
+import threading
+from collections import deque
+from modules import app_paths, metrics_sampler
+
+TREND_WINDOW = 300
+HISTORY_SIZE = 1000
+# Series not sampled for this long (several container sampling intervals) are forgotten
+STALE_AFTER = 4 * metrics_sampler.CONTAINER_INTERVAL
+OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "==": operator.eq, "!=": operator.ne}
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+VALUE_UNITS = {"": 1, "%": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+METRIC_ALIASES = {
+    "cpu": "cpu.percent",
+    "mem": "mem.percent",
+    "memory": "mem.percent",
+    "swap": "swap.percent",
+    "disk": "disk.percent",
+    "disk used": "disk.percent",
+    "disk free": "disk.free_percent",
+    "disk read": "disk.read_bytes_per_s",
+    "disk write": "disk.write_bytes_per_s",
+    "net in": "net.recv_bytes_per_s",
+    "net out": "net.sent_bytes_per_s",
+    "container cpu": "container.*.cpu.percent",
+    "container mem": "container.*.mem.percent",
+    "container memory": "container.*.mem.percent",
+}
+_FOR = r"(?:\s+for\s+(?P<for>\d+(?:\.\d+)?)\s*(?P<for_unit>[smhd]))?"
+_THRESHOLD_CLAUSE = re.compile(
+    r"^(?P<metric>[\w.* -]+?)\s*(?P<op>>=|<=|==|!=|>|<)\s*(?P<value>-?\d+(?:\.\d+)?)\s*(?P<unit>%|[KMGT]?B)?(?:/s)?" + _FOR + r"$", re.I)
+_TREND_CLAUSE = re.compile(r"^(?:(?P<metric>[\w.* -]+?)\s+(?:is\s+)?)?(?P<trend>rising|falling)" + _FOR + r"$", re.I)
+
+class RuleError(ValueError):
+    """Raised when a rule expression cannot be compiled"""
+
+def resolve_metric(text):
+    """Map a friendly alias ('disk free') or a metric glob to a metric name pattern"""
+    text = " ".join(text.strip().split())
+    return METRIC_ALIASES.get(text.lower(), text)
+
+class Clause:
+    """One compiled condition over a metric pattern, with O(1) per-series state.
+
+    Clauses are shared between rules with the same condition, so a sample
+    is evaluated once per distinct clause, however many rules use it.
+    """
+
+    def __init__(self, pattern, op=None, threshold=None, trend=None, duration=0.0):
+        self.pattern = pattern
+        self.op = op
+        self.threshold = threshold
+        self.trend = trend
+        self.duration = duration
+        self.wildcard = "*" in pattern
+        self._regex = re.compile(fnmatch.translate(pattern).replace(".*", "(.*)"))
+        self.rules = set()
+        self.truth = {}
+        self.values = {}
+        self._since = {}
+        self._window = {}
+        self._seen = {}
+
+    @property
+    def key(self):
+        return (self.pattern, self.op, self.threshold, self.trend, self.duration)
+
+    def instance_of(self, name):
+        """The wildcard capture of a matching metric name ('' for exact patterns), or None"""
+        match = self._regex.match(name)
+        if match is None:
+            return None
+        return "/".join(match.groups())
+
+    def observe(self, instance, timestamp, value):
+        """Absorb one sample; returns True when the clause's truth for this instance changed"""
+        if self.trend:
+            window = self._window.setdefault(instance, deque())
+            window.append((timestamp, value))
+            while window and window[0][0] < timestamp - TREND_WINDOW:
+                window.popleft()
+            oldest = window[0][1]
+            raw = value < oldest if self.trend == "falling" else value > oldest
+        else:
+            raw = OPERATORS[self.op](value, self.threshold)
+
+        if raw:
+            since = self._since.setdefault(instance, timestamp)
+            truth = timestamp - since >= self.duration
+        else:
+            self._since.pop(instance, None)
+            truth = False
+        self.values[instance] = value
+        self._seen[instance] = timestamp
+        changed = self.truth.get(instance) != truth
+        self.truth[instance] = truth
+        return changed
+
+    def expire(self, cutoff):
+        """Forget instances last seen before cutoff (e.g. removed containers); returns them"""
+        stale = [instance for instance, seen in self._seen.items() if seen < cutoff]
+        for instance in stale:
+            for state in (self.truth, self.values, self._since, self._window, self._seen):
+                state.pop(instance, None)
+        return stale
+
+    def describe(self):
+        text = f"{self.pattern} {self.trend}" if self.trend else f"{self.pattern} {self.op} {self.threshold:g}"
+        return text + (f" for {self.duration:g}s" if self.duration else "")
+
+def _duration(match):
+    if not match.group("for"):
+        return 0.0
+    return float(match.group("for")) * DURATION_UNITS[match.group("for_unit").lower()]
+
+def parse_rule(expression):
+    """Parse a rule expression into OR-groups of AND-ed clause specs.
+
+    Examples: "container mem > 90% for 2m", "disk free < 10% and falling",
+    "cpu > 95 for 5m or mem > 95". A bare "rising"/"falling" clause refers to
+    the metric of the clause before it.
+    """
+    tokens = re.split(r"\s+(and|or)\s+", expression.strip(), flags=re.I)
+    groups, current, previous_metric = [], [], None
+    for i, token in enumerate(tokens):
+        if i % 2:
+            if token.lower() == "or":
+                groups.append(current)
+                current = []
+            continue
+        match = _TREND_CLAUSE.match(token)
+        if match:
+            metric = match.group("metric")
+            if metric is None and previous_metric is None:
+                raise RuleError(f"'{token}' needs a metric, e.g. 'disk free {match.group('trend')}'")
+            pattern = resolve_metric(metric) if metric else previous_metric
+            current.append({"pattern": pattern, "trend": match.group("trend").lower(), "duration": _duration(match)})
+        else:
+            match = _THRESHOLD_CLAUSE.match(token)
+            if not match:
+                raise RuleError(f"Cannot parse condition '{token}' - expected e.g. 'mem > 90% for 2m'")
+            unit = (match.group("unit") or "").upper()
+            pattern = resolve_metric(match.group("metric"))
+            current.append({"pattern": pattern, "op": match.group("op"),
+                            "threshold": float(match.group("value")) * VALUE_UNITS.get(unit, 1),
+                            "duration": _duration(match)})
+        previous_metric = current[-1]["pattern"]
+    groups.append(current)
+    if not all(groups):
+        raise RuleError("Empty condition in rule")
+    return groups
+
+class Rule:
+    """A named rule compiled to OR-groups of shared Clause objects"""
+
+    def __init__(self, rule_id, name, expression, severity, groups):
+        self.id = rule_id
+        self.name = name
+        self.expression = expression
+        self.severity = severity
+        self.groups = groups
+
+    def instances(self):
+        """Instances seen by wildcard clauses, plus '' when any group is host-level"""
+        instances = set()
+        for group in self.groups:
+            wildcards = [clause for clause in group if clause.wildcard]
+            if not wildcards:
+                instances.add("")
+            for clause in wildcards:
+                instances.update(clause.truth)
+        return instances
+
+    def evaluate(self, instance):
+        """(firing, value of the first clause) for one instance"""
+        for group in self.groups:
+            if any(clause.wildcard for clause in group) != (instance != ""):
+                continue
+            if all(clause.truth.get(instance if clause.wildcard else "", False) for clause in group):
+                first = group[0]
+                return True, first.values.get(instance if first.wildcard else "")
+        return False, None
+
+class AlertEngine:
+    """Incremental alert rule evaluation over the sampler's metric stream.
+
+    Each sample is routed by metric name to the clauses that reference it
+    (route lookups are cached per metric name). Only rules whose clause
+    truth changed are re-evaluated, so cost per sample scales with the
+    number of matching clauses, not with rules x history. Alerts are
+    deduplicated per (rule, instance); silences suppress notification but
+    are still recorded in the firing history.
+    """
+
+    def __init__(self, path=None, history_path=None):
+        self.path = path or app_paths.data_path("alert_rules.json")
+        self.history_path = history_path or app_paths.data_path("alert_history.jsonl")
+        self._lock = threading.RLock()
+        self._rules = {}
+        self._clauses = {}
+        self._routes = {}
+        self._silences = []
+        self._active = {}
+        self._history = deque(maxlen=HISTORY_SIZE)
+        self._expired_at = 0.0
+        self.last_update_us = 0.0
+        self._load()
+
+    # ----- persistence -----
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        for rule in data.get("rules", []):
+            try:
+                self.add_rule(rule["name"], rule["expression"], rule.get("severity", "warning"), rule_id=rule["id"], save=False)
+            except (RuleError, KeyError):
+                continue
+        self._silences = [s for s in data.get("silences", []) if s.get("until", 0) > time.time()]
+        try:
+            with open(self.history_path) as f:
+                for line in deque(f, maxlen=HISTORY_SIZE):
+                    try:
+                        self._history.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+
+    def _save(self):
+        data = {
+            "rules": [{"id": r.id, "name": r.name, "expression": r.expression, "severity": r.severity} for r in self._rules.values()],
+            "silences": self._silences,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def _record(self, entry):
+        self._history.append(entry)
+        try:
+            with open(self.history_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
+
+    # ----- rules -----
+    def add_rule(self, name, expression, severity="warning", rule_id=None, save=True):
+        """Compile and register a rule; raises RuleError on a bad expression"""
+        groups = parse_rule(expression)
+        with self._lock:
+            rule_id = rule_id or uuid.uuid4().hex[:8]
+            compiled = []
+            for group in groups:
+                clauses = []
+                for spec in group:
+                    clause = Clause(spec["pattern"], spec.get("op"), spec.get("threshold"), spec.get("trend"), spec["duration"])
+                    clause = self._clauses.setdefault(clause.key, clause)
+                    clause.rules.add(rule_id)
+                    clauses.append(clause)
+                compiled.append(clauses)
+            self._rules[rule_id] = Rule(rule_id, name, expression, severity, compiled)
+            self._routes.clear()
+            if save:
+                self._save()
+        return rule_id
+
+    def remove_rule(self, rule_id):
+        with self._lock:
+            rule = self._rules.pop(rule_id, None)
+            if rule is None:
+                return
+            for group in rule.groups:
+                for clause in group:
+                    clause.rules.discard(rule_id)
+                    if not clause.rules:
+                        self._clauses.pop(clause.key, None)
+            for key in [k for k in self._active if k[0] == rule_id]:
+                self._resolve(key, time.time())
+            self._routes.clear()
+            self._save()
+
+    def rules(self):
+        with self._lock:
+            return [{"id": r.id, "name": r.name, "expression": r.expression, "severity": r.severity,
+                     "compiled": " OR ".join(" AND ".join(c.describe() for c in group) for group in r.groups)}
+                    for r in self._rules.values()]
+
+    def watches_containers(self):
+        """True when any rule references container metrics"""
+        with self._lock:
+            return any(c.pattern.startswith("container.") for c in self._clauses.values())
+
+    # ----- silences -----
+    def add_silence(self, rule_pattern, instance_pattern="*", minutes=60, comment=""):
+        with self._lock:
+            self._silences.append({"id": uuid.uuid4().hex[:8], "rule": rule_pattern or "*", "instance": instance_pattern or "*",
+                                   "until": time.time() + minutes * 60, "comment": comment})
+            self._save()
+
+    def remove_silence(self, silence_id):
+        with self._lock:
+            self._silences = [s for s in self._silences if s["id"] != silence_id]
+            self._save()
+
+    def silences(self):
+        with self._lock:
+            now = time.time()
+            self._silences = [s for s in self._silences if s["until"] > now]
+            return [dict(s) for s in self._silences]
+
+    def _is_silenced(self, rule, instance, now):
+        return any(s["until"] > now and fnmatch.fnmatch(rule.name, s["rule"]) and fnmatch.fnmatch(instance, s["instance"])
+                   for s in self._silences)
+
+    # ----- evaluation -----
+    def _route(self, name):
+        routes = self._routes.get(name)
+        if routes is None:
+            routes = []
+            for clause in self._clauses.values():
+                instance = clause.instance_of(name)
+                if instance is not None:
+                    routes.append((clause, instance))
+            self._routes[name] = routes
+        return routes
+
+    def update(self, timestamp, values):
+        """Sampler listener: feed one sample to matching clauses and re-evaluate affected rules"""
+        started = time.perf_counter()
+        with self._lock:
+            if not self._clauses:
+                return
+            dirty = set()
+            for name, value in values.items():
+                for clause, instance in self._route(name):
+                    if clause.observe(instance, timestamp, value):
+                        dirty.update(clause.rules)
+            for rule_id in dirty:
+                rule = self._rules.get(rule_id)
+                if rule is None:
+                    continue
+                for instance in rule.instances():
+                    firing, value = rule.evaluate(instance)
+                    key = (rule_id, instance)
+                    if firing and key not in self._active:
+                        self._fire(rule, instance, value, timestamp)
+                    elif not firing and key in self._active:
+                        self._resolve(key, timestamp)
+            if timestamp - self._expired_at >= metrics_sampler.CONTAINER_INTERVAL:
+                self._expire(timestamp)
+            self.last_update_us = (time.perf_counter() - started) * 1e6
+
+    def _expire(self, timestamp):
+        """Drop clause state for series that stopped reporting and resolve their alerts"""
+        self._expired_at = timestamp
+        stale = set()
+        for clause in self._clauses.values():
+            for instance in clause.expire(timestamp - STALE_AFTER):
+                stale.update((rule_id, instance) for rule_id in clause.rules)
+        if not stale:
+            return
+        # Cached routes hold the metric names of the vanished series
+        self._routes.clear()
+        for key in [key for key in self._active if key in stale]:
+            rule = self._rules.get(key[0])
+            if rule is None or not rule.evaluate(key[1])[0]:
+                self._resolve(key, timestamp)
+
+    def _fire(self, rule, instance, value, timestamp):
+        alert = {"rule_id": rule.id, "rule": rule.name, "instance": instance, "severity": rule.severity,
+                 "value": value, "started": timestamp, "silenced": self._is_silenced(rule, instance, timestamp)}
+        self._active[(rule.id, instance)] = alert
+        self._record(dict(alert, state="firing", at=timestamp))
+
+    def _resolve(self, key, timestamp):
+        alert = self._active.pop(key)
+        self._record(dict(alert, state="resolved", at=timestamp, duration_s=round(timestamp - alert["started"], 1)))
+
+    def active_alerts(self, include_silenced=True):
+        """Currently firing alerts (one per rule and instance)"""
+        with self._lock:
+            now = time.time()
+            alerts = []
+            for (rule_id, instance), alert in self._active.items():
+                rule = self._rules.get(rule_id)
+                silenced = rule is not None and self._is_silenced(rule, instance, now)
+                if include_silenced or not silenced:
+                    alerts.append(dict(alert, silenced=silenced))
+            return sorted(alerts, key=lambda a: a["started"], reverse=True)
+
+    def history(self, limit=200):
+        """Firing/resolved transitions, newest first"""
+        with self._lock:
+            return list(self._history)[-limit:][::-1]
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the process-wide alert engine, subscribed to the background metrics sampler"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AlertEngine()
+        metrics_sampler.get_sampler().add_listener(_engine.update)
+        if _engine.watches_containers():
+            metrics_sampler.get_container_sampler()
+        return _engine
@@ -0,0 +1,242 @@
+import time
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+from modules import metrics_sampler
+
+EWMA_ALPHA = 0.05
+Z_THRESHOLD = 4.0
+SEASONAL_Z_THRESHOLD = 3.0
+WARMUP_SAMPLES = 60
+SLOT_SECONDS = 300
+SLOTS_PER_DAY = 86400 // SLOT_SECONDS
+SEASONAL_MIN_SAMPLES = 300
+SEASONAL_MIN_ALPHA = 0.001
+# Expected range of ~60 normal samples in standard deviations (d2 for n=60), used to
+# recover within-minute spread from a 1-minute rollup's min/max
+ROLLUP_RANGE_TO_STD = 4.64
+MAX_EVENTS = 1000
+# Cumulative counters and constants carry no signal for a mean/variance baseline
+EXCLUDED_METRICS = {"net.bytes_sent", "net.bytes_recv", "mem.total_bytes", "swap.total_bytes", "disk.total_bytes"}
+
+class AnomalyDetector:
+    """Streaming anomaly detection over many metric series at once.
+
+    Each series keeps an EWMA mean/variance and a seasonal baseline of
+    time-of-day slots. The state lives in NumPy arrays indexed by series slot, so
+    one sample of every series is a handful of vectorized operations: O(1) per
+    point with no per-series history. A point is anomalous when its EWMA
+    z-score crosses the threshold and, once the seasonal slot has enough
+    samples, the seasonal z-score agrees. This suppresses expected daily peaks.
+    """
+
+    def __init__(self, alpha=EWMA_ALPHA, threshold=Z_THRESHOLD, seasonal_threshold=SEASONAL_Z_THRESHOLD,
+                 warmup=WARMUP_SAMPLES, capacity=64):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.seasonal_threshold = seasonal_threshold
+        self.warmup = warmup
+        self._lock = threading.Lock()
+        self._index = {}
+        self._names = []
+        self._allocate(capacity)
+        self._events = deque(maxlen=MAX_EVENTS)
+        self._open_events = {}
+        self.last_update_at = None
+        self.last_update_us = 0.0
+
+    def _allocate(self, capacity):
+        """Create or grow the per-series state arrays, keeping existing rows"""
+        def grow(attr, fill, shape, dtype=np.float64):
+            new = np.full(shape, fill, dtype=dtype)
+            old = getattr(self, attr, None)
+            if old is not None:
+                new[:len(old)] = old
+            setattr(self, attr, new)
+        grow("_mean", 0.0, capacity)
+        grow("_var", 0.0, capacity)
+        grow("_count", 0.0, capacity)
+        grow("_last", np.nan, capacity)
+        grow("_z", 0.0, capacity)
+        grow("_seasonal_z", np.nan, capacity)
+        grow("_active", False, capacity, dtype=bool)
+        grow("_slot_mean", 0.0, (capacity, SLOTS_PER_DAY))
+        grow("_slot_var", 0.0, (capacity, SLOTS_PER_DAY))
+        grow("_slot_count", 0.0, (capacity, SLOTS_PER_DAY))
+        self._capacity = capacity
+
+    def _slots_for(self, names):
+        slots = []
+        for name in names:
+            slot = self._index.get(name)
+            if slot is None:
+                slot = len(self._names)
+                if slot >= self._capacity:
+                    self._allocate(self._capacity * 2)
+                self._index[name] = slot
+                self._names.append(name)
+            slots.append(slot)
+        return np.asarray(slots, dtype=np.intp)
+
+    def update(self, timestamp, values):
+        """Sampler listener: score and absorb one sample of every series"""
+        started = time.perf_counter()
+        names = [name for name in values if name not in EXCLUDED_METRICS]
+        if not names:
+            return
+        x = np.fromiter((values[name] for name in names), dtype=np.float64, count=len(names))
+        with self._lock:
+            idx = self._slots_for(names)
+            slot = int(timestamp % 86400) // SLOT_SECONDS
+
+            mean, var, count = self._mean[idx], self._var[idx], self._count[idx]
+            # Floor the deviation so flat series do not produce infinite scores
+            std = np.sqrt(var) + 1e-3 * np.abs(mean) + 1e-9
+            z = np.where(count >= self.warmup, (x - mean) / std, 0.0)
+
+            s_mean, s_var, s_count = self._slot_mean[idx, slot], self._slot_var[idx, slot], self._slot_count[idx, slot]
+            s_std = np.sqrt(s_var) + 1e-3 * np.abs(s_mean) + 1e-9
+            seasonal_warm = s_count >= SEASONAL_MIN_SAMPLES
+            seasonal_z = np.where(seasonal_warm, (x - s_mean) / s_std, np.nan)
+
+            active = (np.abs(z) >= self.threshold) & (~seasonal_warm | (np.abs(seasonal_z) >= self.seasonal_threshold))
+
+            # Exponentially weighted mean/variance (running average until warm)
+            alpha = np.maximum(self.alpha, 1.0 / (count + 1))
+            diff = x - mean
+            incr = alpha * diff
+            self._mean[idx] = mean + incr
+            self._var[idx] = (1 - alpha) * (var + diff * incr)
+            self._count[idx] = count + 1
+
+            s_alpha = np.maximum(SEASONAL_MIN_ALPHA, 1.0 / (s_count + 1))
+            s_diff = x - s_mean
+            s_incr = s_alpha * s_diff
+            self._slot_mean[idx, slot] = s_mean + s_incr
+            self._slot_var[idx, slot] = (1 - s_alpha) * (s_var + s_diff * s_incr)
+            self._slot_count[idx, slot] = s_count + 1
+
+            self._last[idx] = x
+            self._z[idx] = z
+            self._seasonal_z[idx] = seasonal_z
+            self._track_events(timestamp, names, idx, x, mean, s_mean, seasonal_warm, z, seasonal_z, active)
+            self._active[idx] = active
+            self.last_update_at = timestamp
+            self.last_update_us = (time.perf_counter() - started) * 1e6
+
+    def _track_events(self, timestamp, names, idx, x, mean, s_mean, seasonal_warm, z, seasonal_z, active):
+        """Open an event when a series turns anomalous, update its peak, close it on recovery"""
+        was_active = self._active[idx]
+        for i in np.flatnonzero(active | was_active):
+            name = names[i]
+            if active[i] and not was_active[i]:
+                event = {
+                    "started": pd.to_datetime(timestamp, unit="s"),
+                    "ended": None,
+                    "metric": name,
+                    "value": float(x[i]),
+                    "expected": float(s_mean[i] if seasonal_warm[i] else mean[i]),
+                    "z": round(float(z[i]), 2),
+                    "seasonal_z": None if np.isnan(seasonal_z[i]) else round(float(seasonal_z[i]), 2),
+                }
+                self._events.append(event)
+                self._open_events[name] = event
+            elif active[i]:
+                event = self._open_events.get(name)
+                if event is not None and abs(z[i]) > abs(event["z"]):
+                    event.update(value=float(x[i]), z=round(float(z[i]), 2))
+            else:
+                event = self._open_events.pop(name, None)
+                if event is not None:
+                    event["ended"] = pd.to_datetime(timestamp, unit="s")
+
+    def warm_from_store(self, store, days=7):
+        """Seed seasonal baselines from stored 1-minute rollups so they are useful immediately.
+
+        The variance of 1-minute averages understates the spread of the
+        individual samples the detector scores, so each slot's variance is
+        the variance of the averages plus the mean within-minute variance,
+        estimated from each rollup's min/max range.
+        """
+        start = time.time() - days * 86400
+        for name in list(metrics_sampler.get_sampler().names()):
+            if name in EXCLUDED_METRICS:
+                continue
+            timestamps, values = store.query(name, start, tier="1m")
+            if len(timestamps) == 0:
+                continue
+            _, lows = store.query(name, start, tier="1m", column="min")
+            _, highs = store.query(name, start, tier="1m", column="max")
+            within = ((highs - lows) / ROLLUP_RANGE_TO_STD) ** 2 if len(lows) == len(highs) == len(values) else np.zeros(len(values))
+            slots = (timestamps.astype(np.int64) % 86400) // SLOT_SECONDS
+            counts = np.bincount(slots, minlength=SLOTS_PER_DAY).astype(np.float64)
+            sums = np.bincount(slots, weights=values, minlength=SLOTS_PER_DAY)
+            squares = np.bincount(slots, weights=values * values, minlength=SLOTS_PER_DAY)
+            within_sums = np.bincount(slots, weights=within, minlength=SLOTS_PER_DAY)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = np.where(counts > 0, sums / counts, 0.0)
+                variances = np.where(counts > 0, np.maximum(squares / counts - means * means, 0.0) + within_sums / counts, 0.0)
+            with self._lock:
+                row = self._slots_for([name])[0]
+                self._slot_mean[row] = means
+                self._slot_var[row] = variances
+                # Each rollup point summarises a minute of samples
+                self._slot_count[row] = np.minimum(counts * 60, 1.0 / SEASONAL_MIN_ALPHA)
+
+    def scores(self, threshold=None, seasonal_threshold=None):
+        """Current state of every series as a DataFrame, most anomalous first.
+
+        Passing thresholds re-evaluates the anomalous flag for a viewer
+        without changing the thresholds the detector itself runs with.
+        """
+        with self._lock:
+            n = len(self._names)
+            z, seasonal_z, active = self._z[:n].copy(), self._seasonal_z[:n].copy(), self._active[:n].copy()
+            frame = pd.DataFrame({
+                "metric": self._names,
+                "value": self._last[:n],
+                "ewma": self._mean[:n],
+                "std": np.sqrt(self._var[:n]),
+                "z": z,
+                "seasonal_z": seasonal_z,
+                "anomalous": active,
+                "samples": self._count[:n].astype(np.int64),
+            })
+        if threshold is not None or seasonal_threshold is not None:
+            threshold = self.threshold if threshold is None else threshold
+            seasonal_threshold = self.seasonal_threshold if seasonal_threshold is None else seasonal_threshold
+            frame["anomalous"] = (np.abs(z) >= threshold) & (np.isnan(seasonal_z) | (np.abs(seasonal_z) >= seasonal_threshold))
+        return frame.reindex(frame["z"].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+    def seasonal_baseline(self, name):
+        """(slot start seconds-of-day, mean, std) for one series"""
+        with self._lock:
+            row = self._index.get(name)
+            if row is None:
+                return None
+            return (np.arange(SLOTS_PER_DAY) * SLOT_SECONDS, self._slot_mean[row].copy(),
+                    np.sqrt(self._slot_var[row]), self._slot_count[row].copy())
+
+    def events(self, limit=100):
+        """Most recent anomaly events, newest first"""
+        with self._lock:
+            return [dict(e) for e in list(self._events)[-limit:]][::-1]
+
+    def series_count(self):
+        with self._lock:
+            return len(self._names)
+
+_detector = None
+_detector_lock = threading.Lock()
+
+def get_detector(store=None):
+    """Return the process-wide detector, subscribed to the background metrics sampler"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = AnomalyDetector()
+            if store is not None:
+                _detector.warm_from_store(store)
+        metrics_sampler.get_sampler().add_listener(_detector.update)
+        return _detector
@@ -0,0 +1,10 @@
+import os
+
+# Local state (caches, indexes, job queue) lives outside the repo; override with DEVOPS_DASHBOARD_HOME
+DATA_DIR = os.environ.get("DEVOPS_DASHBOARD_HOME", os.path.expanduser("~/.devops_dashboard"))
+
+def data_path(*parts):
+    """Return a path under the dashboard data directory, creating parent directories"""
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,183 @@
+import os
+import json
+import zlib
+import time
+import threading
+from modules import app_paths
+
+MAX_OUTPUT_BYTES = 1024 * 1024
+MAX_DATA_BYTES = 64 * 1024 * 1024
+MAX_ENTRIES = 10_000
+COMMAND_CHARS = 300
+
+class CommandHistory:
+    """Append-only command history with compressed outputs and a summary index.
+
+    Each entry's output is zlib-compressed and appended to a data file. A
+    separate JSON-lines index holds one small summary per entry (command,
+    timestamp, status, source, duration, output size) plus the byte range of
+    its output. Only the index is kept in memory, so listing and filtering
+    never touch outputs; a full output is read and decompressed only when it
+    is opened. When the data file grows past MAX_DATA_BYTES, or the index
+    past MAX_ENTRIES (many small outputs, e.g. a per-minute schedule), the
+    oldest half is dropped by rewriting both files.
+    """
+
+    def __init__(self, directory=None, max_data_bytes=MAX_DATA_BYTES, max_entries=MAX_ENTRIES):
+        directory = directory or os.path.dirname(app_paths.data_path("command_history", "history.idx"))
+        os.makedirs(directory, exist_ok=True)
+        self.data_path = os.path.join(directory, "history.data")
+        self.index_path = os.path.join(directory, "history.idx")
+        self.max_data_bytes = max_data_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = []
+        self._load()
+        if len(self._entries) > self.max_entries:
+            self._compact()
+
+    def _load(self):
+        try:
+            data_size = os.path.getsize(self.data_path)
+        except OSError:
+            data_size = 0
+        entries = []
+        try:
+            with open(self.index_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn trailing line from an interrupted write
+                        continue
+                    if entry["offset"] + entry["length"] <= data_size:
+                        entries.append(entry)
+        except OSError:
+            pass
+        self._entries = entries
+
+    def append(self, command, success, output, source="manual", exit_code=None, duration_s=None, timestamp=None):
+        """Store one command run and return its entry id"""
+        raw = (output or "").encode("utf-8", errors="replace")
+        truncated = len(raw) > MAX_OUTPUT_BYTES
+        if truncated:
+            raw = raw[-MAX_OUTPUT_BYTES:]
+        blob = zlib.compress(raw, 6)
+        with self._lock:
+            with open(self.data_path, "ab") as f:
+                offset = f.tell()
+                f.write(blob)
+            entry = {
+                "id": self._entries[-1]["id"] + 1 if self._entries else 1,
+                "timestamp": timestamp or time.time(),
+                "command": command[:COMMAND_CHARS],
+                "success": bool(success),
+                "exit_code": exit_code,
+                "source": source,
+                "duration_s": duration_s,
+                "output_bytes": len(raw),
+                "truncated": truncated,
+                "offset": offset,
+                "length": len(blob),
+            }
+            # Data is written before its index line, so a crash never indexes missing bytes
+            with open(self.index_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._entries.append(entry)
+            if offset + len(blob) > self.max_data_bytes or len(self._entries) > self.max_entries:
+                self._compact()
+            return entry["id"]
+
+    def _compact(self):
+        """Keep the newest entries that fit in half the data and entry budgets"""
+        keep, total = [], 0
+        for entry in reversed(self._entries):
+            if total + entry["length"] > self.max_data_bytes // 2 or len(keep) >= self.max_entries // 2:
+                break
+            keep.append(entry)
+            total += entry["length"]
+        keep.reverse()
+        with open(self.data_path, "rb") as src, open(self.data_path + ".tmp", "wb") as dst:
+            for entry in keep:
+                src.seek(entry["offset"])
+                blob = src.read(entry["length"])
+                entry["offset"] = dst.tell()
+                dst.write(blob)
+        with open(self.index_path + ".tmp", "w") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in keep)
+        os.replace(self.data_path + ".tmp", self.data_path)
+        os.replace(self.index_path + ".tmp", self.index_path)
+        self._entries = keep
+
+    def summaries(self, page=0, page_size=20, query="", status=None, source=None):
+        """(rows, total) for a 0-based page of matching entries, newest first.
+
+        A page past the end is clamped to the last page, so one call gives
+        both the rows and the count needed to page through them.
+        """
+        query = query.lower()
+        with self._lock:
+            entries = self._entries
+            if query or status is not None or source:
+                entries = [e for e in entries
+                           if (not query or query in e["command"].lower())
+                           and (status is None or e["success"] == status)
+                           and (not source or e["source"] == source)]
+            total = len(entries)
+            if page_size:
+                page = min(page, max(0, (total - 1) // page_size))
+            end = total - page * page_size
+            rows = entries[max(0, end - page_size):max(0, end)][::-1]
+        return [{k: v for k, v in entry.items() if k not in ("offset", "length")} for entry in rows], total
+
+    def output(self, entry_id):
+        """Full (decompressed) output of one entry, or None if it is gone"""
+        with self._lock:
+            entry = self._find(entry_id)
+            if entry is None:
+                return None
+            with open(self.data_path, "rb") as f:
+                f.seek(entry["offset"])
+                blob = f.read(entry["length"])
+        text = zlib.decompress(blob).decode("utf-8", errors="replace")
+        return ("… (earlier output truncated)\n" + text) if entry["truncated"] else text
+
+    def _find(self, entry_id):
+        # Ids increase monotonically, so the index is sorted by id
+        lo, hi = 0, len(self._entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entries[mid]["id"] < entry_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self._entries[lo] if lo < len(self._entries) and self._entries[lo]["id"] == entry_id else None
+
+    def stats(self):
+        with self._lock:
+            try:
+                size = os.path.getsize(self.data_path)
+            except OSError:
+                size = 0
+            return {"entries": len(self._entries), "data_bytes": size,
+                    "output_bytes": sum(e["output_bytes"] for e in self._entries)}
+
+    def clear(self):
+        with self._lock:
+            for path in (self.data_path, self.index_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._entries = []
+
+_history = None
+_history_lock = threading.Lock()
+
+def get_history():
+    """Process-wide command history shared by every session"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = CommandHistory()
+        return _history
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timedelta
+from modules import app_paths, job_queue, command_history
+
+DEFAULT_TIMEOUT = 300
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+MONTH_NAMES = {name: i + 1 for i, name in enumerate(["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+class CronError(ValueError):
+    """Raised for an invalid cron expression"""
+
+def _parse_field(text, low, high, names=None):
+    values = set()
+    for part in text.lower().split(","):
+        part, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if step < 1:
+            raise CronError(f"Invalid step in '{text}'")
+        if part in ("*", ""):
+            start, end = low, high
+        else:
+            first, _, last = part.partition("-")
+            start = _parse_value(first, names)
+            end = _parse_value(last, names) if last else (high if step > 1 else start)
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise CronError(f"'{text}' is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+def _parse_value(text, names):
+    if names and text in names:
+        return names[text]
+    try:
+        return int(text)
+    except ValueError:
+        raise CronError(f"Invalid value '{text}'")
+
+class CronExpression:
+    """Standard 5-field cron expression (minute hour day-of-month month day-of-week).
+
+    Supports *, lists, ranges, steps, month/day names and @hourly-style
+    aliases. As in cron, when both day fields are restricted a time matches
+    if either one does.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        fields = CRON_ALIASES.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise CronError("Cron expressions need 5 fields: minute hour day-of-month month day-of-week")
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12, MONTH_NAMES)
+        # 7 is an alias for Sunday
+        weekdays = _parse_field(fields[4], 0, 7, DAY_NAMES)
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, dt):
+        weekday = (dt.weekday() + 1) % 7
+        if self._any_day or self._any_weekday:
+            return dt.day in self.days and weekday in self.weekdays
+        return dt.day in self.days or weekday in self.weekdays
+
+    def matches(self, dt):
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.month in self.months and self._day_matches(dt))
+
+    def next_after(self, dt):
+        """First matching minute strictly after dt (searches up to ~5 years)"""
+        dt = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            # Skip whole months, days and hours that cannot match
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        return None
+
+class CommandScheduler:
+    """Runs recurring (cron) and one-off scheduled commands in the background.
+
+    Schedules persist in command_schedules.json. A thread wakes at each
+    minute boundary and submits due commands to the job queue, so runs show
+    up on the Jobs page and can be cancelled there. Every run is recorded in
+    the command history. Times use the server's local clock; missed runs
+    while the dashboard is down are not replayed, except one-off commands,
+    which run once when the dashboard comes back.
+    """
+
+    def __init__(self, path=None, history=None):
+        self.path = path or app_paths.data_path("command_schedules.json")
+        self.history = history or command_history.get_history()
+        self._lock = threading.RLock()
+        self._schedules = {}
+        self._crons = {}
+        self._load()
+        self._thread = threading.Thread(target=self._loop, name="command-scheduler", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        for schedule in data.get("schedules", []):
+            try:
+                if schedule.get("cron"):
+                    self._crons[schedule["id"]] = CronExpression(schedule["cron"])
+                self._schedules[schedule["id"]] = schedule
+            except (CronError, KeyError):
+                continue
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"schedules": list(self._schedules.values())}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    # ----- schedules -----
+    def add(self, name, command, cron=None, run_at=None, timeout=DEFAULT_TIMEOUT):
+        """Add a recurring (cron) or one-off (run_at datetime) schedule; raises CronError/ValueError"""
+        if bool(cron) == bool(run_at):
+            raise ValueError("Give either a cron expression or a run time")
+        schedule_id = uuid.uuid4().hex[:8]
+        with self._lock:
+            if cron:
+                self._crons[schedule_id] = CronExpression(cron)
+            self._schedules[schedule_id] = {
+                "id": schedule_id, "name": name, "command": command, "cron": cron or None,
+                "run_at": run_at.timestamp() if run_at else None, "timeout": timeout, "enabled": True,
+                "last_run": None, "last_success": None, "last_job": None, "runs": 0,
+            }
+            self._save()
+        return schedule_id
+
+    def remove(self, schedule_id):
+        with self._lock:
+            self._schedules.pop(schedule_id, None)
+            self._crons.pop(schedule_id, None)
+            self._save()
+
+    def set_enabled(self, schedule_id, enabled):
+        with self._lock:
+            if schedule_id in self._schedules:
+                self._schedules[schedule_id]["enabled"] = bool(enabled)
+                self._save()
+
+    def next_run(self, schedule, now=None):
+        if not schedule["enabled"]:
+            return None
+        if schedule["cron"]:
+            return self._crons[schedule["id"]].next_after(now or datetime.now())
+        return datetime.fromtimestamp(schedule["run_at"])
+
+    def schedules(self):
+        with self._lock:
+            rows = [dict(s) for s in self._schedules.values()]
+        now = datetime.now()
+        for row in rows:
+            row["next_run"] = self.next_run(row, now)
+        return sorted(rows, key=lambda row: (row["next_run"] is None, row["next_run"] or now))
+
+    def run_now(self, schedule_id):
+        with self._lock:
+            schedule = self._schedules.get(schedule_id)
+        return self._submit(schedule) if schedule else None
+
+    # ----- execution -----
+    def _loop(self):
+        while True:
+            now = time.time()
+            # Wake just after the next minute boundary
+            time.sleep(60 - now % 60 + 0.05)
+            try:
+                self.tick(datetime.now().replace(second=0, microsecond=0))
+            except Exception:
+                pass
+
+    def tick(self, minute):
+        """Submit every schedule due at this minute"""
+        due = []
+        with self._lock:
+            for schedule in self._schedules.values():
+                if not schedule["enabled"]:
+                    continue
+                if schedule["cron"]:
+                    if self._crons[schedule["id"]].matches(minute):
+                        due.append(schedule)
+                elif schedule["run_at"] <= minute.timestamp() + 59:
+                    # One-off: run once, then disable
+                    schedule["enabled"] = False
+                    due.append(schedule)
+        for schedule in due:
+            self._submit(schedule)
+
+    def _submit(self, schedule):
+        job_id = job_queue.get_queue().submit(
+            f"⏰ {schedule['name']}", self._run, schedule["id"], schedule["command"], schedule["timeout"],
+            module="command_hub")
+        with self._lock:
+            schedule["last_job"] = job_id
+            self._save()
+        return job_id
+
+    def _run(self, job, schedule_id, command, timeout):
+        job.progress(0.0, command)
+        started = time.monotonic()
+        success, exit_code, error = False, None, None
+        try:
+            exit_code = job.run_command(command, timeout=timeout)
+            success = exit_code == 0
+        except TimeoutError as e:
+            error = str(e)
+        except job_queue.JobCancelled:
+            error = "Cancelled"
+            raise
+        finally:
+            duration = round(time.monotonic() - started, 2)
+            output = job.output(command_history.MAX_OUTPUT_BYTES) + (f"\n{error}" if error else "")
+            self.history.append(command, success, output, source="schedule", exit_code=exit_code, duration_s=duration)
+            with self._lock:
+                schedule = self._schedules.get(schedule_id)
+                if schedule:
+                    schedule.update(last_run=time.time(), last_success=success, runs=schedule["runs"] + 1)
+                    self._save()
+        if not success:
+            raise RuntimeError(error or f"Exited with code {exit_code}")
+        return {"exit_code": exit_code, "duration_s": duration}
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Process-wide scheduler; started on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = CommandScheduler()
+        return _scheduler
@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import difflib
+import threading
+from modules import app_paths
+
+DEFAULT_ROOTS = [
+    "/usr/share/applications",
+    "/usr/share/icons",
+    "/usr/share/pixmaps",
+    "~/.local/share/applications",
+    "~/.local/share/icons",
+]
+ICON_EXTENSIONS = (".png", ".svg", ".svgz", ".xpm", ".ico")
+INDEX_VERSION = 1
+
+def trigrams(text):
+    """Set of 3-character substrings of a lowercased name"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def parse_desktop_file(path):
+    """Read Name, Icon and Exec from the [Desktop Entry] section of a .desktop file"""
+    fields = {}
+    in_entry = False
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    in_entry = line == "[Desktop Entry]"
+                    continue
+                if in_entry and "=" in line:
+                    key, value = line.split("=", 1)
+                    key = key.strip()
+                    if key in ("Name", "Icon", "Exec", "Comment", "Categories") and key not in fields:
+                        fields[key] = value.strip()
+    except OSError:
+        pass
+    return fields
+
+class DesktopIndex:
+    """Persistent filename index over application and icon directories.
+
+    Directory listings are stored with their mtime; a refresh re-lists only
+    directories whose mtime changed, so the cost is one stat per directory
+    rather than a full os.walk. Queries go through an in-memory trigram index.
+    """
+
+    def __init__(self, path=None, roots=None):
+        self.path = path or app_paths.data_path("desktop_index.json")
+        self.roots = [os.path.expanduser(r) for r in (roots or DEFAULT_ROOTS)]
+        self.dirs = {}
+        self.desktop = {}
+        self.updated = None
+        self._lock = threading.Lock()
+        self._files = []
+        self._postings = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("roots") != self.roots:
+            return
+        self.dirs = data["dirs"]
+        self.desktop = data["desktop"]
+        self.updated = data.get("updated")
+        self._build_postings()
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": INDEX_VERSION, "roots": self.roots, "updated": self.updated,
+                       "dirs": self.dirs, "desktop": self.desktop}, f)
+        os.replace(tmp, self.path)
+
+    def refresh(self):
+        """Incrementally sync the index with disk; returns (directories rescanned, elapsed seconds)"""
+        started = time.perf_counter()
+        with self._lock:
+            seen = set()
+            rescanned = 0
+            stack = [root for root in self.roots if os.path.isdir(root)]
+            while stack:
+                directory = stack.pop()
+                if directory in seen:
+                    continue
+                seen.add(directory)
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    continue
+                entry = self.dirs.get(directory)
+                if entry is None or entry["mtime"] != mtime:
+                    files, subdirs = [], []
+                    try:
+                        with os.scandir(directory) as it:
+                            for item in it:
+                                try:
+                                    if item.is_dir(follow_symlinks=False):
+                                        subdirs.append(item.name)
+                                    elif item.is_file():
+                                        files.append(item.name)
+                                except OSError:
+                                    continue
+                    except OSError:
+                        continue
+                    entry = self.dirs[directory] = {"mtime": mtime, "files": files, "subdirs": subdirs}
+                    rescanned += 1
+                stack.extend(os.path.join(directory, name) for name in entry["subdirs"])
+
+            for directory in [d for d in self.dirs if d not in seen]:
+                del self.dirs[directory]
+
+            self._refresh_desktop_entries()
+            self.updated = time.time()
+            self._build_postings()
+            self._save()
+        return rescanned, time.perf_counter() - started
+
+    def _refresh_desktop_entries(self):
+        """Re-parse .desktop files that are new or modified since the last refresh"""
+        current = {}
+        for directory, entry in self.dirs.items():
+            for name in entry["files"]:
+                if not name.endswith(".desktop"):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                cached = self.desktop.get(path)
+                if cached and cached.get("mtime") == mtime:
+                    current[path] = cached
+                else:
+                    fields = parse_desktop_file(path)
+                    fields["mtime"] = mtime
+                    current[path] = fields
+        self.desktop = current
+
+    def _build_postings(self):
+        files = []
+        postings = {}
+        for directory, entry in self.dirs.items():
+            for name in entry["files"]:
+                file_id = len(files)
+                files.append((name, directory))
+                for gram in trigrams(name):
+                    postings.setdefault(gram, []).append(file_id)
+        self._files = files
+        self._postings = postings
+
+    def file_count(self):
+        """Number of indexed files"""
+        return len(self._files)
+
+    def _candidates(self, query):
+        grams = trigrams(query)
+        if not grams:
+            return range(len(self._files))
+        lists = sorted((self._postings.get(g, []) for g in grams), key=len)
+        result = set(lists[0])
+        for posting in lists[1:]:
+            result.intersection_update(posting)
+            if not result:
+                break
+        return result
+
+    def _fuzzy_candidates(self, query, limit):
+        scores = {}
+        for gram in trigrams(query):
+            for file_id in self._postings.get(gram, []):
+                scores[file_id] = scores.get(file_id, 0) + 1
+        best = sorted(scores, key=scores.get, reverse=True)[:limit * 20]
+        query = query.lower()
+        ranked = sorted(best, key=lambda i: difflib.SequenceMatcher(None, query, os.path.splitext(self._files[i][0])[0].lower()).ratio(), reverse=True)
+        return ranked[:limit]
+
+    def search(self, query, kind="all", fuzzy=False, limit=200):
+        """Find files by substring (or fuzzy) match on the file name.
+
+        kind is 'desktop', 'icon' or 'all'. Desktop results include the
+        parsed Name, Icon and Exec fields.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        needle = query.lower()
+        if fuzzy:
+            ids = self._fuzzy_candidates(needle, limit * 5)
+        else:
+            ids = sorted(i for i in self._candidates(needle) if needle in self._files[i][0].lower())
+        results = []
+        for file_id in ids:
+            name, directory = self._files[file_id]
+            is_desktop = name.endswith(".desktop")
+            is_icon = name.lower().endswith(ICON_EXTENSIONS)
+            if (kind == "desktop" and not is_desktop) or (kind == "icon" and not is_icon):
+                continue
+            path = os.path.join(directory, name)
+            row = {"path": path, "file": name}
+            if is_desktop:
+                fields = self.desktop.get(path, {})
+                row.update({"Name": fields.get("Name", ""), "Icon": fields.get("Icon", ""), "Exec": fields.get("Exec", "")})
+            results.append(row)
+            if len(results) >= limit:
+                break
+        return results
+
+    def resolve_icon(self, icon_name, limit=20):
+        """Icon files whose stem matches a .desktop Icon= value (absolute paths are returned as-is)"""
+        if not icon_name:
+            return []
+        if os.path.isabs(icon_name):
+            return [icon_name] if os.path.exists(icon_name) else []
+        matches = []
+        for file_id in self._candidates(icon_name.lower()):
+            name, directory = self._files[file_id]
+            stem, ext = os.path.splitext(name)
+            if stem == icon_name and ext.lower() in ICON_EXTENSIONS:
+                matches.append(os.path.join(directory, name))
+        return sorted(matches)[:limit]
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index(max_age=300):
+    """Process-wide index; refreshed incrementally when older than max_age seconds"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DesktopIndex()
+    if _index.updated is None or time.time() - _index.updated > max_age:
+        _index.refresh()
+    return _index
@@ -0,0 +1,221 @@
+import os
+import time
+import heapq
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+from modules import app_paths
+
+DEFAULT_WORKERS = 16
+TOP_FILES_PER_DIR = 5
+CACHE_VERSION = 3
+
+def _usage(stat):
+    """Allocated bytes like du (st_blocks), falling back to apparent size"""
+    blocks = getattr(stat, "st_blocks", None)
+    return blocks * 512 if blocks is not None else stat.st_size
+
+class DiskUsageScanner:
+    """du-style analyzer that scans directories in parallel and caches listings.
+
+    Each directory's own file total, file count, largest files and subdirectory
+    names are cached by (st_dev, st_ino) together with its mtime. A rescan
+    stats every directory but re-lists only those whose mtime changed.
+    Creating, deleting or renaming entries bumps the parent's mtime, so
+    re-analyzing after a cleanup only lists the directories that were touched.
+    Files that grow in place do not change the directory mtime; use a full
+    rescan to pick those up.
+    """
+
+    def __init__(self, cache_path=None, workers=DEFAULT_WORKERS):
+        self.cache_path = cache_path or app_paths.data_path("du_cache.pickle")
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._cache = data["dirs"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+            self._cache = {}
+
+    def _save(self):
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "dirs": self._cache}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.cache_path)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache = {}
+            self._save()
+
+    def _scan_one(self, path, root_dev, use_cache):
+        """Stat one directory and list it unless the cached listing is still valid"""
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return path, None, False
+        if root_dev is not None and st.st_dev != root_dev:
+            return path, None, False
+        key = (st.st_dev, st.st_ino)
+        cached = self._cache.get(key) if use_cache else None
+        if cached is not None and cached["mtime"] == st.st_mtime_ns:
+            return path, cached, False
+
+        files_size, file_count, largest, subdirs, links = _usage(st), 0, [], [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                            continue
+                        file_stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    size = _usage(file_stat)
+                    file_count += 1
+                    if file_stat.st_nlink > 1:
+                        # Hard links are counted once per (device, inode) when totals are computed
+                        links.append(((file_stat.st_dev, file_stat.st_ino), size))
+                    else:
+                        files_size += size
+                    if len(largest) < TOP_FILES_PER_DIR:
+                        heapq.heappush(largest, (size, entry.name))
+                    elif size > largest[0][0]:
+                        heapq.heapreplace(largest, (size, entry.name))
+        except OSError:
+            pass
+        entry = {"mtime": st.st_mtime_ns, "files_size": files_size, "file_count": file_count,
+                 "largest": sorted(largest, reverse=True), "subdirs": subdirs, "links": links}
+        with self._lock:
+            self._cache[key] = entry
+        return path, entry, True
+
+    def scan(self, root, use_cache=True, one_file_system=True, on_progress=None):
+        """Scan a tree and return a DiskUsageResult.
+
+        on_progress(directories_done, directories_listed) is called
+        periodically from the calling thread.
+        """
+        started = time.perf_counter()
+        root = os.path.abspath(os.path.expanduser(root))
+        root_dev = os.stat(root).st_dev if one_file_system else None
+        entries = {}
+        listed = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._scan_one, root, root_dev, use_cache)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, entry, was_listed = future.result()
+                    if entry is None:
+                        continue
+                    entries[path] = entry
+                    listed += was_listed
+                    for name in entry["subdirs"]:
+                        pending.add(pool.submit(self._scan_one, os.path.join(path, name), root_dev, use_cache))
+                if on_progress and len(entries) % 500 < len(done):
+                    on_progress(len(entries), listed)
+        with self._lock:
+            self._save()
+        return DiskUsageResult(root, entries, listed, time.perf_counter() - started)
+
+class DiskUsageResult:
+    """Subtree totals computed bottom-up from per-directory scan entries"""
+
+    def __init__(self, root, entries, listed, elapsed):
+        self.root = root
+        self.listed = listed
+        self.elapsed = elapsed
+        rows = []
+        seen_links = set()
+        for path in sorted(entries):
+            entry = entries[path]
+            own_size = entry["files_size"]
+            for file_id, size in entry["links"]:
+                if file_id not in seen_links:
+                    seen_links.add(file_id)
+                    own_size += size
+            parent = os.path.dirname(path) if path != self.root else ""
+            rows.append((path, parent, os.path.basename(path) or path, own_size, entry["file_count"]))
+        frame = pd.DataFrame(rows, columns=["path", "parent", "name", "own_size", "files"])
+        frame["depth"] = [0 if path == self.root else os.path.relpath(path, self.root).count(os.sep) + 1
+                          for path in frame["path"]]
+        frame["size"] = frame["own_size"]
+        frame["total_files"] = frame["files"]
+        # Deepest first, so each directory's total is final before it is added to its parent
+        frame = frame.sort_values("depth", ascending=False).set_index("path")
+        size, files = frame["size"].to_dict(), frame["total_files"].to_dict()
+        for path, parent in zip(frame.index, frame["parent"]):
+            if parent in size:
+                size[parent] += size[path]
+                files[parent] += files[path]
+        frame["size"] = pd.Series(size)
+        frame["total_files"] = pd.Series(files)
+        self.dirs = frame.reset_index()
+        self._largest = [(size, os.path.join(path, name)) for path, entry in entries.items() for size, name in entry["largest"]]
+        self._entries = entries
+
+    @property
+    def total_size(self):
+        row = self.dirs[self.dirs["path"] == self.root]
+        return int(row["size"].iloc[0]) if not row.empty else 0
+
+    def largest_dirs(self, n=20, min_depth=1):
+        return self.dirs[self.dirs["depth"] >= min_depth].nlargest(n, "size")[["path", "size", "total_files", "depth"]]
+
+    def largest_files(self, n=20):
+        return pd.DataFrame(heapq.nlargest(n, self._largest), columns=["size", "path"])
+
+    def treemap_frame(self, max_depth=3, top_children=12, include_files=True):
+        """ids/parents/values rows for a plotly treemap (branchvalues='total').
+
+        Each shown directory keeps its largest subdirectories and files; the
+        remainder is folded into one '(other)' node so totals still add up.
+        """
+        children = {}
+        for row in self.dirs.itertuples(index=False):
+            children.setdefault(row.parent, []).append((row.size, row.path, row.name))
+        rows = []
+        stack = [(self.root, "", 0)]
+        sizes = dict(zip(self.dirs["path"], self.dirs["size"]))
+        while stack:
+            path, parent, depth = stack.pop()
+            size = int(sizes[path])
+            rows.append({"id": path, "parent": parent, "label": os.path.basename(path) or path, "size": size, "kind": "dir"})
+            if depth >= max_depth:
+                continue
+            shown = 0
+            candidates = [(s, p, "dir") for s, p, _ in children.get(path, [])]
+            if include_files:
+                candidates += [(s, os.path.join(path, n), "file") for s, n in self._entries[path]["largest"]]
+            for child_size, child_path, kind in heapq.nlargest(top_children, candidates):
+                # Hard-linked files may be charged to another directory; never exceed the parent total
+                if child_size <= 0 or shown + child_size > size:
+                    continue
+                shown += child_size
+                if kind == "dir":
+                    stack.append((child_path, path, depth + 1))
+                else:
+                    rows.append({"id": child_path, "parent": path, "label": os.path.basename(child_path), "size": int(child_size), "kind": "file"})
+            if size - shown > 0 and shown:
+                rows.append({"id": path + os.sep + "(other)", "parent": path, "label": "(other)", "size": size - shown, "kind": "other"})
+        return pd.DataFrame(rows)
+
+_scanner = None
+_scanner_lock = threading.Lock()
+
+def get_scanner():
+    """Process-wide scanner so the directory cache survives reruns"""
+    global _scanner
+    with _scanner_lock:
+        if _scanner is None:
+            _scanner = DiskUsageScanner()
+        return _scanner
@@ -6,6 +6,7 @@ import json
 import time
 import requests
 import os
+from modules import job_queue, jobs, output_viewer
 
 def run_docker_command(command: str) -> tuple[bool, str]:
     """Execute Docker command and return success status and output"""
@@ -17,6 +18,14 @@ def run_docker_command(command: str) -> tuple[bool, str]:
     except Exception as e:
         return False, str(e)
 
+def capture_docker_output(key: str, args: List[str], language: Optional[str] = None, timeout: int = 30) -> bool:
+    """Run a docker command with its output spooled to disk and register it with the shared output viewer"""
+    success, path = output_viewer.spool_command(["docker"] + args, timeout=timeout)
+    if not success:
+        st.error("❌ Command failed - see the output below")
+    output_viewer.capture(key, path=path, title="$ docker " + " ".join(args), language=language)
+    return success
+
 def get_containers() -> List[Dict[str, Any]]:
     """Get list of Docker containers"""
     try:
@@ -531,16 +540,12 @@ def show_logs_monitoring():
             follow_logs = st.checkbox("Follow logs (real-time)")
         
         if st.button("📜 Show Logs"):
-            command = f"docker logs --tail {tail_lines}"
+            args = ["logs", "--tail", str(tail_lines)]
             if follow_logs:
-                command += " -f"
-            command += f" {selected_container}"
-            
-            success, output = run_docker_command(command)
-            if success:
-                st.text(output)
-            else:
-                st.error(f"❌ Error: {output}")
+                args.append("-f")
+            args.append(selected_container)
+            capture_docker_output("docker_logs", args)
+        output_viewer.show("docker_logs")
     else:
         st.info("No containers found")
     
@@ -560,15 +565,8 @@ def show_logs_monitoring():
         inspect_container = st.selectbox("Select Container to Inspect:", container_names, key="inspect_container")
         
         if st.button("🔍 Inspect Container"):
-            success, output = run_docker_command(f"docker inspect {inspect_container}")
-            if success:
-                try:
-                    container_info = json.loads(output)
-                    st.json(container_info)
-                except:
-                    st.text(output)
-            else:
-                st.error(f"❌ Error: {output}")
+            capture_docker_output("docker_inspect_container", ["inspect", inspect_container], language="json")
+        output_viewer.show("docker_inspect_container")
 
 def show_image_management():
     """Show comprehensive image management page"""
@@ -620,15 +618,18 @@ def show_image_management():
     
     if st.button("🔨 Build Image"):
         if build_tag:
-            command = f"docker build -t {build_tag} {dockerfile_path if dockerfile_path else '.'}"
-            success, output = run_docker_command(command)
-            if success:
-                st.success("✅ Image built successfully!")
-            else:
-                st.error(f"❌ Error: {output}")
+            # Builds take minutes; run them in the background job pool instead of the page thread
+            command = ["docker", "build", "-t", build_tag, dockerfile_path if dockerfile_path else "."]
+            st.session_state.docker_build_job = job_queue.get_queue().submit_command(
+                f"docker build {build_tag}", command, module="dockermenu")
         else:
             st.warning("⚠️ Please enter an image tag")
     
+    if st.session_state.get("docker_build_job"):
+        build_job = jobs.show_job_progress(st.session_state.docker_build_job)
+        if build_job and build_job["status"] == "succeeded":
+            st.success("✅ Image built successfully!")
+    
     # Image list with detailed info
     st.subheader("📋 Image List")
     images = get_images()
@@ -645,15 +646,8 @@ def show_image_management():
         inspect_image = st.selectbox("Select Image to Inspect:", image_names, key="inspect_image")
         
         if st.button("🔍 Inspect Image"):
-            success, output = run_docker_command(f"docker inspect {inspect_image}")
-            if success:
-                try:
-                    image_info = json.loads(output)
-                    st.json(image_info)
-                except:
-                    st.text(output)
-            else:
-                st.error(f"❌ Error: {output}")
+            capture_docker_output("docker_inspect_image", ["inspect", inspect_image], language="json")
+        output_viewer.show("docker_inspect_image")
 
 def run():
     """Main function to run the Docker menu module (for app.py compatibility)"""
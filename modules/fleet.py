@@ -0,0 +1,216 @@
+import os
+import time
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import yaml
+from modules import app_paths
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_PARALLEL = 64
+CONTROL_PERSIST = 600
+DEFAULT_INVENTORY = """# Fleet inventory. transport: ssh (default) or local (runs on this host; useful for testing)
+hosts:
+  - name: localhost
+    transport: local
+    groups: [local]
+#  - name: web-01
+#    host: 10.0.0.11
+#    user: deploy
+#    port: 22
+#    identity_file: ~/.ssh/id_ed25519
+#    groups: [web, prod]
+"""
+# One round trip per host: key=value lines parsed into table columns
+SYSTEM_PROBE = r"""
+echo "hostname=$(hostname)"
+echo "kernel=$(uname -r)"
+echo "cpus=$(nproc 2>/dev/null || getconf _NPROCESSORS_ONLN)"
+read l1 l5 l15 rest < /proc/loadavg && echo "load1=$l1" && echo "load5=$l5"
+awk '/MemTotal/{t=$2} /MemAvailable/{a=$2} END{if (t) printf "mem_percent=%.1f\n", (t-a)*100/t}' /proc/meminfo
+df -P / | awk 'NR==2{gsub("%","",$5); print "disk_percent=" $5}'
+echo "uptime_h=$(awk '{printf "%.1f", $1/3600}' /proc/uptime)"
+echo "processes=$(ls -d /proc/[0-9]* 2>/dev/null | wc -l)"
+"""
+
+def inventory_path():
+    return app_paths.data_path("fleet_inventory.yaml")
+
+def load_inventory_text():
+    try:
+        with open(inventory_path()) as f:
+            return f.read()
+    except OSError:
+        return DEFAULT_INVENTORY
+
+def parse_inventory(text):
+    """Validate inventory YAML and return a list of host dicts; raises ValueError"""
+    try:
+        data = yaml.safe_load(text) or {}
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML: {e}")
+    hosts = data.get("hosts") if isinstance(data, dict) else None
+    if not isinstance(hosts, list):
+        raise ValueError("Inventory needs a top-level 'hosts' list")
+    parsed, names = [], set()
+    for i, entry in enumerate(hosts):
+        if not isinstance(entry, dict) or not entry.get("name"):
+            raise ValueError(f"Host #{i + 1} needs a 'name'")
+        if entry["name"] in names:
+            raise ValueError(f"Duplicate host name '{entry['name']}'")
+        names.add(entry["name"])
+        transport = entry.get("transport", "ssh")
+        if transport not in ("ssh", "local"):
+            raise ValueError(f"{entry['name']}: transport must be 'ssh' or 'local'")
+        parsed.append({
+            "name": str(entry["name"]),
+            "host": str(entry.get("host", entry["name"])),
+            "user": entry.get("user"),
+            "port": int(entry.get("port", 22)),
+            "identity_file": entry.get("identity_file"),
+            "transport": transport,
+            "groups": list(entry.get("groups", [])),
+        })
+    return parsed
+
+def save_inventory_text(text):
+    """Validate and persist inventory YAML"""
+    parse_inventory(text)
+    with open(inventory_path(), "w") as f:
+        f.write(text)
+
+def load_inventory():
+    return parse_inventory(load_inventory_text())
+
+def select_hosts(hosts, groups=None, names=None):
+    """Hosts in any of the given groups and/or with the given names (all when neither is set)"""
+    if not groups and not names:
+        return list(hosts)
+    groups, names = set(groups or []), set(names or [])
+    return [h for h in hosts if h["name"] in names or groups.intersection(h["groups"])]
+
+class LocalTransport:
+    """Runs commands on this host; the loopback stand-in for tests and single-node setups"""
+
+    def run(self, host, command, timeout):
+        return subprocess.run(["sh", "-c", command], capture_output=True, text=True, timeout=timeout)
+
+    def close(self, host):
+        pass
+
+class SSHTransport:
+    """OpenSSH with ControlMaster multiplexing.
+
+    The first command to a host starts a persistent master connection
+    (ControlPersist); later commands open channels over it, so there is no
+    TCP or auth handshake per command. Masters are shared by every session in
+    the process and time out after CONTROL_PERSIST idle seconds.
+    """
+
+    def __init__(self, control_dir=None, extra_options=None):
+        # Unix socket paths are limited to ~104 bytes, so keep the control dir short
+        self.control_dir = control_dir or os.path.join(tempfile.gettempdir(), f"ddash-ssh-{os.getuid()}")
+        os.makedirs(self.control_dir, mode=0o700, exist_ok=True)
+        self.extra_options = extra_options or []
+
+    def _base(self, host, connect_timeout):
+        args = ["ssh", "-o", "BatchMode=yes", "-o", "ControlMaster=auto",
+                "-o", f"ControlPath={self.control_dir}/%C", "-o", f"ControlPersist={CONTROL_PERSIST}",
+                "-o", f"ConnectTimeout={max(1, int(connect_timeout))}", "-o", "StrictHostKeyChecking=accept-new",
+                "-p", str(host["port"])]
+        if host.get("identity_file"):
+            args += ["-i", os.path.expanduser(host["identity_file"])]
+        args += self.extra_options
+        args.append(f"{host['user']}@{host['host']}" if host.get("user") else host["host"])
+        return args
+
+    def run(self, host, command, timeout):
+        return subprocess.run(self._base(host, min(timeout, 10)) + ["--", command],
+                              capture_output=True, text=True, timeout=timeout, stdin=subprocess.DEVNULL)
+
+    def is_connected(self, host):
+        result = subprocess.run(self._base(host, 5) + ["-O", "check"], capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        return result.returncode == 0
+
+    def close(self, host):
+        subprocess.run(self._base(host, 5) + ["-O", "exit"], capture_output=True, text=True, stdin=subprocess.DEVNULL)
+
+class FleetExecutor:
+    """Runs one command across many hosts concurrently with per-host timeouts"""
+
+    def __init__(self, max_parallel=DEFAULT_PARALLEL):
+        self.max_parallel = max_parallel
+        self.transports = {"ssh": SSHTransport(), "local": LocalTransport()}
+
+    def run_on_host(self, host, command, timeout=DEFAULT_TIMEOUT):
+        started = time.monotonic()
+        row = {"host": host["name"], "success": False, "exit_code": None, "stdout": "", "stderr": ""}
+        try:
+            result = self.transports[host["transport"]].run(host, command, timeout)
+            row.update(success=result.returncode == 0, exit_code=result.returncode,
+                       stdout=result.stdout, stderr=result.stderr)
+            if host["transport"] == "ssh" and result.returncode == 255:
+                row["stderr"] = result.stderr.strip() or "SSH connection failed"
+        except subprocess.TimeoutExpired:
+            row["stderr"] = f"Timed out after {timeout}s"
+        except Exception as e:
+            row["stderr"] = str(e)
+        row["duration_s"] = round(time.monotonic() - started, 2)
+        return row
+
+    def run(self, hosts, command, timeout=DEFAULT_TIMEOUT, on_result=None, max_parallel=None):
+        """Run on every host; on_result(row, done, total) is called as each host finishes.
+
+        max_parallel overrides the executor's concurrency for this run only.
+        Returns rows in completion order.
+        """
+        rows = []
+        if not hosts:
+            return rows
+        workers = max(1, int(max_parallel or self.max_parallel))
+        with ThreadPoolExecutor(max_workers=min(workers, len(hosts))) as pool:
+            futures = [pool.submit(self.run_on_host, host, command, timeout) for host in hosts]
+            for future in as_completed(futures):
+                row = future.result()
+                rows.append(row)
+                if on_result:
+                    on_result(row, len(rows), len(hosts))
+        return rows
+
+    def probe(self, hosts, timeout=DEFAULT_TIMEOUT, on_result=None, max_parallel=None):
+        """Run the system probe and parse its key=value output into columns"""
+        def parse(row, done, total):
+            if row["success"]:
+                for line in row["stdout"].splitlines():
+                    key, sep, value = line.partition("=")
+                    if sep:
+                        row[key.strip()] = _number(value.strip())
+            if on_result:
+                on_result(row, done, total)
+        return self.run(hosts, SYSTEM_PROBE, timeout, on_result=parse, max_parallel=max_parallel)
+
+    def close(self, hosts):
+        """Tear down persistent SSH masters"""
+        for host in hosts:
+            try:
+                self.transports[host["transport"]].close(host)
+            except Exception:
+                pass
+
+def _number(text):
+    try:
+        return float(text) if "." in text else int(text)
+    except ValueError:
+        return text
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Process-wide executor so SSH masters are reused across reruns and sessions"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = FleetExecutor()
+        return _executor
@@ -10,6 +10,14 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.tools import Tool
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain_google_genai import ChatGoogleGenerativeAI
+from modules import job_queue, jobs
+
+def run_agent_job(job, agent_executor, user_input):
+    """Background job for one agent turn; returns the agent's reply"""
+    job.progress(0.1, "🤖 Agent is thinking...")
+    result = agent_executor.invoke({"input": user_input})
+    job.log(result['output'])
+    return result['output']
 
 def run():
     # Configure Streamlit page
@@ -335,63 +343,43 @@ Question: {input}
                             else:
                                 st.text(step)
     
+    # Pending agent turn
+    if st.session_state.get("agent_job"):
+        pending_input = st.session_state.agent_job_input
+        with st.chat_message("user"):
+            st.write(pending_input)
+        with st.chat_message("assistant"):
+            agent_job = jobs.show_job_progress(st.session_state.agent_job)
+        if agent_job is None or agent_job["status"] in job_queue.FINISHED_STATES:
+            if agent_job and agent_job["status"] == "succeeded":
+                output = job_queue.get_queue().result(agent_job["id"])
+                # For now, we'll create a simplified thinking display
+                # In a full implementation, you'd capture the actual agent steps
+                thinking_steps = [
+                    f"Thought: I need to process the command: {pending_input}",
+                    f"Action: Executing appropriate GitHub automation tools",
+                    f"Observation: {output}"
+                ]
+                st.session_state.chat_history.append((pending_input, output, thinking_steps))
+            else:
+                error = agent_job["error"] if agent_job and agent_job["error"] else (agent_job or {}).get("status", "job lost")
+                st.session_state.chat_history.append((pending_input, f"❌ Error: {error}", []))
+            st.session_state.agent_job = None
+            st.rerun()
+    
     # Chat input
-    user_input = st.chat_input("Enter your command (e.g., 'process folder /path/to/my/project')")
+    user_input = st.chat_input("Enter your command (e.g., 'process folder /path/to/my/project')",
+                               disabled=bool(st.session_state.get("agent_job")))
     
     if user_input:
         if not st.session_state.agent_executor:
             st.error("❌ Please initialize the agent first using the sidebar")
         else:
-            # Add user message to chat
-            with st.chat_message("user"):
-                st.write(user_input)
-            
-            # Process with agent
-            with st.chat_message("assistant"):
-                with st.spinner("🤖 Agent is thinking..."):
-                    try:
-                        # Capture agent's thinking process
-                        thinking_steps = []
-                        
-                        # Execute agent
-                        result = st.session_state.agent_executor.invoke({"input": user_input})
-                        
-                        # Display result
-                        st.write(result['output'])
-                        
-                        # For now, we'll create a simplified thinking display
-                        # In a full implementation, you'd capture the actual agent steps
-                        thinking_steps = [
-                            f"Thought: I need to process the command: {user_input}",
-                            f"Action: Executing appropriate GitHub automation tools",
-                            f"Observation: {result['output']}"
-                        ]
-                        
-                        # Show thinking process
-                        with st.expander("🧠 Agent Thinking", expanded=False):
-                            for step in thinking_steps:
-                                if "Thought:" in step:
-                                    st.info(f"💭 {step}")
-                                elif "Action:" in step:
-                                    st.warning(f"⚡ {step}")
-                                elif "Observation:" in step:
-                                    st.success(f"👀 {step}")
-                        
-                        # Add to chat history
-                        st.session_state.chat_history.append((
-                            user_input, 
-                            result['output'], 
-                            thinking_steps
-                        ))
-                        
-                    except Exception as e:
-                        error_msg = f"❌ Error: {str(e)}"
-                        st.error(error_msg)
-                        st.session_state.chat_history.append((
-                            user_input, 
-                            error_msg, 
-                            []
-                        ))
+            # Agent turns clone, commit and push repositories; run them as a background job
+            st.session_state.agent_job = job_queue.get_queue().submit(
+                f"GitHub agent: {user_input[:60]}", run_agent_job,
+                st.session_state.agent_executor, user_input, module="github_automation")
+            st.session_state.agent_job_input = user_input
             
             st.rerun()
     
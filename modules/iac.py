@@ -7,6 +7,7 @@ from pathlib import Path
 import google.generativeai as genai
 from datetime import datetime
 import json
+from modules import job_queue, jobs
 
 def run():
     # Custom CSS for better styling
@@ -108,32 +109,35 @@ def run():
             }}
             """
             
-            try:
-                response = self.model.generate_content(prompt)
-                # Try to extract JSON from the response
-                response_text = response.text
-                
-                # Find JSON content in the response
-                start_idx = response_text.find('{')
-                end_idx = response_text.rfind('}') + 1
-                
-                if start_idx != -1 and end_idx != -1:
-                    json_content = response_text[start_idx:end_idx]
-                    return json.loads(json_content)
-                else:
-                    # If JSON parsing fails, create a structured response
-                    return {
-                        "main.tf": response_text,
-                        "variables.tf": "# Variables will be defined here",
-                        "outputs.tf": "# Outputs will be defined here",
-                        "terraform.tfvars.example": "# Example variables",
-                        "providers.tf": f"# Provider configuration for {provider}",
-                        "versions.tf": "# Version constraints",
-                        "README.md": f"# {provider} Infrastructure\n\nGenerated Terraform code for your application."
-                    }
-            except Exception as e:
-                st.error(f"Error generating Terraform code: {str(e)}")
-                return None
+            # Runs as a background job: errors propagate and are recorded on the job
+            response = self.model.generate_content(prompt)
+            # Try to extract JSON from the response
+            response_text = response.text
+            
+            # Find JSON content in the response
+            start_idx = response_text.find('{')
+            end_idx = response_text.rfind('}') + 1
+            
+            if start_idx != -1 and end_idx != -1:
+                json_content = response_text[start_idx:end_idx]
+                return json.loads(json_content)
+            else:
+                # If JSON parsing fails, create a structured response
+                return {
+                    "main.tf": response_text,
+                    "variables.tf": "# Variables will be defined here",
+                    "outputs.tf": "# Outputs will be defined here",
+                    "terraform.tfvars.example": "# Example variables",
+                    "providers.tf": f"# Provider configuration for {provider}",
+                    "versions.tf": "# Version constraints",
+                    "README.md": f"# {provider} Infrastructure\n\nGenerated Terraform code for your application."
+                }
+
+    def generate_terraform_job(job, api_key, provider, app_requirements, credentials):
+        """Background job wrapping TerraformGenerator so the page is not blocked on Gemini"""
+        job.progress(0.1, "Generating Terraform code with Gemini Flash...")
+        files_content = TerraformGenerator(api_key).generate_terraform_code(provider, app_requirements, credentials)
+        return {"files": files_content, "project_name": credentials["project_name"], "provider": provider}
 
     def create_project_structure(files_content, project_name, provider):
         """Create project directory structure and files"""
@@ -268,38 +272,40 @@ def run():
                 st.error("Please provide application requirements")
                 return
             
-            with st.spinner("Generating Terraform code with Gemini Flash..."):
-                # Initialize generator
-                generator = TerraformGenerator(api_key)
+            # Prepare credentials dict
+            credentials = {
+                "provider": provider,
+                "project_name": project_name,
+                "app_type": app_type
+            }
+            
+            st.session_state.iac_generation_job = job_queue.get_queue().submit(
+                f"Terraform for {project_name} ({provider})",
+                generate_terraform_job,
+                api_key,
+                provider,
+                f"Application Type: {app_type}\n\nRequirements:\n{app_requirements}",
+                credentials,
+                module="iac"
+            )
+        
+        if st.session_state.get("iac_generation_job"):
+            generation_job = jobs.show_job_progress(st.session_state.iac_generation_job)
+            generated = job_queue.get_queue().result(generation_job["id"]) if generation_job and generation_job["status"] == "succeeded" else None
+            if generated:
+                st.success("✅ Terraform code generated successfully!")
                 
-                # Prepare credentials dict
-                credentials = {
-                    "provider": provider,
-                    "project_name": project_name,
-                    "app_type": app_type
-                }
+                # Store in session state for download
+                st.session_state.generated_files = generated["files"]
+                st.session_state.project_name = generated["project_name"]
+                st.session_state.provider = generated["provider"]
                 
-                # Generate Terraform code
-                files_content = generator.generate_terraform_code(
-                    provider, 
-                    f"Application Type: {app_type}\n\nRequirements:\n{app_requirements}",
-                    credentials
-                )
+                # Display generated files
+                st.subheader("📄 Generated Files")
                 
-                if files_content:
-                    st.success("✅ Terraform code generated successfully!")
-                    
-                    # Store in session state for download
-                    st.session_state.generated_files = files_content
-                    st.session_state.project_name = project_name
-                    st.session_state.provider = provider
-                    
-                    # Display generated files
-                    st.subheader("📄 Generated Files")
-                    
-                    for filename, content in files_content.items():
-                        with st.expander(f"📄 {filename}"):
-                            st.code(content, language='hcl' if filename.endswith('.tf') else 'text')
+                for filename, content in generated["files"].items():
+                    with st.expander(f"📄 {filename}"):
+                        st.code(content, language='hcl' if filename.endswith('.tf') else 'text')
     
     with col2:
         st.header("📥 Download & Deploy")
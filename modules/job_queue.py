@@ -0,0 +1,379 @@
+import os
+import json
+import time
+import uuid
+import queue
+import signal
+import sqlite3
+import threading
+import subprocess
+from collections import OrderedDict
+from modules import app_paths
+
+DEFAULT_WORKERS = 4
+MAX_FINISHED_JOBS = 500
+MAX_LIVE_RESULTS = 32
+OUTPUT_TAIL_BYTES = 64 * 1024
+FINISHED_STATES = ("succeeded", "failed", "cancelled", "interrupted")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    module TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    command TEXT,
+    cwd TEXT,
+    timeout REAL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    error TEXT,
+    exit_code INTEGER,
+    result TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created);
+"""
+
+class JobCancelled(Exception):
+    """Raised inside a job function when the job has been cancelled"""
+
+class JobFailed(Exception):
+    """Raised by a job function to fail the job while still keeping a result"""
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+class JobContext:
+    """Handle passed to job functions for reporting progress and output"""
+
+    def __init__(self, queue_, job_id):
+        self._queue = queue_
+        self.id = job_id
+        self._cancel = threading.Event()
+        self._process = None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, fraction, message=None):
+        """Report completion in [0, 1] with an optional status message"""
+        self.check_cancelled()
+        self._queue._update(self.id, progress=max(0.0, min(1.0, float(fraction))),
+                            **({"message": message} if message is not None else {}))
+
+    def log(self, text):
+        """Append text to the job's captured output"""
+        self._queue._append_output(self.id, text if text.endswith("\n") else text + "\n")
+
+    def output(self, tail_bytes=OUTPUT_TAIL_BYTES):
+        """The captured output so far"""
+        return self._queue.output(self.id, tail_bytes)
+
+    def run_command(self, command, cwd=None, timeout=None, env=None):
+        """Run a command, streaming stdout/stderr into the job output.
+
+        `command` is a string (run by the shell) or an argument list. Returns
+        the exit code; cancellation kills the whole process group.
+        """
+        self.check_cancelled()
+        started = time.monotonic()
+        process = subprocess.Popen(command, shell=isinstance(command, str), cwd=cwd, env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                   text=True, errors="replace", bufsize=1, start_new_session=True)
+        self._process = process
+        timer = None
+        if timeout:
+            timer = threading.Timer(timeout, self._kill, args=(process,))
+            timer.daemon = True
+            timer.start()
+        try:
+            with open(self._queue._output_path(self.id), "a", encoding="utf-8", errors="replace") as output:
+                for line in process.stdout:
+                    output.write(line)
+                    output.flush()
+            process.wait()
+        finally:
+            if timer:
+                timer.cancel()
+            self._process = None
+        self.check_cancelled()
+        if timeout and process.returncode < 0 and time.monotonic() - started >= timeout:
+            raise TimeoutError(f"Timed out after {timeout}s")
+        return process.returncode
+
+    def _kill(self, process=None):
+        process = process or self._process
+        if process is not None and process.poll() is None:
+            try:
+                os.killpg(process.pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+class JobQueue:
+    """Process-wide worker pool with a SQLite-backed job table.
+
+    Every job gets an id, a status (queued, running, succeeded, failed,
+    cancelled, interrupted), a progress fraction and message, and a captured
+    output file under the data directory. Shell-command jobs are stored with
+    their command line, so ones still queued when the process stops are
+    picked up again on restart. Python-function jobs cannot be resumed and
+    are marked interrupted instead. Function return values are saved to
+    the table as JSON where possible; the live objects of the most recent
+    MAX_LIVE_RESULTS are also kept in memory for the pages that submitted
+    them.
+    """
+
+    def __init__(self, db_path=None, workers=DEFAULT_WORKERS):
+        self.db_path = db_path or app_paths.data_path("jobs.sqlite")
+        self.output_dir = os.path.join(os.path.dirname(self.db_path), "job_output")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._pending = queue.Queue()
+        self._functions = {}
+        self._contexts = {}
+        self._results = OrderedDict()
+        self._recover()
+        self._purge()
+        self._threads = [threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    # ----- persistence -----
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def _recover(self):
+        """Re-queue command jobs left queued by a previous process; fail the rest"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE jobs SET status = 'interrupted', finished = ?, error = 'Dashboard restarted before the job finished' "
+                             "WHERE status = 'running' OR (status = 'queued' AND kind != 'command')", (now,))
+            self._db.commit()
+            queued = [row["id"] for row in self._db.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created")]
+        for job_id in queued:
+            self._pending.put(job_id)
+
+    def _purge(self):
+        """Drop the oldest finished jobs beyond MAX_FINISHED_JOBS along with their output and results"""
+        with self._lock:
+            old = [row["id"] for row in self._db.execute(
+                f"SELECT id FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATES))}) ORDER BY created DESC LIMIT -1 OFFSET ?",
+                (*FINISHED_STATES, MAX_FINISHED_JOBS))]
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in old])
+            self._db.commit()
+            for job_id in old:
+                self._results.pop(job_id, None)
+        for job_id in old:
+            try:
+                os.remove(self._output_path(job_id))
+            except OSError:
+                pass
+
+    def _output_path(self, job_id):
+        return os.path.join(self.output_dir, f"{job_id}.log")
+
+    def _keep_result(self, job_id, result):
+        with self._lock:
+            self._results[job_id] = result
+            while len(self._results) > MAX_LIVE_RESULTS:
+                self._results.popitem(last=False)
+
+    def _append_output(self, job_id, text):
+        with open(self._output_path(job_id), "a", encoding="utf-8", errors="replace") as f:
+            f.write(text)
+
+    # ----- submission -----
+    def _insert(self, title, module, kind, command=None, cwd=None, timeout=None):
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._db.execute("INSERT INTO jobs (id, title, module, kind, command, cwd, timeout, status, created) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, 'queued', ?)",
+                             (job_id, title, module, kind, json.dumps(command) if command is not None else None,
+                              cwd, timeout, time.time()))
+            self._db.commit()
+        return job_id
+
+    def submit(self, title, fn, *args, module="general", **kwargs):
+        """Queue fn(job, *args, **kwargs) and return the job id.
+
+        The function receives a JobContext for progress, output and
+        cancellation checks. Its return value becomes the job result.
+        """
+        job_id = self._insert(title, module, "function")
+        self._functions[job_id] = (fn, args, kwargs)
+        self._pending.put(job_id)
+        return job_id
+
+    def submit_command(self, title, command, module="general", cwd=None, timeout=None):
+        """Queue a shell command (string) or argument list and return the job id"""
+        job_id = self._insert(title, module, "command", command, cwd, timeout)
+        self._pending.put(job_id)
+        return job_id
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns False if it already finished"""
+        with self._lock:
+            row = self._db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row["status"] in FINISHED_STATES:
+                return False
+            if row["status"] == "queued":
+                self._db.execute("UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ?", (time.time(), job_id))
+                self._db.commit()
+                self._functions.pop(job_id, None)
+                return True
+            context = self._contexts.get(job_id)
+        if context is not None:
+            context._cancel.set()
+            context._kill()
+        return True
+
+    # ----- execution -----
+    def _worker(self):
+        while True:
+            job_id = self._pending.get()
+            with self._lock:
+                row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None or row["status"] != "queued":
+                    continue
+                context = JobContext(self, job_id)
+                self._contexts[job_id] = context
+                self._db.execute("UPDATE jobs SET status = 'running', started = ? WHERE id = ?", (time.time(), job_id))
+                self._db.commit()
+            self._execute(dict(row), context)
+
+    def _execute(self, row, context):
+        job_id = row["id"]
+        fields = {}
+        try:
+            if row["kind"] == "command":
+                exit_code = context.run_command(json.loads(row["command"]), cwd=row["cwd"], timeout=row["timeout"])
+                fields.update(exit_code=exit_code, status="succeeded" if exit_code == 0 else "failed")
+                if exit_code != 0:
+                    fields["error"] = f"Exited with code {exit_code}"
+            else:
+                fn, args, kwargs = self._functions.pop(job_id)
+                result = fn(context, *args, **kwargs)
+                context.check_cancelled()
+                self._keep_result(job_id, result)
+                fields.update(status="succeeded", result=_to_json(result))
+        except JobCancelled:
+            fields["status"] = "cancelled"
+        except JobFailed as e:
+            self._keep_result(job_id, e.result)
+            fields.update(status="failed", error=str(e), result=_to_json(e.result))
+        except Exception as e:
+            fields.update(status="failed", error=f"{type(e).__name__}: {e}")
+        finally:
+            if fields.get("status") == "succeeded":
+                fields["progress"] = 1.0
+            fields["finished"] = time.time()
+            self._update(job_id, **fields)
+            with self._lock:
+                self._contexts.pop(job_id, None)
+            self._purge()
+
+    # ----- queries -----
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_dict(row) if row else None
+
+    def jobs(self, module=None, statuses=None, limit=200):
+        """Newest first, optionally filtered by module and status"""
+        query, params = "SELECT * FROM jobs WHERE 1 = 1", []
+        if module:
+            query += " AND module = ?"
+            params.append(module)
+        if statuses:
+            query += f" AND status IN ({','.join('?' * len(statuses))})"
+            params.extend(statuses)
+        query += " ORDER BY created DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [_row_dict(row) for row in rows]
+
+    def counts(self):
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def output(self, job_id, tail_bytes=OUTPUT_TAIL_BYTES):
+        """The last tail_bytes of a job's captured output"""
+        try:
+            with open(self._output_path(job_id), "rb") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - tail_bytes))
+                data = f.read()
+        except OSError:
+            return ""
+        text = data.decode("utf-8", errors="replace")
+        return text if size <= tail_bytes else "…" + text[text.find("\n") + 1:]
+
+    def result(self, job_id):
+        """The job's return value: the live object if this process ran it recently, else the stored JSON"""
+        with self._lock:
+            if job_id in self._results:
+                self._results.move_to_end(job_id)
+                return self._results[job_id]
+        job = self.get(job_id)
+        return json.loads(job["result"]) if job and job["result"] else None
+
+    def clear_finished(self):
+        with self._lock:
+            ids = [row["id"] for row in self._db.execute(
+                f"SELECT id FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATES))})", FINISHED_STATES)]
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in ids])
+            self._db.commit()
+        with self._lock:
+            for job_id in ids:
+                self._results.pop(job_id, None)
+        for job_id in ids:
+            try:
+                os.remove(self._output_path(job_id))
+            except OSError:
+                pass
+        return len(ids)
+
+def _to_json(value):
+    try:
+        return json.dumps(value, default=str)
+    except (TypeError, ValueError):
+        return None
+
+def _row_dict(row):
+    job = dict(row)
+    if job["command"]:
+        job["command"] = json.loads(job["command"])
+    end = job["finished"] or (time.time() if job["started"] else None)
+    job["duration_s"] = round(end - job["started"], 1) if job["started"] and end else None
+    return job
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue():
+    """Process-wide job queue shared by every session"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -0,0 +1,129 @@
+import streamlit as st
+import time
+import pandas as pd
+from modules import job_queue, command_scheduler
+
+STATUS_ICONS = {
+    "queued": "🕒",
+    "running": "⏳",
+    "succeeded": "✅",
+    "failed": "❌",
+    "cancelled": "🚫",
+    "interrupted": "⚠️",
+}
+
+def run():
+    """Main function to run the Jobs module"""
+
+    st.title("🧵 Background Jobs")
+    st.markdown("Long-running actions from every module run here in a shared worker pool; they keep going when you switch pages.")
+
+    queue = job_queue.get_queue()
+    counts = queue.counts()
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Running", counts.get("running", 0))
+    with col2:
+        st.metric("Queued", counts.get("queued", 0))
+    with col3:
+        st.metric("Succeeded", counts.get("succeeded", 0))
+    with col4:
+        st.metric("Failed", counts.get("failed", 0) + counts.get("interrupted", 0))
+
+    jobs = queue.jobs(limit=500)
+    if not jobs:
+        st.info("No jobs yet. Builds, clones, pushes, code generation and analyses submitted from other modules will show up here.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        modules = st.multiselect("Module:", sorted({job["module"] for job in jobs}))
+    with col2:
+        statuses = st.multiselect("Status:", list(STATUS_ICONS))
+    shown = [job for job in jobs if (not modules or job["module"] in modules) and (not statuses or job["status"] in statuses)]
+
+    if shown:
+        table = pd.DataFrame(shown)
+        table["status"] = table["status"].map(lambda status: f"{STATUS_ICONS.get(status, '')} {status}")
+        table["created"] = table["created"].map(format_job_time)
+        table["progress"] = (table["progress"] * 100).round().astype(int)
+        st.dataframe(table[["id", "title", "module", "status", "progress", "message", "created", "duration_s"]],
+                     use_container_width=True, hide_index=True,
+                     column_config={"progress": st.column_config.ProgressColumn("progress", min_value=0, max_value=100, format="%d%%")})
+
+        st.subheader("🔍 Job Detail")
+        job_id = st.selectbox("Job:", [job["id"] for job in shown],
+                              format_func=lambda job_id: next(f"{job['title']} ({job_id})" for job in shown if job["id"] == job_id))
+        show_job_progress(job_id, expanded=True)
+    else:
+        st.info("No jobs match the filters.")
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        auto_refresh = st.checkbox("Auto-refresh (2s)", value=bool(counts.get("running") or counts.get("queued")))
+    with col2:
+        st.button("🔄 Refresh")
+    with col3:
+        if st.button("🧹 Clear Finished Jobs"):
+            removed = queue.clear_finished()
+            st.success(f"Removed {removed} finished job(s)")
+            st.rerun()
+    if auto_refresh:
+        time.sleep(2)
+        st.rerun()
+
+def format_job_time(timestamp):
+    return pd.to_datetime(timestamp, unit="s").strftime("%Y-%m-%d %H:%M:%S") if timestamp else ""
+
+def show_job_progress(job_id, expanded=False, poll_interval=1.0):
+    """Render a job's status, progress and output; returns the job dict.
+
+    While the job is queued or running the widget polls on its own (only this
+    fragment reruns) and triggers one full rerun when the job finishes, so the
+    calling page can pick up the result.
+    """
+    queue = job_queue.get_queue()
+    job = queue.get(job_id)
+    if job is None:
+        st.warning(f"Job {job_id} no longer exists")
+        return None
+    active = job["status"] not in job_queue.FINISHED_STATES
+
+    def render():
+        current = queue.get(job_id)
+        if current is None:
+            return
+        if active and current["status"] in job_queue.FINISHED_STATES:
+            st.rerun()
+        icon = STATUS_ICONS.get(current["status"], "")
+        duration = f" · {current['duration_s']}s" if current["duration_s"] is not None else ""
+        st.markdown(f"{icon} **{current['title']}** — {current['status']}{duration} · job `{job_id}`")
+        if current["status"] in ("queued", "running"):
+            st.progress(current["progress"], text=current["message"] or current["status"].capitalize())
+            if st.button("🛑 Cancel", key=f"cancel_job_{job_id}"):
+                queue.cancel(job_id)
+        elif current["error"]:
+            st.error(current["error"])
+        output = queue.output(job_id)
+        if output:
+            with st.expander("📜 Output", expanded=expanded):
+                st.code(output, language="text")
+
+    st.fragment(render, run_every=poll_interval if active else None)()
+    return job
+
+def show_running_banner():
+    """Compact sidebar count of active jobs, shown on every page.
+
+    Also starts the command scheduler so saved schedules resume after a
+    restart without visiting CommandHub first.
+    """
+    try:
+        command_scheduler.get_scheduler()
+        counts = job_queue.get_queue().counts()
+    except Exception:
+        return
+    running, queued = counts.get("running", 0), counts.get("queued", 0)
+    if running or queued:
+        st.sidebar.info(f"🧵 {running} job(s) running, {queued} queued - see the Jobs page")
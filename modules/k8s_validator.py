@@ -0,0 +1,276 @@
+import os
+import re
+import json
+import time
+import yaml
+from concurrent.futures import ProcessPoolExecutor
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "k8s_schemas.json")
+MANIFEST_EXTENSIONS = (".yaml", ".yml")
+
+# libyaml is several times faster than the pure-Python loader when available
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+}
+
+_validators = None
+_definitions = {}
+
+def _compile(schema):
+    """Compile a schema node into a validator(value, path, errors) closure"""
+    if "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+
+        def check_ref(value, path, errors):
+            _definitions[name](value, path, errors)
+        return check_ref
+
+    checks = []
+
+    if schema.get("x-kubernetes-int-or-string"):
+        def check_int_or_string(value, path, errors):
+            if not (isinstance(value, str) or (isinstance(value, int) and not isinstance(value, bool))):
+                errors.append((path, f"expected integer or string, got {type(value).__name__}"))
+                return False
+            return True
+        checks.append(check_int_or_string)
+
+    expected = schema.get("type")
+    if expected:
+        type_check = _TYPE_CHECKS[expected]
+
+        def check_type(value, path, errors):
+            if not type_check(value):
+                errors.append((path, f"expected {expected}, got {type(value).__name__}"))
+                return False
+            return True
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = frozenset(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append((path, f"unsupported value {value!r}, expected one of {sorted(allowed)}"))
+            return True
+        checks.append(check_enum)
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+
+        def check_pattern(value, path, errors):
+            if not pattern.match(value):
+                errors.append((path, f"{value!r} does not match {pattern.pattern}"))
+            return True
+        checks.append(check_pattern)
+
+    if "maxLength" in schema:
+        max_length = schema["maxLength"]
+
+        def check_length(value, path, errors):
+            if len(value) > max_length:
+                errors.append((path, f"must be at most {max_length} characters"))
+            return True
+        checks.append(check_length)
+
+    if "minimum" in schema or "maximum" in schema:
+        low, high = schema.get("minimum"), schema.get("maximum")
+
+        def check_range(value, path, errors):
+            if (low is not None and value < low) or (high is not None and value > high):
+                errors.append((path, f"{value} is out of range [{low}, {high}]"))
+            return True
+        checks.append(check_range)
+
+    if "properties" in schema or "additionalProperties" in schema or "required" in schema:
+        properties = {key: _compile(sub) for key, sub in schema.get("properties", {}).items()}
+        required = tuple(schema.get("required", ()))
+        extra = schema.get("additionalProperties", True)
+        extra_check = _compile(extra) if isinstance(extra, dict) else None
+
+        def check_object(value, path, errors):
+            for key in required:
+                if key not in value:
+                    errors.append((path, f"missing required field '{key}'"))
+            for key, item in value.items():
+                check = properties.get(key)
+                if check is not None:
+                    if item is not None:
+                        check(item, path + (key,), errors)
+                elif extra_check is not None:
+                    extra_check(item, path + (key,), errors)
+                elif extra is False:
+                    errors.append((path + (key,), f"unknown field '{key}'"))
+            return True
+        checks.append(check_object)
+
+    if "items" in schema or "minItems" in schema:
+        item_check = _compile(schema["items"]) if "items" in schema else None
+        min_items = schema.get("minItems", 0)
+
+        def check_array(value, path, errors):
+            if len(value) < min_items:
+                errors.append((path, f"must contain at least {min_items} item(s)"))
+            if item_check is not None:
+                for i, item in enumerate(value):
+                    item_check(item, path + (i,), errors)
+            return True
+        checks.append(check_array)
+
+    def check_all(value, path, errors):
+        for check in checks:
+            # Stop at the first failed type check so later checks see the right type
+            if not check(value, path, errors):
+                return
+    return check_all
+
+def load_validators():
+    """Load the bundled schemas and compile one validator per apiVersion/kind (once per process)"""
+    global _validators
+    if _validators is None:
+        with open(SCHEMA_PATH) as f:
+            bundle = json.load(f)
+        for name, schema in bundle["definitions"].items():
+            _definitions[name] = _compile(schema)
+        _validators = {key: _compile(schema) for key, schema in bundle["kinds"].items()}
+    return _validators
+
+def supported_kinds():
+    """Return {kind: [apiVersions]} covered by the bundled schemas"""
+    kinds = {}
+    for key in load_validators():
+        api_version, kind = key.rsplit("/", 1)
+        kinds.setdefault(kind, []).append(api_version)
+    return kinds
+
+def _line_of(node, path):
+    """Resolve a field path to a 1-based line number in the composed YAML node"""
+    line = node.start_mark.line + 1
+    for part in path:
+        if isinstance(node, yaml.MappingNode):
+            for key_node, value_node in node.value:
+                if key_node.value == part:
+                    line = key_node.start_mark.line + 1
+                    node = value_node
+                    break
+            else:
+                return line
+        elif isinstance(node, yaml.SequenceNode) and isinstance(part, int) and part < len(node.value):
+            node = node.value[part]
+            line = node.start_mark.line + 1
+        else:
+            return line
+    return line
+
+def validate_document(obj):
+    """Validate one parsed object; returns a list of (path, message)"""
+    validators = load_validators()
+    if not isinstance(obj, dict):
+        return [((), "document is not a mapping")]
+    api_version, kind = obj.get("apiVersion"), obj.get("kind")
+    if not api_version or not kind:
+        return [((), "missing apiVersion or kind")]
+    validator = validators.get(f"{api_version}/{kind}")
+    if validator is None:
+        known = supported_kinds().get(kind)
+        if known:
+            return [(("apiVersion",), f"apiVersion {api_version!r} is not supported for {kind}, expected {' or '.join(known)}")]
+        # Unknown kinds (CRDs etc.) only get the generic metadata check
+        if not (obj.get("metadata") or {}).get("name"):
+            return [(("metadata",), "missing required field 'name'")]
+        return []
+    errors = []
+    validator(obj, (), errors)
+    return errors
+
+def validate_text(text, source="<paste>"):
+    """Validate every document in a YAML string; returns (document count, error rows)"""
+    rows = []
+    count = 0
+    loader = Loader(text)
+    try:
+        while loader.check_node():
+            node = loader.get_node()
+            if node is None:
+                continue
+            obj = loader.construct_document(node)
+            if obj is None:
+                continue
+            count += 1
+            errors = validate_document(obj)
+            metadata = obj.get("metadata") if isinstance(obj, dict) else None
+            for path, message in errors:
+                rows.append({
+                    "file": source,
+                    "line": _line_of(node, path),
+                    "document": count,
+                    "kind": obj.get("kind", "") if isinstance(obj, dict) else "",
+                    "name": (metadata or {}).get("name", "") if isinstance(metadata, dict) else "",
+                    "path": ".".join(str(p) for p in path) or "(root)",
+                    "message": message,
+                })
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        rows.append({
+            "file": source,
+            "line": mark.line + 1 if mark else 0,
+            "document": count + 1,
+            "kind": "",
+            "name": "",
+            "path": "(yaml)",
+            "message": f"YAML syntax error: {getattr(e, 'problem', None) or e}",
+        })
+    finally:
+        loader.dispose()
+    return count, rows
+
+def validate_file(path):
+    """Validate one manifest file from disk"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return 0, [{"file": path, "line": 0, "document": 0, "kind": "", "name": "", "path": "(file)", "message": str(e)}]
+    return validate_text(text, source=path)
+
+def find_manifests(root):
+    """Collect YAML manifest paths under a directory (or the file itself)"""
+    if os.path.isfile(root):
+        return [root]
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(MANIFEST_EXTENSIONS))
+    return sorted(paths)
+
+def validate_paths(paths, workers=None):
+    """Validate many files across a process pool; returns summary stats and error rows"""
+    started = time.perf_counter()
+    documents = 0
+    rows = []
+    if workers == 1 or len(paths) < 8:
+        for count, file_rows in map(validate_file, paths):
+            documents += count
+            rows.extend(file_rows)
+    else:
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for count, file_rows in pool.map(validate_file, paths, chunksize=chunksize):
+                documents += count
+                rows.extend(file_rows)
+    elapsed = time.perf_counter() - started
+    return {
+        "files": len(paths),
+        "documents": documents,
+        "errors": len(rows),
+        "elapsed_s": elapsed,
+        "docs_per_s": documents / elapsed if elapsed > 0 else 0.0,
+        "rows": rows,
+    }
@@ -9,6 +9,910 @@ import re
 from datetime import datetime
 import time
 import base64
+import hashlib
+import difflib
+import threading
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from modules import app_paths, k8s_validator, output_viewer
+
+# Apply order by kind: cluster-scoped foundations first, then config, then workloads
+KIND_APPLY_ORDER = {
+    "Namespace": 0,
+    "CustomResourceDefinition": 1,
+    "PriorityClass": 2,
+    "StorageClass": 2,
+    "ServiceAccount": 3,
+    "ClusterRole": 3,
+    "ClusterRoleBinding": 3,
+    "Role": 3,
+    "RoleBinding": 3,
+    "ConfigMap": 4,
+    "Secret": 4,
+    "PersistentVolume": 5,
+    "PersistentVolumeClaim": 5,
+    "Service": 6,
+    "Deployment": 7,
+    "StatefulSet": 7,
+    "DaemonSet": 7,
+    "ReplicaSet": 7,
+    "Job": 7,
+    "CronJob": 7,
+    "Pod": 7,
+    "Ingress": 8,
+    "NetworkPolicy": 8,
+    "HorizontalPodAutoscaler": 8,
+    "PodDisruptionBudget": 8,
+}
+DEFAULT_APPLY_TIER = 9
+FIELD_MANAGER = "devops-dashboard"
+
+# Dry-run diffs reused by the apply that follows them; older entries are diffed again
+DIFF_CACHE_TTL = 300
+MAX_DIFF_CACHE = 512
+
+# Dry-run diff cache keyed by (kube context, manifest hash), shared across reruns
+_apply_cache = OrderedDict()
+_apply_cache_lock = threading.Lock()
+
+def run_kubectl_command(command, timeout=60):
+    """Execute a kubectl/helm shell command and return its output as text"""
+    try:
+        result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=timeout)
+        if result.returncode == 0:
+            return result.stdout
+        return f"Error: {result.stderr or result.stdout}"
+    except subprocess.TimeoutExpired:
+        return "Error: Command timed out"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def capture_kubectl_output(key, command, timeout=60):
+    """Run a kubectl shell command with output spooled to disk and hand it to the shared output viewer"""
+    success, path = output_viewer.spool_command(command, timeout=timeout)
+    if not success:
+        st.error("❌ Command failed - see the output below")
+    output_viewer.capture(key, path=path, title=f"$ {command}", language="yaml" if "-o yaml" in command else None)
+    return success
+
+def run_kubectl_stdin(args, stdin_text, timeout=60):
+    """Run kubectl with a manifest on stdin and return (returncode, output)"""
+    try:
+        result = subprocess.run(["kubectl"] + args, input=stdin_text, capture_output=True, text=True, timeout=timeout)
+        return result.returncode, result.stdout + result.stderr
+    except subprocess.TimeoutExpired:
+        return -1, "Command timed out"
+    except Exception as e:
+        return -1, str(e)
+
+def get_current_context():
+    """Return the active kubeconfig context name (empty string if unknown)"""
+    try:
+        result = subprocess.run(["kubectl", "config", "current-context"], capture_output=True, text=True, timeout=10)
+        return result.stdout.strip()
+    except Exception:
+        return ""
+
+def split_manifests(yaml_content):
+    """Split multi-document YAML into a flat list of Kubernetes objects"""
+    objects = []
+    for doc in yaml.safe_load_all(yaml_content):
+        if not isinstance(doc, dict):
+            continue
+        if str(doc.get("kind", "")).endswith("List") and isinstance(doc.get("items"), list):
+            objects.extend(item for item in doc["items"] if isinstance(item, dict))
+        else:
+            objects.append(doc)
+    return objects
+
+def manifest_hash(obj):
+    """Stable content hash of a single Kubernetes object"""
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+def order_manifests(objects):
+    """Group objects into dependency tiers; objects within a tier are independent"""
+    tiers = {}
+    for obj in objects:
+        tier = KIND_APPLY_ORDER.get(obj.get("kind"), DEFAULT_APPLY_TIER)
+        tiers.setdefault(tier, []).append(obj)
+    return [tiers[t] for t in sorted(tiers)]
+
+def describe_object(obj):
+    """Return (kind, name, namespace) for display"""
+    metadata = obj.get("metadata") or {}
+    return obj.get("kind", "?"), metadata.get("name", "?"), metadata.get("namespace", "")
+
+def apply_object(obj, context, dry_run=False, timeout=60):
+    """Diff and server-side apply one object; a recent dry-run diff of the same manifest is reused.
+
+    Only pending changes are cached: whether an object is unchanged is
+    always asked of the cluster, so edits or deletions made there are
+    corrected on the next apply.
+    """
+    kind, name, namespace = describe_object(obj)
+    started = time.perf_counter()
+    key = (context, manifest_hash(obj))
+    manifest = yaml.safe_dump(obj, sort_keys=False)
+    result = {"kind": kind, "name": name, "namespace": namespace}
+
+    with _apply_cache_lock:
+        cached = _apply_cache.pop(key, None)
+    if cached and time.time() - cached["at"] > DIFF_CACHE_TTL:
+        cached = None
+
+    if cached:
+        diff_code, diff = 1, cached["diff"]
+    else:
+        diff_code, diff = run_kubectl_stdin(["diff", "--server-side", f"--field-manager={FIELD_MANAGER}", "-f", "-"], manifest, timeout)
+    if diff_code == 0:
+        status, output = "unchanged", ""
+    elif diff_code > 1 or diff_code < 0:
+        status, output = "failed", diff
+    elif dry_run:
+        status, output = "would change", diff
+        with _apply_cache_lock:
+            _apply_cache[key] = {"diff": diff, "at": cached["at"] if cached else time.time()}
+            while len(_apply_cache) > MAX_DIFF_CACHE:
+                _apply_cache.popitem(last=False)
+    else:
+        code, output = run_kubectl_stdin(["apply", "--server-side", f"--field-manager={FIELD_MANAGER}", "-f", "-"], manifest, timeout)
+        status = "applied" if code == 0 else "failed"
+
+    result.update({
+        "status": status,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "output": output.strip(),
+    })
+    return result
+
+def apply_manifests(yaml_content, dry_run=False, max_workers=8, timeout=60):
+    """Apply a multi-document manifest tier by tier, objects within a tier concurrently"""
+    objects = split_manifests(yaml_content)
+    context = get_current_context()
+    results = []
+    for tier in order_manifests(objects):
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tier)))) as pool:
+            tier_results = list(pool.map(lambda obj: apply_object(obj, context, dry_run, timeout), tier))
+        results.extend(tier_results)
+        if any(r["status"] == "failed" for r in tier_results):
+            # Later tiers usually depend on this one, so stop instead of cascading errors
+            break
+    return results
+
+def clear_apply_cache():
+    """Forget cached diffs so the next apply re-checks every object"""
+    with _apply_cache_lock:
+        _apply_cache.clear()
+
+def apply_yaml_content(yaml_content, name):
+    """Apply YAML content through the batched apply engine and return a text report"""
+    try:
+        results = apply_manifests(yaml_content)
+    except yaml.YAMLError as e:
+        return f"Error: invalid YAML in {name}: {str(e)}"
+    if not results:
+        return f"Error: no Kubernetes objects found in {name}"
+    lines = [f"{name}:"]
+    for r in results:
+        target = f"{r['kind']}/{r['name']}" + (f" -n {r['namespace']}" if r['namespace'] else "")
+        lines.append(f"  {target}: {r['status']} ({r['latency_ms']} ms)")
+        if r["status"] == "failed" and r["output"]:
+            lines.append(f"    {r['output']}")
+    return "\n".join(lines)
+
+def show_apply_report(results):
+    """Render per-object apply results with latency"""
+    if not results:
+        st.warning("No Kubernetes objects found in manifest")
+        return
+    df = pd.DataFrame(results)
+    st.dataframe(df[["kind", "name", "namespace", "status", "latency_ms"]], use_container_width=True)
+    failed = [r for r in results if r["status"] == "failed"]
+    changed = [r for r in results if r["status"] in ("applied", "would change")]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Objects", len(results))
+    col2.metric("Changed", len(changed))
+    col3.metric("Failed", len(failed))
+    for r in failed + changed:
+        if r["output"]:
+            with st.expander(f"{r['kind']}/{r['name']} - {r['status']}"):
+                st.code(r["output"], language="diff" if r["status"] != "failed" else None)
+
+def build_deployment_manifest(name, image, replicas, port):
+    """Build a Deployment object for the YAML generator"""
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": name, "labels": {"app": name}},
+        "spec": {
+            "replicas": int(replicas),
+            "selector": {"matchLabels": {"app": name}},
+            "template": {
+                "metadata": {"labels": {"app": name}},
+                "spec": {"containers": [{"name": name, "image": image, "ports": [{"containerPort": int(port)}]}]},
+            },
+        },
+    }
+
+def build_service_manifest(name, app_label, port, target_port, service_type):
+    """Build a Service object for the YAML generator"""
+    return {
+        "apiVersion": "v1",
+        "kind": "Service",
+        "metadata": {"name": name},
+        "spec": {
+            "selector": {"app": app_label},
+            "ports": [{"port": int(port), "targetPort": int(target_port)}],
+            "type": service_type,
+        },
+    }
+
+def get_kubectl_json(args, timeout=30):
+    """Run a kubectl read command with -o json and return the parsed object (None on error)"""
+    try:
+        result = subprocess.run(["kubectl"] + args + ["-o", "json"], capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            return None
+        return json.loads(result.stdout)
+    except Exception:
+        return None
+
+def rollout_progress(deployment):
+    """Summarize a Deployment object's rollout state like `kubectl rollout status`"""
+    spec = deployment.get("spec") or {}
+    status = deployment.get("status") or {}
+    metadata = deployment.get("metadata") or {}
+    desired = spec.get("replicas", 1)
+    progress = {
+        "desired": desired,
+        "current": status.get("replicas", 0),
+        "updated": status.get("updatedReplicas", 0),
+        "ready": status.get("readyReplicas", 0),
+        "available": status.get("availableReplicas", 0),
+    }
+    observed = status.get("observedGeneration", 0) >= metadata.get("generation", 0)
+    progress["complete"] = (
+        observed
+        and progress["updated"] == desired
+        and progress["current"] == desired
+        and progress["available"] == desired
+    )
+    return progress
+
+def watch_rollout(name, namespace="default", timeout=300, on_update=None):
+    """Stream Deployment status changes until the rollout completes or times out.
+
+    Returns a dict with the transition history and time-to-ready in seconds
+    (None if the rollout did not finish).
+    """
+    started = time.time()
+    transitions = []
+    proc = subprocess.Popen(
+        ["kubectl", "get", "deployment", name, "-n", namespace, "-o", "json", "--watch"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    killer = threading.Timer(timeout, proc.kill)
+    killer.start()
+    decoder = json.JSONDecoder()
+    buffer = ""
+    time_to_ready = None
+    try:
+        for line in proc.stdout:
+            buffer += line
+            try:
+                obj, end = decoder.raw_decode(buffer.lstrip())
+            except ValueError:
+                continue
+            buffer = buffer.lstrip()[end:]
+            progress = rollout_progress(obj)
+            snapshot = (progress["current"], progress["updated"], progress["ready"], progress["available"])
+            if not transitions or transitions[-1]["state"] != snapshot:
+                progress["elapsed_s"] = round(time.time() - started, 1)
+                transitions.append({"state": snapshot, **progress})
+                if on_update:
+                    on_update(progress)
+            if progress["complete"]:
+                time_to_ready = round(time.time() - started, 1)
+                break
+    finally:
+        killer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+    error = proc.stderr.read().strip() if time_to_ready is None else ""
+    return {"transitions": transitions, "time_to_ready": time_to_ready, "error": error}
+
+def show_rollout_watch(name, namespace="default", timeout=300):
+    """Render live rollout progress for a Deployment"""
+    progress_bar = st.progress(0.0, text=f"Waiting for deployment/{name}...")
+    status_box = st.empty()
+
+    def on_update(progress):
+        desired = max(progress["desired"], 1)
+        progress_bar.progress(
+            min(progress["available"] / desired, 1.0),
+            text=f"deployment/{name}: {progress['updated']} updated, {progress['ready']} ready, {progress['available']} available of {progress['desired']} ({progress['elapsed_s']}s)",
+        )
+        status_box.write(f"**Updated:** {progress['updated']} · **Ready:** {progress['ready']} · **Available:** {progress['available']} / {progress['desired']}")
+
+    outcome = watch_rollout(name, namespace, timeout=timeout, on_update=on_update)
+    if outcome["time_to_ready"] is not None:
+        progress_bar.progress(1.0, text=f"deployment/{name} ready")
+        st.success(f"✅ Rollout complete - time to ready: {outcome['time_to_ready']}s")
+    else:
+        st.error(f"❌ Rollout did not complete within {timeout}s {outcome['error']}")
+    if outcome["transitions"]:
+        history = pd.DataFrame(outcome["transitions"]).drop(columns=["state", "complete"])
+        st.dataframe(history, use_container_width=True)
+    return outcome
+
+def get_pdb_budgets():
+    """Return PodDisruptionBudgets as [{namespace, name, selector, allowed}]"""
+    data = get_kubectl_json(["get", "pdb", "--all-namespaces"]) or {}
+    budgets = []
+    for pdb in data.get("items", []):
+        budgets.append({
+            "namespace": pdb["metadata"]["namespace"],
+            "name": pdb["metadata"]["name"],
+            "selector": (pdb.get("spec", {}).get("selector") or {}).get("matchLabels", {}),
+            "allowed": (pdb.get("status") or {}).get("disruptionsAllowed", 0),
+        })
+    return budgets
+
+def matching_pdb(pod, budgets):
+    """Find the PDB (index) covering a pod, if any"""
+    labels = pod["metadata"].get("labels") or {}
+    for i, pdb in enumerate(budgets):
+        if pdb["namespace"] != pod["metadata"]["namespace"] or not pdb["selector"]:
+            continue
+        if all(labels.get(k) == v for k, v in pdb["selector"].items()):
+            return i
+    return None
+
+def get_evictable_pods(node):
+    """Pods on a node that drain would evict (skips DaemonSet and mirror pods); None if kubectl failed"""
+    data = get_kubectl_json(["get", "pods", "--all-namespaces", "--field-selector", f"spec.nodeName={node}"])
+    if data is None:
+        return None
+    pods = []
+    for pod in data.get("items", []):
+        owners = pod["metadata"].get("ownerReferences") or []
+        annotations = pod["metadata"].get("annotations") or {}
+        if any(o.get("kind") == "DaemonSet" for o in owners):
+            continue
+        if "kubernetes.io/config.mirror" in annotations:
+            continue
+        if (pod.get("status") or {}).get("phase") in ("Succeeded", "Failed"):
+            continue
+        pods.append(pod)
+    return pods
+
+def evict_pod(pod, timeout=30):
+    """Request an Eviction for a pod; returns (ok, blocked_by_pdb, output)"""
+    namespace = pod["metadata"]["namespace"]
+    name = pod["metadata"]["name"]
+    eviction = {
+        "apiVersion": "policy/v1",
+        "kind": "Eviction",
+        "metadata": {"name": name, "namespace": namespace},
+    }
+    code, output = run_kubectl_stdin(
+        ["create", "--raw", f"/api/v1/namespaces/{namespace}/pods/{name}/eviction", "-f", "-"],
+        json.dumps(eviction), timeout,
+    )
+    blocked = code != 0 and ("429" in output or "disruption budget" in output.lower())
+    return code == 0, blocked, output.strip()
+
+def drain_nodes(nodes, concurrency=5, timeout=600, retry_interval=5, on_event=None):
+    """Cordon nodes and evict their pods in parallel while respecting PodDisruptionBudgets.
+
+    A pod covered by an exhausted PDB is deferred and retried after the
+    budget is re-read from the API server. Nodes that fail to cordon are
+    not evicted from; cordon and pod listing failures are returned in
+    "errors" rather than looking like a node with nothing to evict.
+    """
+    started = time.time()
+    results, errors, pending = [], [], []
+    for node in nodes:
+        code, output = run_kubectl_stdin(["cordon", node], "", 30)
+        if code != 0:
+            errors.append({"node": node, "step": "cordon", "output": output.strip()})
+            continue
+        pods = get_evictable_pods(node)
+        if pods is None:
+            errors.append({"node": node, "step": "list pods", "output": "kubectl get pods failed"})
+            continue
+        pending.extend((node, pod) for pod in pods)
+
+    total = len(pending)
+    budgets = get_pdb_budgets()
+    budget_lock = threading.Lock()
+
+    def take_budget(pod):
+        idx = matching_pdb(pod, budgets)
+        if idx is None:
+            return True
+        with budget_lock:
+            if budgets[idx]["allowed"] > 0:
+                budgets[idx]["allowed"] -= 1
+                return True
+        return False
+
+    def evict(item):
+        node, pod = item
+        pod_started = time.time()
+        ok, blocked, output = evict_pod(pod)
+        return {
+            "node": node,
+            "namespace": pod["metadata"]["namespace"],
+            "pod": pod["metadata"]["name"],
+            "status": "evicted" if ok else ("blocked by PDB" if blocked else "failed"),
+            "latency_s": round(time.time() - pod_started, 2),
+            "output": output,
+        }, item
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        while pending and time.time() - started < timeout:
+            runnable, deferred, retry = [], [], []
+            for item in pending:
+                (runnable if take_budget(item[1]) else deferred).append(item)
+            for outcome, item in pool.map(evict, runnable):
+                if outcome["status"] == "blocked by PDB":
+                    retry.append(item)
+                else:
+                    results.append(outcome)
+                    if on_event:
+                        on_event(outcome, len(results), total)
+            pending = deferred + retry
+            if pending:
+                time.sleep(retry_interval)
+                budgets[:] = get_pdb_budgets()
+
+    for node, pod in pending:
+        results.append({
+            "node": node,
+            "namespace": pod["metadata"]["namespace"],
+            "pod": pod["metadata"]["name"],
+            "status": "timed out (PDB)",
+            "latency_s": None,
+            "output": "",
+        })
+    return {"results": results, "errors": errors, "elapsed_s": round(time.time() - started, 1)}
+
+def run_helm_json(args, timeout=60):
+    """Run a helm command with -o json and return the parsed output (None on error)"""
+    try:
+        result = subprocess.run(["helm"] + args + ["-o", "json"], capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            return None
+        return json.loads(result.stdout or "null")
+    except Exception:
+        return None
+
+def split_chart_version(chart):
+    """Split helm's 'name-1.2.3' chart field into (name, version)"""
+    match = re.match(r"^(.*)-(v?\d+(?:\.\d+)*(?:[-+].*)?)$", chart or "")
+    if match:
+        return match.group(1), match.group(2)
+    return chart or "", ""
+
+def version_key(version):
+    """Sortable key for chart versions (numeric parts first, pre-releases before releases)"""
+    core, _, pre = version.lstrip("v").partition("-")
+    numbers = tuple(int(p) if p.isdigit() else 0 for p in core.split("+")[0].split("."))
+    return numbers, pre == "", pre
+
+def helm_index_path():
+    """Inventory file for the current kube context"""
+    context = get_current_context() or "default"
+    return app_paths.data_path("helm", f"{hashlib.sha1(context.encode()).hexdigest()[:12]}.json")
+
+def load_helm_index():
+    """Load the cached Helm release index from disk"""
+    try:
+        with open(helm_index_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"releases": {}, "latest": {}, "values": {}, "history": {}, "updated": None, "latest_updated": None}
+
+def save_helm_index(index):
+    """Persist the Helm release index atomically"""
+    path = helm_index_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, path)
+
+def refresh_helm_index(index, refresh_latest=False):
+    """Incrementally refresh the index: one `helm list`, history only for releases whose revision changed"""
+    releases = run_helm_json(["list", "--all-namespaces", "--all", "--max", "0"])
+    if releases is None:
+        return index, None
+    current = {}
+    changed = []
+    for rel in releases:
+        key = f"{rel['namespace']}/{rel['name']}"
+        chart_name, chart_version = split_chart_version(rel.get("chart"))
+        entry = {
+            "release": rel["name"],
+            "namespace": rel["namespace"],
+            "revision": int(rel.get("revision", 0)),
+            "status": rel.get("status", ""),
+            "chart": chart_name,
+            "chart_version": chart_version,
+            "app_version": rel.get("app_version", ""),
+            "updated": rel.get("updated", ""),
+        }
+        previous = index["releases"].get(key)
+        if not previous or previous["revision"] != entry["revision"] or key not in index["history"]:
+            changed.append(key)
+        current[key] = entry
+
+    def fetch_history(key):
+        namespace, name = key.split("/", 1)
+        return key, run_helm_json(["history", name, "-n", namespace, "--max", "20"]) or []
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for key, history in pool.map(fetch_history, changed):
+            index["history"][key] = [int(h["revision"]) for h in history]
+
+    # Drop state for releases that were uninstalled
+    for key in set(index["releases"]) - set(current):
+        index["history"].pop(key, None)
+    index["values"] = {k: v for k, v in index["values"].items() if k.rsplit("@", 1)[0] in current}
+    index["releases"] = current
+    index["updated"] = datetime.now().isoformat(timespec="seconds")
+
+    if refresh_latest or not index["latest"]:
+        run_kubectl_command("helm repo update", timeout=120)
+        charts = run_helm_json(["search", "repo"]) or []
+        latest = {}
+        for chart in charts:
+            name = chart["name"].split("/", 1)[-1]
+            if name not in latest or version_key(chart["version"]) > version_key(latest[name]["version"]):
+                latest[name] = {"repo_chart": chart["name"], "version": chart["version"]}
+        index["latest"] = latest
+        index["latest_updated"] = index["updated"]
+
+    save_helm_index(index)
+    return index, changed
+
+def helm_inventory_frame(index):
+    """Release table with the latest repo version and an outdated flag"""
+    rows = []
+    for entry in index["releases"].values():
+        latest = index["latest"].get(entry["chart"], {})
+        latest_version = latest.get("version", "")
+        row = dict(entry)
+        row["latest_version"] = latest_version
+        row["outdated"] = bool(latest_version and entry["chart_version"]
+                               and version_key(latest_version) > version_key(entry["chart_version"]))
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def get_release_values(index, namespace, name, revision):
+    """User-supplied values for one release revision (revisions are immutable, so cached forever)"""
+    key = f"{namespace}/{name}@{revision}"
+    if key not in index["values"]:
+        values = run_helm_json(["get", "values", name, "-n", namespace, "--revision", str(revision)])
+        index["values"][key] = values or {}
+        save_helm_index(index)
+    return index["values"][key]
+
+def diff_values(old, new, old_label, new_label):
+    """Unified diff of two values dicts rendered as sorted YAML"""
+    old_text = yaml.safe_dump(old or {}, sort_keys=True).splitlines(keepends=True)
+    new_text = yaml.safe_dump(new or {}, sort_keys=True).splitlines(keepends=True)
+    return "".join(difflib.unified_diff(old_text, new_text, fromfile=old_label, tofile=new_label))
+
+def show_helm_inventory():
+    """Helm release inventory with outdated-chart detection and values diffs"""
+    st.subheader("📋 Helm Release Inventory")
+    if "helm_index" not in st.session_state:
+        st.session_state.helm_index = load_helm_index()
+    index = st.session_state.helm_index
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔄 Refresh Releases"):
+            with st.spinner("Refreshing release index..."):
+                index, changed = refresh_helm_index(index)
+            if changed is None:
+                st.error("❌ helm list failed - is helm installed and the cluster reachable?")
+            else:
+                st.success(f"✅ Index refreshed ({len(changed)} release(s) changed)")
+    with col2:
+        if st.button("📡 Check Latest Chart Versions"):
+            with st.spinner("Updating chart repositories..."):
+                index, changed = refresh_helm_index(index, refresh_latest=True)
+            if changed is None:
+                st.error("❌ helm list failed - is helm installed and the cluster reachable?")
+
+    if not index["releases"]:
+        st.info("No releases indexed yet. Click Refresh Releases.")
+        return
+
+    st.caption(f"Index updated: {index['updated']} · chart versions checked: {index['latest_updated'] or 'never'}")
+    df = helm_inventory_frame(index)
+
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("Releases", len(df))
+    metric_cols[1].metric("Namespaces", df["namespace"].nunique())
+    metric_cols[2].metric("Outdated", int(df["outdated"].sum()))
+    metric_cols[3].metric("Not Deployed", int((df["status"] != "deployed").sum()))
+
+    filter_cols = st.columns(3)
+    with filter_cols[0]:
+        namespaces = st.multiselect("Namespace:", sorted(df["namespace"].unique()))
+    with filter_cols[1]:
+        statuses = st.multiselect("Status:", sorted(df["status"].unique()))
+    with filter_cols[2]:
+        outdated_only = st.checkbox("Outdated only")
+    view = df
+    if namespaces:
+        view = view[view["namespace"].isin(namespaces)]
+    if statuses:
+        view = view[view["status"].isin(statuses)]
+    if outdated_only:
+        view = view[view["outdated"]]
+    st.dataframe(view.sort_values(["namespace", "release"]), use_container_width=True)
+    st.download_button("📥 Download Inventory (CSV)", view.to_csv(index=False), file_name="helm_inventory.csv", mime="text/csv")
+
+    st.subheader("🔀 Diff Values Between Revisions")
+    release_key = st.selectbox("Release:", sorted(index["releases"]))
+    revisions = sorted(index["history"].get(release_key, []))
+    if len(revisions) < 2:
+        st.info("This release has only one revision")
+        return
+    rev_cols = st.columns(2)
+    with rev_cols[0]:
+        old_rev = st.selectbox("From revision:", revisions, index=len(revisions) - 2)
+    with rev_cols[1]:
+        new_rev = st.selectbox("To revision:", revisions, index=len(revisions) - 1)
+    if st.button("Diff Values"):
+        namespace, name = release_key.split("/", 1)
+        old = get_release_values(index, namespace, name, old_rev)
+        new = get_release_values(index, namespace, name, new_rev)
+        diff = diff_values(old, new, f"{name}@{old_rev}", f"{name}@{new_rev}")
+        if diff:
+            st.code(diff, language="diff")
+        else:
+            st.success("No differences in user-supplied values")
+
+QUANTITY_SUFFIXES = {
+    "Ki": 1024, "Mi": 1024**2, "Gi": 1024**3, "Ti": 1024**4, "Pi": 1024**5, "Ei": 1024**6,
+    "k": 1000, "K": 1000, "M": 1000**2, "G": 1000**3, "T": 1000**4, "P": 1000**5, "E": 1000**6,
+    "m": 0.001,
+}
+STORAGE_HISTORY_SAMPLES = 288
+
+def parse_quantity(value):
+    """Convert a Kubernetes quantity string (e.g. '10Gi') to a number of bytes"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    for suffix in sorted(QUANTITY_SUFFIXES, key=len, reverse=True):
+        if text.endswith(suffix):
+            return float(text[:-len(suffix)]) * QUANTITY_SUFFIXES[suffix]
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def fetch_volume_stats(node):
+    """Kubelet volume stats for PVC-backed volumes on one node"""
+    summary = get_kubectl_json(["get", "--raw", f"/api/v1/nodes/{node}/proxy/stats/summary"])
+    stats = []
+    if not summary:
+        return stats
+    for pod in summary.get("pods", []):
+        for volume in pod.get("volume", []):
+            ref = volume.get("pvcRef")
+            if ref:
+                stats.append({
+                    "namespace": ref["namespace"],
+                    "pvc": ref["name"],
+                    "node": node,
+                    "used_bytes": volume.get("usedBytes"),
+                    "stats_capacity_bytes": volume.get("capacityBytes"),
+                })
+    return stats
+
+def collect_storage_snapshot():
+    """Fetch PVs, PVCs, storage classes and kubelet volume stats in one pass"""
+    resources = get_kubectl_json(["get", "pv,pvc,storageclass", "--all-namespaces"])
+    if resources is None:
+        return None
+    nodes = get_kubectl_json(["get", "nodes"]) or {}
+    node_names = [n["metadata"]["name"] for n in nodes.get("items", [])]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        volume_stats = [s for node_stats in pool.map(fetch_volume_stats, node_names) for s in node_stats]
+
+    pvs, pvcs, classes = [], [], []
+    for item in resources.get("items", []):
+        kind = item.get("kind")
+        metadata = item.get("metadata", {})
+        spec = item.get("spec", {})
+        status = item.get("status", {})
+        if kind == "PersistentVolume":
+            claim = spec.get("claimRef") or {}
+            pvs.append({
+                "pv": metadata["name"],
+                "pv_phase": status.get("phase", ""),
+                "pv_capacity_bytes": parse_quantity((spec.get("capacity") or {}).get("storage")),
+                "reclaim_policy": spec.get("persistentVolumeReclaimPolicy", ""),
+                "pv_storage_class": spec.get("storageClassName", ""),
+                "claim_namespace": claim.get("namespace", ""),
+                "claim_name": claim.get("name", ""),
+            })
+        elif kind == "PersistentVolumeClaim":
+            pvcs.append({
+                "namespace": metadata["namespace"],
+                "pvc": metadata["name"],
+                "pv": spec.get("volumeName", ""),
+                "status": status.get("phase", ""),
+                "storage_class": spec.get("storageClassName", ""),
+                "capacity_bytes": parse_quantity((status.get("capacity") or {}).get("storage")
+                                                 or ((spec.get("resources") or {}).get("requests") or {}).get("storage")),
+            })
+        elif kind == "StorageClass":
+            classes.append({
+                "storage_class": metadata["name"],
+                "provisioner": item.get("provisioner", ""),
+                "expandable": bool(item.get("allowVolumeExpansion")),
+            })
+    return {
+        "taken_at": time.time(),
+        "pvs": pvs,
+        "pvcs": pvcs,
+        "storage_classes": classes,
+        "volume_stats": volume_stats,
+    }
+
+def storage_snapshot_path():
+    """Snapshot file for the current kube context"""
+    return app_paths.data_path("storage", f"{hashlib.sha1((get_current_context() or 'default').encode()).hexdigest()[:12]}.json")
+
+def load_storage_snapshot():
+    """Load the last cached storage snapshot and usage history"""
+    try:
+        with open(storage_snapshot_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_storage_snapshot(snapshot, previous=None):
+    """Persist a snapshot, appending each PVC's used bytes to its bounded sample history"""
+    history = (previous or {}).get("history", {})
+    for stat in snapshot["volume_stats"]:
+        if stat["used_bytes"] is None:
+            continue
+        key = f"{stat['namespace']}/{stat['pvc']}"
+        samples = history.setdefault(key, [])
+        samples.append([snapshot["taken_at"], stat["used_bytes"]])
+        del samples[:-STORAGE_HISTORY_SAMPLES]
+    live = {f"{p['namespace']}/{p['pvc']}" for p in snapshot["pvcs"]}
+    snapshot["history"] = {k: v for k, v in history.items() if k in live}
+    path = storage_snapshot_path()
+    with open(path + ".tmp", "w") as f:
+        json.dump(snapshot, f)
+    os.replace(path + ".tmp", path)
+    return snapshot
+
+def growth_rate(samples):
+    """Least-squares growth rate in bytes/second over (timestamp, used) samples"""
+    if len(samples) < 2:
+        return None
+    n = len(samples)
+    t0 = samples[0][0]
+    xs = [s[0] - t0 for s in samples]
+    ys = [s[1] for s in samples]
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+
+def build_storage_tables(snapshot):
+    """Join PVCs with PVs, storage classes and volume stats; returns (volumes, orphaned PVs)"""
+    pvcs = pd.DataFrame(snapshot["pvcs"], columns=["namespace", "pvc", "pv", "status", "storage_class", "capacity_bytes"])
+    pvs = pd.DataFrame(snapshot["pvs"], columns=["pv", "pv_phase", "pv_capacity_bytes", "reclaim_policy",
+                                                 "pv_storage_class", "claim_namespace", "claim_name"])
+    classes = pd.DataFrame(snapshot["storage_classes"], columns=["storage_class", "provisioner", "expandable"])
+    stats = pd.DataFrame(snapshot["volume_stats"], columns=["namespace", "pvc", "node", "used_bytes", "stats_capacity_bytes"])
+    stats = stats.drop_duplicates(["namespace", "pvc"])
+
+    volumes = (pvcs.merge(pvs[["pv", "reclaim_policy"]], on="pv", how="left")
+                   .merge(classes, on="storage_class", how="left")
+                   .merge(stats, on=["namespace", "pvc"], how="left"))
+    volumes["capacity_bytes"] = volumes["stats_capacity_bytes"].fillna(volumes["capacity_bytes"])
+    volumes["used_pct"] = (volumes["used_bytes"] / volumes["capacity_bytes"] * 100).round(1)
+
+    history = snapshot.get("history", {})
+    rates = [growth_rate(history.get(f"{ns}/{name}", [])) for ns, name in zip(volumes["namespace"], volumes["pvc"])]
+    volumes["growth_bytes_per_day"] = [r * 86400 if r is not None else None for r in rates]
+    free = volumes["capacity_bytes"] - volumes["used_bytes"]
+    growth = pd.to_numeric(volumes["growth_bytes_per_day"], errors="coerce")
+    volumes["days_to_full"] = (free / growth).where(growth > 0).round(1)
+    volumes = volumes.drop(columns=["stats_capacity_bytes"])
+
+    # A PV is orphaned when it is Released/Failed or its claim no longer exists;
+    # Available PVs are unbound and ready to bind, so they are reported separately
+    claims = set(zip(pvcs["namespace"], pvcs["pvc"]))
+    claim_missing = [bool(name) and (ns, name) not in claims for ns, name in zip(pvs["claim_namespace"], pvs["claim_name"])]
+    available = pvs["pv_phase"] == "Available"
+    orphaned = pvs[~available & (pvs["pv_phase"].isin(["Released", "Failed"])
+                                 | pd.Series(claim_missing, index=pvs.index, dtype=bool))]
+    unbound = pvs[available]
+    return volumes, orphaned, unbound
+
+@st.cache_data(show_spinner=False)
+def cached_storage_tables(snapshot_path, taken_at):
+    """Storage tables for a snapshot; recomputed only when a new snapshot is taken"""
+    with open(snapshot_path) as f:
+        return build_storage_tables(json.load(f))
+
+def format_bytes(value):
+    """Human-readable binary size"""
+    if value is None or pd.isna(value):
+        return ""
+    for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} PiB"
+
+def show_storage_utilization():
+    """PV/PVC utilization table with growth projection from cached snapshots"""
+    st.subheader("📈 Volume Utilization")
+    snapshot = load_storage_snapshot()
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        if st.button("🔄 Take Snapshot"):
+            with st.spinner("Collecting volumes and kubelet stats..."):
+                fresh = collect_storage_snapshot()
+            if fresh is None:
+                st.error("❌ Could not list storage resources")
+            else:
+                snapshot = save_storage_snapshot(fresh, snapshot)
+    if not snapshot:
+        st.info("No snapshot yet. Take one to build the utilization table; growth rates appear after two or more snapshots.")
+        return
+    with col2:
+        st.caption(f"Snapshot taken {datetime.fromtimestamp(snapshot['taken_at']).strftime('%Y-%m-%d %H:%M:%S')}")
+
+    volumes, orphaned, unbound = cached_storage_tables(storage_snapshot_path(), snapshot["taken_at"])
+    metric_cols = st.columns(5)
+    metric_cols[0].metric("PVCs", len(volumes))
+    metric_cols[1].metric("Total Capacity", format_bytes(volumes["capacity_bytes"].sum()))
+    metric_cols[2].metric("Total Used", format_bytes(volumes["used_bytes"].sum()))
+    metric_cols[3].metric("Orphaned PVs", len(orphaned))
+    metric_cols[4].metric("Unbound PVs", len(unbound))
+
+    threshold = st.slider("Highlight volumes full within (days):", min_value=1, max_value=90, value=14)
+    at_risk = volumes[volumes["days_to_full"] <= threshold]
+    if len(at_risk):
+        st.warning(f"⚠️ {len(at_risk)} volume(s) projected to fill within {threshold} days")
+
+    view = volumes.sort_values(["days_to_full", "used_pct"], ascending=[True, False], na_position="last").copy()
+    for column in ["capacity_bytes", "used_bytes", "growth_bytes_per_day"]:
+        view[column] = view[column].map(format_bytes)
+    st.dataframe(view, use_container_width=True)
+
+    if len(orphaned):
+        st.subheader("🗑️ Orphaned Persistent Volumes")
+        orphan_view = orphaned.copy()
+        orphan_view["pv_capacity_bytes"] = orphan_view["pv_capacity_bytes"].map(format_bytes)
+        st.dataframe(orphan_view, use_container_width=True)
+
+    if len(unbound):
+        st.subheader("📭 Unbound Persistent Volumes")
+        st.caption("Available PVs waiting for a claim")
+        unbound_view = unbound.copy()
+        unbound_view["pv_capacity_bytes"] = unbound_view["pv_capacity_bytes"].map(format_bytes)
+        st.dataframe(unbound_view, use_container_width=True)
 
 def show_k8s_blog():
     st.header("📖 Kubernetes Case Studies & Blog")
@@ -174,6 +1078,55 @@ spec:
             
         st.success(f"✅ {streaming_platform} deployment initiated!")
 
+def show_manifest_validator():
+    st.header("✅ Offline Manifest Validator")
+    st.markdown("Validate manifests against bundled Kubernetes schemas without contacting a cluster.")
+    
+    kinds = k8s_validator.supported_kinds()
+    with st.expander(f"Bundled schemas ({len(kinds)} kinds)"):
+        st.write(", ".join(f"{kind} ({'/'.join(versions)})" for kind, versions in sorted(kinds.items())))
+    
+    source = st.radio("Source:", ["Paste YAML", "Directory / File Path"], horizontal=True)
+    
+    if source == "Paste YAML":
+        pasted = st.text_area("Manifest YAML:", height=250)
+        if st.button("Validate YAML"):
+            if pasted.strip():
+                started = time.perf_counter()
+                count, rows = k8s_validator.validate_text(pasted)
+                elapsed = time.perf_counter() - started
+                show_validation_results({"files": 1, "documents": count, "errors": len(rows), "elapsed_s": elapsed,
+                                         "docs_per_s": count / elapsed if elapsed > 0 else 0.0, "rows": rows})
+            else:
+                st.warning("Please paste a YAML manifest")
+    else:
+        root = st.text_input("Path to manifests:", "./k8s")
+        workers = st.number_input("Worker processes (0 = all CPUs):", min_value=0, max_value=64, value=0)
+        if st.button("Validate Path"):
+            if os.path.exists(root):
+                paths = k8s_validator.find_manifests(root)
+                if paths:
+                    with st.spinner(f"Validating {len(paths)} files..."):
+                        show_validation_results(k8s_validator.validate_paths(paths, workers=workers or None))
+                else:
+                    st.info("No .yaml/.yml files found")
+            else:
+                st.error(f"❌ Path not found: {root}")
+
+def show_validation_results(summary):
+    """Render validator summary metrics and error table"""
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Files", summary["files"])
+    col2.metric("Documents", summary["documents"])
+    col3.metric("Errors", summary["errors"])
+    col4.metric("Docs/sec", f"{summary['docs_per_s']:,.0f}")
+    if summary["rows"]:
+        df = pd.DataFrame(summary["rows"])
+        st.dataframe(df[["file", "line", "kind", "name", "path", "message"]], use_container_width=True)
+        st.download_button("📥 Download Report (CSV)", df.to_csv(index=False), file_name="manifest_validation.csv", mime="text/csv")
+    else:
+        st.success(f"✅ All manifests valid ({summary['elapsed_s']*1000:.0f} ms)")
+
 def show_home():
     st.header("☸️ Kubernetes Automation")
     st.markdown("""
@@ -216,6 +1169,7 @@ def run():
                 "🔧 Cluster Management", 
                 "📊 Resource Monitoring", 
                 "🛠️ YAML Generator", 
+                "✅ Manifest Validator",
                 "🔍 Resource Explorer",
                 "🔐 Security & RBAC",
                 "🌐 Networking",
@@ -246,13 +1200,11 @@ def run():
         
         with col1:
             if st.button("🔍 Get Cluster Info"):
-                cluster_info = run_kubectl_command("kubectl cluster-info")
-                st.code(cluster_info)
+                capture_kubectl_output("k8s_cluster_output", "kubectl cluster-info")
         
         with col2:
             if st.button("📋 Get Nodes"):
-                nodes = run_kubectl_command("kubectl get nodes -o wide")
-                st.code(nodes)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get nodes -o wide")
 
         st.markdown("---")
         
@@ -262,23 +1214,19 @@ def run():
         
         with pod_cols[0]:
             if st.button("📦 List All Pods"):
-                pods = run_kubectl_command("kubectl get pods --all-namespaces")
-                st.code(pods)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get pods --all-namespaces")
         
         with pod_cols[1]:
             if st.button("🔄 List Running Pods"):
-                running_pods = run_kubectl_command("kubectl get pods --field-selector=status.phase=Running")
-                st.code(running_pods)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get pods --field-selector=status.phase=Running")
         
         with pod_cols[2]:
             if st.button("⚠️ List Failed Pods"):
-                failed_pods = run_kubectl_command("kubectl get pods --field-selector=status.phase=Failed")
-                st.code(failed_pods)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get pods --field-selector=status.phase=Failed")
         
         with pod_cols[3]:
             if st.button("🔄 List Pending Pods"):
-                pending_pods = run_kubectl_command("kubectl get pods --field-selector=status.phase=Pending")
-                st.code(pending_pods)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get pods --field-selector=status.phase=Pending")
 
         # Service Management
         st.subheader("Service Management")
@@ -286,18 +1234,15 @@ def run():
         
         with service_cols[0]:
             if st.button("🌐 List Services"):
-                services = run_kubectl_command("kubectl get services")
-                st.code(services)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get services")
         
         with service_cols[1]:
             if st.button("🔗 List Endpoints"):
-                endpoints = run_kubectl_command("kubectl get endpoints")
-                st.code(endpoints)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get endpoints")
         
         with service_cols[2]:
             if st.button("🔧 List Ingress"):
-                ingress = run_kubectl_command("kubectl get ingress")
-                st.code(ingress)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get ingress")
 
         # Deployment Management
         st.subheader("Deployment Management")
@@ -305,23 +1250,21 @@ def run():
         
         with deploy_cols[0]:
             if st.button("🚀 List Deployments"):
-                deployments = run_kubectl_command("kubectl get deployments")
-                st.code(deployments)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get deployments")
         
         with deploy_cols[1]:
             if st.button("📊 List ReplicaSets"):
-                replicasets = run_kubectl_command("kubectl get replicasets")
-                st.code(replicasets)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get replicasets")
         
         with deploy_cols[2]:
             if st.button("⚙️ List DaemonSets"):
-                daemonsets = run_kubectl_command("kubectl get daemonsets")
-                st.code(daemonsets)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get daemonsets")
         
         with deploy_cols[3]:
             if st.button("🎯 List StatefulSets"):
-                statefulsets = run_kubectl_command("kubectl get statefulsets")
-                st.code(statefulsets)
+                capture_kubectl_output("k8s_cluster_output", "kubectl get statefulsets")
+
+        output_viewer.show("k8s_cluster_output")
 
         # Quick Actions
         st.subheader("Quick Actions")
@@ -331,10 +1274,14 @@ def run():
             st.write("**Scale Deployment**")
             deployment_name = st.text_input("Deployment Name:", key="scale_deploy")
             replicas = st.number_input("Replicas:", min_value=0, max_value=100, value=3, key="replicas")
+            scale_namespace = st.text_input("Namespace:", "default", key="scale_ns")
+            watch_scale = st.checkbox("Watch rollout", value=True, key="scale_watch")
             if st.button("Scale", key="scale_btn"):
                 if deployment_name:
-                    result = run_kubectl_command(f"kubectl scale deployment {deployment_name} --replicas={replicas}")
+                    result = run_kubectl_command(f"kubectl scale deployment {deployment_name} -n {scale_namespace} --replicas={replicas}")
                     st.code(result)
+                    if watch_scale and not result.startswith("Error"):
+                        show_rollout_watch(deployment_name, scale_namespace)
         
         with action_cols[1]:
             st.write("**Delete Resource**")
@@ -348,10 +1295,14 @@ def run():
         with action_cols[2]:
             st.write("**Restart Deployment**")
             restart_deployment = st.text_input("Deployment Name:", key="restart_deploy")
+            restart_namespace = st.text_input("Namespace:", "default", key="restart_ns")
+            watch_restart = st.checkbox("Watch rollout", value=True, key="restart_watch")
             if st.button("Restart", key="restart_btn"):
                 if restart_deployment:
-                    result = run_kubectl_command(f"kubectl rollout restart deployment/{restart_deployment}")
+                    result = run_kubectl_command(f"kubectl rollout restart deployment/{restart_deployment} -n {restart_namespace}")
                     st.code(result)
+                    if watch_restart and not result.startswith("Error"):
+                        show_rollout_watch(restart_deployment, restart_namespace)
 
     elif page == "📊 Resource Monitoring":
         st.header("📊 Resource Monitoring")
@@ -361,23 +1312,21 @@ def run():
         
         with monitor_cols[0]:
             if st.button("📈 Node Resource Usage"):
-                node_usage = run_kubectl_command("kubectl top nodes")
-                st.code(node_usage)
+                capture_kubectl_output("k8s_monitor_output", "kubectl top nodes")
         
         with monitor_cols[1]:
             if st.button("📊 Pod Resource Usage"):
-                pod_usage = run_kubectl_command("kubectl top pods")
-                st.code(pod_usage)
+                capture_kubectl_output("k8s_monitor_output", "kubectl top pods")
         
         with monitor_cols[2]:
             if st.button("🔍 Cluster Events"):
-                events = run_kubectl_command("kubectl get events --sort-by=.metadata.creationTimestamp")
-                st.code(events)
+                capture_kubectl_output("k8s_monitor_output", "kubectl get events --sort-by=.metadata.creationTimestamp")
         
         with monitor_cols[3]:
             if st.button("⚠️ Problem Pods"):
-                problem_pods = run_kubectl_command("kubectl get pods --all-namespaces | grep -v Running | grep -v Completed")
-                st.code(problem_pods)
+                capture_kubectl_output("k8s_monitor_output", "kubectl get pods --all-namespaces | grep -v Running | grep -v Completed")
+
+        output_viewer.show("k8s_monitor_output")
 
         # Logs and Debugging
         st.subheader("Logs and Debugging")
@@ -388,8 +1337,7 @@ def run():
             log_pod_name = st.text_input("Pod Name:", key="log_pod")
             if st.button("Get Logs", key="get_logs"):
                 if log_pod_name:
-                    logs = run_kubectl_command(f"kubectl logs {log_pod_name}")
-                    st.text_area("Pod Logs:", logs, height=200)
+                    capture_kubectl_output("k8s_debug_output", f"kubectl logs {log_pod_name}")
         
         with log_cols[1]:
             st.write("**Describe Resource**")
@@ -397,8 +1345,9 @@ def run():
             desc_resource_name = st.text_input("Resource Name:", key="desc_name")
             if st.button("Describe", key="desc_btn"):
                 if desc_resource_name:
-                    description = run_kubectl_command(f"kubectl describe {desc_resource_type} {desc_resource_name}")
-                    st.text_area("Resource Description:", description, height=200)
+                    capture_kubectl_output("k8s_debug_output", f"kubectl describe {desc_resource_type} {desc_resource_name}")
+
+        output_viewer.show("k8s_debug_output")
 
     elif page == "🛠️ YAML Generator":
         st.header("🛠️ YAML Generator")
@@ -423,36 +1372,13 @@ def run():
             dep_image = st.text_input("Container Image:", "nginx:latest")
             dep_replicas = st.number_input("Replicas:", min_value=1, max_value=10, value=3)
             dep_port = st.number_input("Container Port:", min_value=1, max_value=65535, value=80)
+            with_service = st.checkbox("Also generate a matching Service", value=True)
             
             if st.button("Generate Deployment YAML"):
-                deployment_yaml = f"""
-apiVersion: apps/v1
-kind: Deployment
-metadata:
-  name: {dep_name}
-  labels:
-    app: {dep_name}
-spec:
-  replicas: {dep_replicas}
-  selector:
-    matchLabels:
-      app: {dep_name}
-  template:
-    metadata:
-      labels:
-        app: {dep_name}
-    spec:
-      containers:
-      - name: {dep_name}
-        image: {dep_image}
-        ports:
-        - containerPort: {dep_port}
-"""
-                st.code(deployment_yaml, language="yaml")
-                
-                if st.button("Apply This YAML"):
-                    result = apply_yaml_content(deployment_yaml, f"{dep_name}-deployment")
-                    st.code(result)
+                objects = [build_deployment_manifest(dep_name, dep_image, dep_replicas, dep_port)]
+                if with_service:
+                    objects.append(build_service_manifest(f"{dep_name}-service", dep_name, dep_port, dep_port, "ClusterIP"))
+                st.session_state.k8s_generated_yaml = yaml.safe_dump_all(objects, sort_keys=False)
         
         elif yaml_type == "Service":
             st.subheader("Generate Service YAML")
@@ -463,36 +1389,55 @@ spec:
             svc_type = st.selectbox("Service Type:", ["ClusterIP", "NodePort", "LoadBalancer"])
             
             if st.button("Generate Service YAML"):
-                service_yaml = f"""
-apiVersion: v1
-kind: Service
-metadata:
-  name: {svc_name}
-spec:
-  selector:
-    app: {svc_app}
-  ports:
-  - port: {svc_port}
-    targetPort: {svc_target_port}
-  type: {svc_type}
-"""
-                st.code(service_yaml, language="yaml")
-                
-                if st.button("Apply This YAML"):
-                    result = apply_yaml_content(service_yaml, f"{svc_name}-service")
-                    st.code(result)
+                service = build_service_manifest(svc_name, svc_app, svc_port, svc_target_port, svc_type)
+                st.session_state.k8s_generated_yaml = yaml.safe_dump(service, sort_keys=False)
+        
+        # Apply options shared by generated and custom manifests
+        st.subheader("Apply Options")
+        opt_cols = st.columns(3)
+        with opt_cols[0]:
+            apply_dry_run = st.checkbox("Dry-run diff only", value=False)
+        with opt_cols[1]:
+            apply_workers = st.slider("Concurrent applies:", min_value=1, max_value=32, value=8)
+        with opt_cols[2]:
+            if st.button("🧹 Clear Diff Cache"):
+                clear_apply_cache()
+                st.success("Diff cache cleared")
+        
+        generated_yaml = st.session_state.get("k8s_generated_yaml")
+        if generated_yaml:
+            st.code(generated_yaml, language="yaml")
+            _, generated_errors = k8s_validator.validate_text(generated_yaml)
+            for error in generated_errors:
+                st.warning(f"⚠️ line {error['line']}: {error['path']} - {error['message']}")
+            if st.button("Apply This YAML"):
+                with st.spinner("Applying manifests..."):
+                    show_apply_report(apply_manifests(generated_yaml, dry_run=apply_dry_run, max_workers=apply_workers))
         
         # Custom YAML Editor
         st.subheader("Custom YAML Editor")
         custom_yaml = st.text_area("Enter your YAML manifest:", height=200)
         
+        skip_validation = st.checkbox("Skip offline validation", value=False)
+        
         if st.button("Apply Custom YAML"):
             if custom_yaml.strip():
-                result = apply_yaml_content(custom_yaml, "custom-manifest")
-                st.code(result)
+                _, validation_errors = k8s_validator.validate_text(custom_yaml)
+                if validation_errors and not skip_validation:
+                    st.error(f"❌ {len(validation_errors)} validation error(s) - nothing was applied")
+                    st.dataframe(pd.DataFrame(validation_errors), use_container_width=True)
+                else:
+                    try:
+                        with st.spinner("Applying manifests..."):
+                            show_apply_report(apply_manifests(custom_yaml, dry_run=apply_dry_run, max_workers=apply_workers))
+                    except yaml.YAMLError as e:
+                        st.error(f"❌ Invalid YAML: {str(e)}")
             else:
                 st.warning("Please enter a YAML manifest")
 
+    elif page == "✅ Manifest Validator":
+        show_manifest_validator()
+
     elif page == "🔍 Resource Explorer":
         st.header("🔍 Resource Explorer")
         
@@ -856,6 +1801,8 @@ spec:
     elif page == "💾 Storage Management":
         st.header("💾 Storage Management")
         
+        show_storage_utilization()
+        
         # Storage Overview
         st.subheader("Storage Resources")
         storage_cols = st.columns(4)
@@ -957,11 +1904,28 @@ spec:
                 st.write("Feature coming soon.")
         
         with node_cols[2]:
-            if st.button("⚙️ Drain Node"):
-                node_name = st.text_input("Node Name:", "my-node")
-                if node_name and st.button("Drain"):
-                    result = run_kubectl_command(f"kubectl drain {node_name} --ignore-daemonsets")
-                    st.code(result)
+            st.write("**⚙️ Drain Nodes**")
+            drain_input = st.text_input("Node Names (comma-separated):", "my-node")
+            drain_concurrency = st.number_input("Parallel evictions:", min_value=1, max_value=50, value=5)
+            drain_timeout = st.number_input("Timeout (seconds):", min_value=30, max_value=3600, value=600)
+            if st.button("Drain"):
+                drain_targets = [n.strip() for n in drain_input.split(",") if n.strip()]
+                if drain_targets:
+                    drain_progress = st.progress(0.0, text="Cordoning nodes...")
+
+                    def on_evicted(outcome, done, total):
+                        drain_progress.progress(done / max(total, 1), text=f"{done}/{total} pods - last: {outcome['namespace']}/{outcome['pod']} {outcome['status']}")
+
+                    drain = drain_nodes(drain_targets, concurrency=drain_concurrency, timeout=drain_timeout, on_event=on_evicted)
+                    drain_progress.progress(1.0, text=f"Drain finished in {drain['elapsed_s']}s")
+                    for error in drain["errors"]:
+                        st.error(f"❌ {error['node']}: {error['step']} failed" + (f" - {error['output']}" if error["output"] else ""))
+                    if drain["results"]:
+                        drain_df = pd.DataFrame(drain["results"])
+                        st.dataframe(drain_df.drop(columns=["output"]), use_container_width=True)
+                        st.write(drain_df.groupby(["node", "status"]).size().rename("pods"))
+                    elif not drain["errors"]:
+                        st.info("No evictable pods found on the selected nodes")
 
         # Cluster Autoscaler
         st.subheader("Cluster Autoscaler")
@@ -1010,9 +1974,7 @@ spec:
             helm_install = run_kubectl_command("curl https://raw.githubusercontent.com/helm/helm/master/scripts/get-helm-3 | bash")
             st.code(helm_install)
         
-        if st.button("List Helm Releases"):
-            releases = run_kubectl_command("helm list --all-namespaces")
-            st.code(releases)
+        show_helm_inventory()
 
         # Sample Helm Chart Deployment
         st.subheader("Deploy Sample Helm Chart")
@@ -1,12 +1,17 @@
 import streamlit as st
 import subprocess
 import os
+import re
 import json
+import time
 import psutil
 import platform
+import pandas as pd
+import plotly.express as px
 from pathlib import Path
 import requests
 import webbrowser
+from modules import metrics_sampler, metrics_store, desktop_index, disk_usage, log_explorer, fleet
 
 def run():
     """Main function to run the Linux module"""
@@ -19,11 +24,15 @@ def run():
     
     tool_category = st.sidebar.selectbox(
         "Select Category:",
-        ["📊 System Analysis", "🖥️ GUI Analysis", "🎨 Icon Management", "💻 Terminal Enhancement", "📱 Communication", "📝 Documentation"]
+        ["📊 System Analysis", "📜 Log Explorer", "🛰️ Fleet Overview", "🖥️ GUI Analysis", "🎨 Icon Management", "💻 Terminal Enhancement", "📱 Communication", "📝 Documentation"]
     )
     
     if tool_category == "📊 System Analysis":
         show_system_analysis()
+    elif tool_category == "📜 Log Explorer":
+        show_log_explorer()
+    elif tool_category == "🛰️ Fleet Overview":
+        show_fleet_overview()
     elif tool_category == "🖥️ GUI Analysis":
         show_gui_analysis()
     elif tool_category == "🎨 Icon Management":
@@ -52,59 +61,358 @@ def show_system_analysis():
         st.write(f"Machine: {platform.machine()}")
         st.write(f"Processor: {platform.processor()}")
     
+    sampler = metrics_sampler.get_sampler()
+    metrics = sampler.latest()
+    
     with col2:
         st.write("**System Resources:**")
         # CPU Info
-        cpu_percent = psutil.cpu_percent(interval=1)
-        st.write(f"CPU Usage: {cpu_percent}%")
+        st.write(f"CPU Usage: {metrics['cpu.percent']:.1f}%")
         
         # Memory Info
-        memory = psutil.virtual_memory()
-        st.write(f"Memory Usage: {memory.percent}%")
-        st.write(f"Available Memory: {memory.available / (1024**3):.2f} GB")
+        st.write(f"Memory Usage: {metrics['mem.percent']}%")
+        st.write(f"Available Memory: {metrics['mem.available_bytes'] / (1024**3):.2f} GB")
         
         # Disk Info
-        disk = psutil.disk_usage('/')
-        st.write(f"Disk Usage: {disk.percent}%")
-        st.write(f"Free Disk: {disk.free / (1024**3):.2f} GB")
+        st.write(f"Disk Usage: {metrics['disk.percent']}%")
+        st.write(f"Free Disk: {metrics['disk.free_bytes'] / (1024**3):.2f} GB")
+    
+    # Resource history from the background sampler
+    st.subheader("📈 Resource History")
+    history_window = st.select_slider("Window:", options=[60, 300, 600], value=300, format_func=lambda s: f"{s // 60} min" if s >= 60 else f"{s}s")
+    st.line_chart(sampler.frame(["cpu.percent", "mem.percent", "swap.percent"], seconds=history_window))
+    core_names = [name for name in sampler.names() if name.startswith("cpu.core")]
+    if core_names:
+        with st.expander(f"Per-core CPU ({len(core_names)} cores)"):
+            st.line_chart(sampler.frame(sorted(core_names, key=lambda n: int(n[8:].split(".")[0])), seconds=history_window))
+    
+    # Long-range history persisted by the metrics store
+    st.subheader("🗄️ Stored History")
+    store = metrics_store.get_store()
+    stored_ranges = {"1 hour": 3600, "6 hours": 6 * 3600, "24 hours": 86400, "7 days": 7 * 86400, "30 days": 30 * 86400}
+    stored_cols = st.columns([1, 2])
+    with stored_cols[0]:
+        stored_range = st.selectbox("Range:", list(stored_ranges), index=2)
+        stored_stat = st.radio("Rollup value:", ["avg", "max", "min"], horizontal=True,
+                               help="Ranges beyond 24 hours use 1-minute rollups")
+    with stored_cols[1]:
+        stored_metrics = st.multiselect("Metrics:", [name for name in sampler.names() if not name.startswith("cpu.core")],
+                                        default=["cpu.percent", "mem.percent"])
+    if stored_metrics:
+        stored_history = store.frame(stored_metrics, stored_ranges[stored_range], column=stored_stat)
+        if stored_history.empty:
+            st.info("No stored samples for this range yet.")
+        else:
+            st.line_chart(stored_history)
+        usage = store.disk_usage()
+        st.caption(f"Store size: raw {usage['raw'] / 1024**2:.1f} MB, 1-minute rollups {usage['1m'] / 1024**2:.1f} MB")
+    
+    show_disk_usage_analyzer()
     
     # Process Analysis
     st.subheader("📋 Process Analysis")
     
-    if st.button("🔄 Refresh Process List"):
-        try:
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    processes.append(proc.info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-            
-            # Sort by CPU usage
-            processes.sort(key=lambda x: x['cpu_percent'], reverse=True)
-            
-            st.write("**Top 10 Processes by CPU Usage:**")
-            for i, proc in enumerate(processes[:10], 1):
-                st.write(f"{i}. {proc['name']} (PID: {proc['pid']}) - CPU: {proc['cpu_percent']:.1f}%")
-                
-        except Exception as e:
-            st.error(f"Error getting process list: {str(e)}")
+    process_sampler = metrics_sampler.get_process_sampler()
+    proc_cols = st.columns([2, 1, 1])
+    with proc_cols[0]:
+        sort_key = st.selectbox("Rank processes by:", ["cpu", "memory", "io"], format_func=lambda k: {"cpu": "CPU", "memory": "Memory (RSS)", "io": "Disk I/O"}[k])
+    with proc_cols[1]:
+        top_n = st.number_input("Show top:", min_value=5, max_value=100, value=10)
+    with proc_cols[2]:
+        st.button("🔄 Refresh Process List")
+    
+    top_processes = process_sampler.top(top_n, by=sort_key)
+    if not top_processes:
+        st.info("Process sampler is warming up - refresh in a couple of seconds.")
+    else:
+        if not all(p["warm"] for p in top_processes):
+            st.caption("CPU and I/O rates need two samples; new processes show 0 until the next sample.")
+        st.write(f"**Top {len(top_processes)} of {process_sampler.count()} processes** "
+                 f"(sampled in {process_sampler.last_sample_s * 1000:.0f} ms)")
+        proc_df = pd.DataFrame(top_processes).drop(columns=["key", "warm"])
+        proc_df["rss_mb"] = (proc_df.pop("rss_bytes") / (1024**2)).round(1)
+        proc_df["io_kb_per_s"] = (proc_df.pop("io_bytes_per_s") / 1024).round(1)
+        st.dataframe(proc_df, use_container_width=True, hide_index=True)
+        
+        history_pid = st.selectbox("Process history:", [p["pid"] for p in top_processes],
+                                   format_func=lambda pid: next(f"{p['name']} (PID: {pid})" for p in top_processes if p["pid"] == pid))
+        history = process_sampler.process_history(history_pid)
+        if history:
+            history_df = pd.DataFrame(history, columns=["time", "CPU %", "RSS bytes"])
+            history_df["time"] = pd.to_datetime(history_df["time"], unit="s")
+            history_df["RSS MB"] = history_df.pop("RSS bytes") / (1024**2)
+            st.line_chart(history_df.set_index("time"))
     
     # Network Analysis
+    show_network_analysis(sampler)
+
+def show_network_analysis(sampler):
+    """Show per-interface rates and aggregated connection counts from the background samplers"""
     st.subheader("🌐 Network Analysis")
     
+    metrics = sampler.latest()
+    # Interface names may contain dots (VLAN subinterfaces like eth0.100); the metric suffix never does
+    nics = sorted({name[len("net.nic."):].rsplit(".", 1)[0] for name in metrics if name.startswith("net.nic.")})
+    if nics:
+        nic_rows = []
+        for nic in nics:
+            prefix = f"net.nic.{nic}"
+            nic_rows.append({
+                "interface": nic,
+                "recv KB/s": round(metrics.get(f"{prefix}.recv_bytes_per_s", 0) / 1024, 1),
+                "sent KB/s": round(metrics.get(f"{prefix}.sent_bytes_per_s", 0) / 1024, 1),
+                "recv pkt/s": round(metrics.get(f"{prefix}.recv_packets_per_s", 0), 1),
+                "sent pkt/s": round(metrics.get(f"{prefix}.sent_packets_per_s", 0), 1),
+                "errors/s": round(metrics.get(f"{prefix}.errors_per_s", 0), 2),
+                "drops/s": round(metrics.get(f"{prefix}.drops_per_s", 0), 2),
+            })
+        st.dataframe(pd.DataFrame(nic_rows), use_container_width=True, hide_index=True)
+        
+        nic = st.selectbox("Interface history:", nics)
+        nic_history = sampler.frame([f"net.nic.{nic}.recv_bytes_per_s", f"net.nic.{nic}.sent_bytes_per_s"], seconds=300)
+        if not nic_history.empty:
+            st.line_chart((nic_history / 1024).rename(columns=lambda name: name.split(".")[-1].replace("bytes_per_s", "KB/s")))
+    else:
+        st.info("Interface rates need two samples - refresh in a second.")
+    
+    connection_sampler = metrics_sampler.get_connection_sampler()
+    connections = connection_sampler.latest()
+    if connections is None:
+        st.info("Connection sampler is warming up - refresh in a few seconds.")
+        return
+    
+    st.write(f"**Sockets:** {connections['total']} "
+             f"(aggregated in {connections['elapsed_s'] * 1000:.0f} ms, every {connection_sampler.interval:.0f}s in the background)")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.write("**By state:**")
+        st.bar_chart(pd.Series(connections["by_state"], name="sockets"))
+    with col2:
+        st.write("**By local port:**")
+        st.dataframe(pd.DataFrame(connections["by_local_port"], columns=["port", "sockets"]), use_container_width=True, hide_index=True)
+    with col3:
+        st.write("**By remote peer:**")
+        st.dataframe(pd.DataFrame(connections["by_remote"], columns=["peer", "sockets"]), use_container_width=True, hide_index=True)
+    
+    connection_history = sampler.frame(["net.connections.established", "net.connections.time_wait", "net.connections.close_wait"], seconds=600)
+    if not connection_history.empty:
+        st.line_chart(connection_history.rename(columns=lambda name: name.split(".")[-1]))
+
+def format_size(num_bytes):
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if abs(num_bytes) < 1024 or unit == "TB":
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+def show_disk_usage_analyzer():
+    """Show a du-style breakdown of a directory tree as a treemap"""
+    st.subheader("💽 Disk Usage Analyzer")
+    
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        du_root = st.text_input("Directory to analyze:", value="/")
+    with col2:
+        du_depth = st.number_input("Treemap depth:", min_value=1, max_value=6, value=3)
+    with col3:
+        du_full = st.checkbox("Full rescan", help="Ignore cached listings (picks up files that grew in place)")
+    
+    scanner = disk_usage.get_scanner()
+    if st.button("🔍 Analyze Disk Usage"):
+        if not os.path.isdir(du_root):
+            st.error(f"Not a directory: {du_root}")
+        else:
+            progress = st.empty()
+            with st.spinner(f"Scanning {du_root}..."):
+                result = scanner.scan(du_root, use_cache=not du_full,
+                                      on_progress=lambda done, listed: progress.caption(f"{done} directories scanned, {listed} listed"))
+            progress.empty()
+            st.session_state.disk_usage_result = result
+    
+    result = st.session_state.get("disk_usage_result")
+    if result is None:
+        return
+    
+    st.write(f"**{result.root}**: {format_size(result.total_size)} in {len(result.dirs)} directories "
+             f"(scanned in {result.elapsed:.2f}s, {result.listed} directories re-listed)")
+    treemap = result.treemap_frame(max_depth=du_depth)
+    treemap["size_label"] = treemap["size"].map(format_size)
+    fig = px.treemap(treemap, ids="id", names="label", parents="parent", values="size", color="kind",
+                     hover_data={"size_label": True, "size": False}, branchvalues="total",
+                     color_discrete_map={"dir": "#667eea", "file": "#f5576c", "other": "#b0b0b0"})
+    fig.update_layout(margin=dict(t=10, l=0, r=0, b=0), height=550)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Largest directories:**")
+        largest_dirs = result.largest_dirs(15)
+        largest_dirs["size"] = largest_dirs["size"].map(format_size)
+        st.dataframe(largest_dirs, use_container_width=True, hide_index=True)
+    with col2:
+        st.write("**Largest files:**")
+        largest_files = result.largest_files(15)
+        largest_files["size"] = largest_files["size"].map(format_size)
+        st.dataframe(largest_files, use_container_width=True, hide_index=True)
+
+def show_log_explorer():
+    """Browse and search log files under /var/log, including rotated .gz files"""
+    st.header("📜 Log Explorer")
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        log_root = st.text_input("Log directory:", value=log_explorer.LOG_ROOT)
+    with col2:
+        page_size = st.selectbox("Lines per page:", [50, 100, 200, 500], index=1)
+    
+    logs = log_explorer.list_logs(log_root)
+    if not logs:
+        st.warning(f"No readable log files under {log_root}")
+        return
+    
+    log_path = st.selectbox("Log file:", [log["path"] for log in logs],
+                            format_func=lambda path: next(f"{path} ({format_size(log['size'])})" for log in logs if log["path"] == path))
+    
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        query = st.text_input("Search:", placeholder="error, timeout, or a regex like 'sshd.*Failed'")
+    with col2:
+        use_regex = st.checkbox("Regex")
+    with col3:
+        ignore_case = st.checkbox("Ignore case", value=True)
+    
+    # Reset to the first page whenever the file or query changes
+    view_key = (log_path, query, use_regex, ignore_case, page_size)
+    if st.session_state.get("log_view_key") != view_key:
+        st.session_state.log_view_key = view_key
+        st.session_state.log_page = 0
+    
+    try:
+        if query:
+            search = log_explorer.search_log(log_path, query, regex=use_regex, ignore_case=ignore_case)
+            rows = search.page(st.session_state.log_page, page_size)
+            known = len(search.matches)
+            total_label = f"{known} matches" if search.done else f"{known}+ matches so far"
+            st.caption(f"{total_label} · scanned {format_size(search.scanned_bytes)}")
+            has_next = not search.done or known > (st.session_state.log_page + 1) * page_size
+        else:
+            log = log_explorer.open_log(log_path)
+            rows = log.read_lines(st.session_state.log_page * page_size, page_size)
+            has_next = len(rows) == page_size
+    except re.error as e:
+        st.error(f"Invalid regex: {e}")
+        return
+    except OSError as e:
+        st.error(f"Cannot read {log_path}: {e}")
+        return
+    
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 3])
+    with col1:
+        if st.button("⏮️ First", disabled=st.session_state.log_page == 0):
+            st.session_state.log_page = 0
+            st.rerun()
+    with col2:
+        if st.button("◀️ Prev", disabled=st.session_state.log_page == 0):
+            st.session_state.log_page -= 1
+            st.rerun()
+    with col3:
+        if st.button("Next ▶️", disabled=not has_next):
+            st.session_state.log_page += 1
+            st.rerun()
+    with col4:
+        if query and st.button("🔢 Count all matches"):
+            st.info(f"{search.count_all()} matching lines")
+        if not query and st.button("⏭️ Last page"):
+            total_lines = log_explorer.open_log(log_path).line_count()
+            st.session_state.log_page = max(0, (total_lines - 1) // page_size)
+            st.rerun()
+    
+    st.write(f"**Page {st.session_state.log_page + 1}**")
+    if rows:
+        st.dataframe(pd.DataFrame(rows, columns=["line", "text"]).assign(line=lambda df: df["line"] + 1),
+                     use_container_width=True, hide_index=True, height=min(35 * (len(rows) + 1), 700))
+    else:
+        st.info("No lines on this page.")
+
+def show_fleet_inventory_editor():
+    """Edit the shared fleet inventory (YAML) and return the parsed host list"""
+    with st.expander("📒 Fleet Inventory"):
+        inventory_text = st.text_area("Inventory (YAML):", value=fleet.load_inventory_text(), height=250)
+        if st.button("💾 Save Inventory"):
+            try:
+                fleet.save_inventory_text(inventory_text)
+                st.success("Inventory saved")
+            except ValueError as e:
+                st.error(str(e))
     try:
-        # Network interfaces
-        net_io = psutil.net_io_counters()
-        st.write(f"Bytes Sent: {net_io.bytes_sent / (1024**2):.2f} MB")
-        st.write(f"Bytes Received: {net_io.bytes_recv / (1024**2):.2f} MB")
+        return fleet.load_inventory()
+    except ValueError as e:
+        st.error(f"Inventory error: {e}")
+        return []
+
+def show_fleet_overview():
+    """Run the system analysis probe across the fleet and merge results into one table"""
+    st.header("🛰️ Fleet Overview")
+    st.markdown("Runs a system probe on every inventory host in parallel over persistent, multiplexed SSH connections.")
+    
+    hosts = show_fleet_inventory_editor()
+    if not hosts:
+        return
+    
+    all_groups = sorted({group for host in hosts for group in host["groups"]})
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        groups = st.multiselect("Groups (empty = all hosts):", all_groups)
+    with col2:
+        probe_timeout = st.number_input("Per-host timeout (s):", min_value=1, max_value=300, value=15)
+    with col3:
+        max_parallel = st.number_input("Parallel hosts:", min_value=1, max_value=512, value=fleet.DEFAULT_PARALLEL)
+    targets = fleet.select_hosts(hosts, groups=groups)
+    st.caption(f"{len(targets)} of {len(hosts)} hosts selected")
+    
+    if st.button("🛰️ Probe Fleet") and targets:
+        executor = fleet.get_executor()
+        progress = st.progress(0.0)
+        table = st.empty()
+        rows = []
+        last_render = [0.0]
         
-        # Network connections
-        connections = psutil.net_connections()
-        st.write(f"Active Connections: {len(connections)}")
+        def on_result(row, done, total):
+            rows.append(row)
+            progress.progress(done / total, text=f"{done}/{total} hosts")
+            if time.monotonic() - last_render[0] > 0.25 or done == total:
+                last_render[0] = time.monotonic()
+                table.dataframe(fleet_probe_frame(rows), use_container_width=True, hide_index=True)
         
-    except Exception as e:
-        st.error(f"Error getting network info: {str(e)}")
+        executor.probe(targets, timeout=probe_timeout, on_result=on_result, max_parallel=max_parallel)
+        st.session_state.fleet_probe_rows = rows
+        table.empty()
+    
+    rows = st.session_state.get("fleet_probe_rows")
+    if rows:
+        frame = fleet_probe_frame(rows)
+        failed = frame[~frame["success"]]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Hosts OK", int(frame["success"].sum()))
+        with col2:
+            st.metric("Failed", len(failed))
+        with col3:
+            st.metric("Max Disk %", f"{frame['disk_percent'].max():.0f}" if "disk_percent" in frame else "-")
+        with col4:
+            st.metric("Slowest Host", f"{frame['duration_s'].max():.1f}s")
+        st.dataframe(frame, use_container_width=True, hide_index=True)
+        if not failed.empty:
+            with st.expander(f"❌ {len(failed)} failed hosts"):
+                st.dataframe(failed[["host", "exit_code", "error"]], use_container_width=True, hide_index=True)
+
+def fleet_probe_frame(rows):
+    columns = ["host", "success", "hostname", "kernel", "cpus", "load1", "load5", "mem_percent", "disk_percent",
+               "uptime_h", "processes", "duration_s", "exit_code"]
+    frame = pd.DataFrame(rows).rename(columns={"stderr": "error"})
+    for column in columns:
+        if column not in frame:
+            frame[column] = None
+    return frame[columns + ["error"]].sort_values(["success", "host"], ascending=[True, True])
 
 def show_gui_analysis():
     """Show GUI program analysis tools"""
@@ -152,48 +460,44 @@ def show_icon_management():
     2. Edit the file and change the Icon= line to your new icon path.
     3. Update icon cache: `sudo gtk-update-icon-cache`.
     """)
+    index = desktop_index.get_index()
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.caption(f"Index: {index.file_count()} files under {', '.join(index.roots)}")
+    with col2:
+        if st.button("🔄 Refresh Index"):
+            rescanned, elapsed = index.refresh()
+            st.success(f"Rescanned {rescanned} changed directories in {elapsed:.2f}s")
+
     app_name = st.text_input("App name to search for .desktop file:")
+    fuzzy_desktop = st.checkbox("Fuzzy match", key="desktop_fuzzy")
     if st.button("Find .desktop file") and app_name:
-        found = False
-        for base in ["/usr/share/applications", os.path.expanduser("~/.local/share/applications")]:
-            for root, dirs, files in os.walk(base):
-                for file in files:
-                    if app_name.lower() in file.lower() and file.endswith('.desktop'):
-                        st.success(f"Found: {os.path.join(root, file)}")
-                        found = True
-        if not found:
+        entries = index.search(app_name, kind="desktop", fuzzy=fuzzy_desktop, limit=50)
+        if entries:
+            st.success(f"Found {len(entries)} .desktop files:")
+            st.dataframe(pd.DataFrame(entries)[["Name", "path", "Icon", "Exec"]], use_container_width=True)
+            for entry in entries[:10]:
+                icons = index.resolve_icon(entry["Icon"], limit=3)
+                if icons:
+                    st.write(f"🎨 {entry['Name'] or entry['file']}: {', '.join(icons)}")
+        else:
             st.warning("No .desktop file found.")
     
     # Find application icons
     st.subheader("🔍 Find Application Icons")
     
     app_name = st.text_input("Enter application name:", placeholder="firefox")
+    fuzzy_icons = st.checkbox("Fuzzy match", key="icon_fuzzy")
     
     if st.button("🔍 Find Icons"):
         if app_name:
             try:
-                found_icons = []
-                
-                # Search in common locations
-                search_paths = [
-                    "/usr/share/applications",
-                    "/usr/share/icons",
-                    "~/.local/share/applications",
-                    "~/.local/share/icons"
-                ]
-                
-                for path in search_paths:
-                    expanded_path = os.path.expanduser(path)
-                    if os.path.exists(expanded_path):
-                        for root, dirs, files in os.walk(expanded_path):
-                            for file in files:
-                                if app_name.lower() in file.lower():
-                                    found_icons.append(os.path.join(root, file))
+                found_icons = index.search(app_name, kind="icon", fuzzy=fuzzy_icons, limit=500)
                 
                 if found_icons:
                     st.success(f"Found {len(found_icons)} icon files:")
                     for icon in found_icons:
-                        st.write(f"📁 {icon}")
+                        st.write(f"📁 {icon['path']}")
                 else:
                     st.info("No icon files found for this application")
                     
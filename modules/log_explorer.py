@@ -0,0 +1,307 @@
+import os
+import re
+import gzip
+import mmap
+import bisect
+import threading
+from collections import OrderedDict
+import numpy as np
+
+LOG_ROOT = "/var/log"
+INDEX_CHUNK = 64 * 1024 * 1024
+CHECKPOINT_EVERY = 1024
+MAX_LINE_CHARS = 2000
+MAX_OPEN_FILES = 16
+MAX_SEARCHES = 32
+
+def list_logs(root=LOG_ROOT):
+    """[{path, size, mtime, compressed}] for readable files under root, newest first"""
+    logs = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False) and os.access(entry.path, os.R_OK):
+                            st = entry.stat()
+                            logs.append({"path": entry.path, "size": st.st_size, "mtime": st.st_mtime,
+                                         "compressed": entry.name.endswith(".gz")})
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return sorted(logs, key=lambda log: log["mtime"], reverse=True)
+
+def _decode(raw):
+    text = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+    return text if len(text) <= MAX_LINE_CHARS else text[:MAX_LINE_CHARS] + " …"
+
+class LogFile:
+    """Line-addressable view of a log file without reading it into memory.
+
+    Plain files are memory-mapped. A sparse line index holding the byte
+    offset of every CHECKPOINT_EVERY-th line is built lazily with vectorized
+    newline scans, only as far as a read or search has reached. It is kept
+    across reruns while the file only grows. Compressed (.gz) files are read
+    by streaming decompression with a resumable sequential reader.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.compressed = path.endswith(".gz")
+        self._lock = threading.RLock()
+        self._mm = None
+        self._file = None
+        self._stream = None
+        self._stream_line = 0
+        self._gz_lines = None
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self._checkpoints = [0]
+        self._lines_indexed = 0
+        self._indexed_to = 0
+        self._inode = None
+        self.size = 0
+
+    def refresh(self):
+        """Pick up appended data; rebuild the index if the file was truncated or rotated"""
+        with self._lock:
+            st = os.stat(self.path)
+            if st.st_ino != self._inode or st.st_size < self.size:
+                self.close()
+                self._reset()
+                self._gz_lines = None
+            self._inode = st.st_ino
+            if self.compressed or st.st_size == self.size and self._mm is not None:
+                self.size = st.st_size
+                return
+            self.size = st.st_size
+            if self._mm is not None:
+                self._mm.close()
+            if self._file is None:
+                self._file = open(self.path, "rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+
+    def close(self):
+        with self._lock:
+            for handle in (self._mm, self._file, self._stream):
+                if handle is not None:
+                    handle.close()
+            self._mm = self._file = self._stream = None
+
+    @property
+    def signature(self):
+        return (self.path, self._inode, self.size)
+
+    # ----- plain files -----
+    def _index_until(self, position=None, checkpoint=None):
+        """Extend the sparse line index until it covers a byte position or checkpoint number"""
+        while self._indexed_to < self.size:
+            if position is not None and self._indexed_to > position:
+                return
+            if checkpoint is not None and len(self._checkpoints) > checkpoint:
+                return
+            end = min(self._indexed_to + INDEX_CHUNK, self.size)
+            chunk = np.frombuffer(self._mm, dtype=np.uint8, count=end - self._indexed_to, offset=self._indexed_to)
+            newlines = np.flatnonzero(chunk == 10) + self._indexed_to
+            del chunk
+            line_numbers = self._lines_indexed + 1 + np.arange(len(newlines))
+            self._checkpoints.extend((newlines[line_numbers % CHECKPOINT_EVERY == 0] + 1).tolist())
+            self._lines_indexed += len(newlines)
+            self._indexed_to = end
+
+    def _line_number(self, position):
+        self._index_until(position=position)
+        j = bisect.bisect_right(self._checkpoints, position) - 1
+        return j * CHECKPOINT_EVERY + self._mm[self._checkpoints[j]:position].count(b"\n")
+
+    def _line_start(self, line):
+        self._index_until(checkpoint=line // CHECKPOINT_EVERY)
+        j = min(line // CHECKPOINT_EVERY, len(self._checkpoints) - 1)
+        position = self._checkpoints[j]
+        for _ in range(line - j * CHECKPOINT_EVERY):
+            newline = self._mm.find(b"\n", position)
+            if newline < 0:
+                return None
+            position = newline + 1
+        return position if position < self.size else None
+
+    def line_count(self):
+        """Total number of lines (builds the full index for plain files, streams .gz once)"""
+        with self._lock:
+            if self.compressed:
+                if self._gz_lines is None:
+                    with gzip.open(self.path, "rb") as f:
+                        self._gz_lines = sum(1 for _ in f)
+                return self._gz_lines
+            if not self.size:
+                return 0
+            self._index_until()
+            return self._lines_indexed + (0 if self._mm[self.size - 1:self.size] == b"\n" else 1)
+
+    def read_lines(self, start, count):
+        """[(line_number, text)] for `count` lines starting at 0-based `start`"""
+        with self._lock:
+            if self.compressed:
+                return self._read_gz(start, count)
+            if not self.size:
+                return []
+            position = self._line_start(start)
+            rows = []
+            while position is not None and len(rows) < count:
+                end = self._mm.find(b"\n", position)
+                end = self.size if end < 0 else end
+                rows.append((start + len(rows), _decode(self._mm[position:end])))
+                position = end + 1 if end + 1 < self.size else None
+            return rows
+
+    # ----- compressed files -----
+    def _read_gz(self, start, count):
+        if self._stream is None or start < self._stream_line:
+            if self._stream is not None:
+                self._stream.close()
+            self._stream = gzip.open(self.path, "rb")
+            self._stream_line = 0
+        rows = []
+        for raw in self._stream:
+            line = self._stream_line
+            self._stream_line += 1
+            if line >= start:
+                rows.append((line, _decode(raw)))
+                if len(rows) >= count:
+                    break
+        return rows
+
+class LogSearch:
+    """Resumable search over a LogFile.
+
+    Matches are found only as far as the requested page needs. The scan
+    position is kept, so the next page continues where the last one stopped
+    instead of re-scanning the file, and lines appended to a live log are
+    picked up from there too. One row is produced per matching line;
+    ^ and $ anchor at line boundaries, as they do for .gz files, which are
+    matched line by line.
+    """
+
+    def __init__(self, log, pattern, regex=False, ignore_case=True):
+        self.log = log
+        self.pattern = pattern
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        source = pattern if regex else re.escape(pattern)
+        self._literal = None if regex or ignore_case else pattern.encode()
+        self._regex = re.compile(source.encode(), flags)
+        self._inode = log.signature[1]
+        self._restart()
+
+    def _restart(self):
+        self.matches = []
+        self.done = False
+        self.scanned_bytes = 0
+        self._position = 0
+        self._size = self.log.size
+        self._gz = None
+        self._gz_line = 0
+
+    def _next_plain(self):
+        mm = self.log._mm
+        if mm is None or self._position >= self.log.size:
+            return None
+        if self._literal is not None:
+            start = mm.find(self._literal, self._position)
+        else:
+            match = self._regex.search(mm, self._position)
+            start = match.start() if match else -1
+        if start < 0:
+            # Resume from the start of an unterminated last line, which an append may complete
+            self._position = mm.rfind(b"\n", self._position, self.log.size) + 1 or self._position
+            self.scanned_bytes = self.log.size
+            return None
+        line_start = mm.rfind(b"\n", 0, start) + 1
+        line_end = mm.find(b"\n", start)
+        line_end = self.log.size if line_end < 0 else line_end
+        self._position = self.scanned_bytes = line_end + 1
+        return self.log._line_number(line_start), _decode(mm[line_start:line_end])
+
+    def _next_gz(self):
+        if self._gz is None:
+            self._gz = gzip.open(self.log.path, "rb")
+        for raw in self._gz:
+            line = self._gz_line
+            self._gz_line += 1
+            self.scanned_bytes += len(raw)
+            if self._regex.search(raw):
+                return line, _decode(raw)
+        self._gz.close()
+        return None
+
+    def fetch(self, wanted):
+        """Scan forward until at least `wanted` matches are known or the file is exhausted"""
+        with self.log._lock:
+            if not self.log.compressed and self.log._mm is None and self.log.size:
+                # The LogFile was closed (evicted from the open-file cache); reopen it
+                self.log.refresh()
+                if self.log.signature[1] != self._inode:
+                    self.done = True
+            if not self.log.compressed and self.log.signature[1] == self._inode:
+                if self.log.size < self._size:
+                    # Truncated in place: earlier matches and offsets no longer apply
+                    self._restart()
+                elif self.log.size > self._size:
+                    self._size = self.log.size
+                    self.done = False
+            while not self.done and len(self.matches) < wanted:
+                row = self._next_gz() if self.log.compressed else self._next_plain()
+                if row is None:
+                    self.done = True
+                else:
+                    self.matches.append(row)
+
+    def page(self, page, page_size):
+        """Matches for a 0-based page"""
+        self.fetch((page + 1) * page_size)
+        return self.matches[page * page_size:(page + 1) * page_size]
+
+    def count_all(self):
+        """Scan to the end and return the total number of matching lines"""
+        self.fetch(float("inf"))
+        return len(self.matches)
+
+_files = OrderedDict()
+_searches = OrderedDict()
+_cache_lock = threading.Lock()
+
+def open_log(path):
+    """Cached LogFile for a path, refreshed to the current file size"""
+    with _cache_lock:
+        log = _files.pop(path, None)
+        if log is None:
+            log = LogFile(path)
+        else:
+            log.refresh()
+        _files[path] = log
+        while len(_files) > MAX_OPEN_FILES:
+            evicted = _files.popitem(last=False)[1]
+            evicted.close()
+            # Searches are tied to their file's cache entry and go with it
+            for key in [key for key, search in _searches.items() if search.log is evicted]:
+                del _searches[key]
+        return log
+
+def search_log(path, pattern, regex=False, ignore_case=True):
+    """Cached resumable search for (file, inode, pattern, options); survives appends to the file"""
+    log = open_log(path)
+    key = (path, log.signature[1], pattern, regex, ignore_case)
+    with _cache_lock:
+        search = _searches.pop(key, None)
+        if search is None:
+            search = LogSearch(log, pattern, regex, ignore_case)
+        _searches[key] = search
+        while len(_searches) > MAX_SEARCHES:
+            _searches.popitem(last=False)
+        return search
@@ -0,0 +1,500 @@
+import os
+import time
+import json
+import socket
+import heapq
+import shutil
+import subprocess
+import threading
+from collections import deque, Counter
+import psutil
+import pandas as pd
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_HISTORY = 600
+PROCESS_INTERVAL = 2.0
+PROCESS_HISTORY = 30
+CONTAINER_INTERVAL = 15.0
+CONNECTION_INTERVAL = 5.0
+CONNECTION_TOP = 20
+PROCESS_ATTRS = ["pid", "name", "username", "create_time", "cpu_times", "memory_info", "memory_percent", "io_counters", "num_threads"]
+TOP_KEYS = {
+    "cpu": lambda p: p["cpu_percent"],
+    "memory": lambda p: p["rss_bytes"],
+    "io": lambda p: p["io_bytes_per_s"],
+}
+
+class MetricsSampler(threading.Thread):
+    """Background thread that samples host metrics into fixed-size ring buffers.
+
+    Pages read `latest()` and `history()` instead of calling psutil with a
+    blocking interval, so a rerun never waits on a measurement window.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, history=DEFAULT_HISTORY):
+        super().__init__(name="metrics-sampler", daemon=True)
+        self.interval = interval
+        self.size = history
+        self._lock = threading.Lock()
+        self._series = {}
+        self._latest = {}
+        self._listeners = []
+        self._stop_event = threading.Event()
+        self._prev_disk = None
+        self._prev_net = None
+        self._prev_nics = {}
+        self._prev_time = None
+        # Prime psutil's CPU counters so the first real sample is meaningful
+        psutil.cpu_percent(percpu=True)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception:
+                pass
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self):
+        """Stop sampling after the current interval"""
+        self._stop_event.set()
+
+    def sample(self):
+        """Take one sample of every metric and append it to the ring buffers"""
+        now = time.time()
+        per_core = psutil.cpu_percent(percpu=True)
+        memory = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        disk = psutil.disk_usage("/")
+        values = {
+            "cpu.percent": sum(per_core) / len(per_core) if per_core else 0.0,
+            "mem.percent": memory.percent,
+            "mem.used_bytes": memory.used,
+            "mem.available_bytes": memory.available,
+            "mem.total_bytes": memory.total,
+            "swap.percent": swap.percent,
+            "swap.used_bytes": swap.used,
+            "swap.total_bytes": swap.total,
+            "disk.percent": disk.percent,
+            "disk.used_bytes": disk.used,
+            "disk.free_bytes": disk.free,
+            "disk.free_percent": 100.0 - disk.percent,
+            "disk.total_bytes": disk.total,
+        }
+        for i, core in enumerate(per_core):
+            values[f"cpu.core{i}.percent"] = core
+
+        disk_io = psutil.disk_io_counters()
+        net_io = psutil.net_io_counters()
+        nic_io = psutil.net_io_counters(pernic=True)
+        if self._prev_time is not None:
+            elapsed = max(now - self._prev_time, 1e-6)
+            for nic, counters in nic_io.items():
+                previous = self._prev_nics.get(nic)
+                if previous is None:
+                    continue
+                prefix = f"net.nic.{nic}"
+                values[f"{prefix}.recv_bytes_per_s"] = max(counters.bytes_recv - previous.bytes_recv, 0) / elapsed
+                values[f"{prefix}.sent_bytes_per_s"] = max(counters.bytes_sent - previous.bytes_sent, 0) / elapsed
+                values[f"{prefix}.recv_packets_per_s"] = max(counters.packets_recv - previous.packets_recv, 0) / elapsed
+                values[f"{prefix}.sent_packets_per_s"] = max(counters.packets_sent - previous.packets_sent, 0) / elapsed
+                values[f"{prefix}.errors_per_s"] = max(counters.errin + counters.errout - previous.errin - previous.errout, 0) / elapsed
+                values[f"{prefix}.drops_per_s"] = max(counters.dropin + counters.dropout - previous.dropin - previous.dropout, 0) / elapsed
+            if disk_io and self._prev_disk:
+                values["disk.read_bytes_per_s"] = (disk_io.read_bytes - self._prev_disk.read_bytes) / elapsed
+                values["disk.write_bytes_per_s"] = (disk_io.write_bytes - self._prev_disk.write_bytes) / elapsed
+            if net_io and self._prev_net:
+                values["net.sent_bytes_per_s"] = (net_io.bytes_sent - self._prev_net.bytes_sent) / elapsed
+                values["net.recv_bytes_per_s"] = (net_io.bytes_recv - self._prev_net.bytes_recv) / elapsed
+        if net_io:
+            values["net.bytes_sent"] = net_io.bytes_sent
+            values["net.bytes_recv"] = net_io.bytes_recv
+        self._prev_disk, self._prev_net, self._prev_nics, self._prev_time = disk_io, net_io, nic_io, now
+
+        self.record(now, values)
+
+    def record(self, timestamp, values):
+        """Append a batch of values to their series and notify listeners"""
+        with self._lock:
+            for name, value in values.items():
+                series = self._series.get(name)
+                if series is None:
+                    series = self._series[name] = deque(maxlen=self.size)
+                series.append((timestamp, value))
+            self._latest.update(values)
+            self._latest["timestamp"] = timestamp
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(timestamp, values)
+            except Exception:
+                pass
+
+    def add_listener(self, callback):
+        """Register callback(timestamp, values) to run after every sample"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Unregister a sample listener"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def latest(self):
+        """Most recent value of every metric (empty until the first sample)"""
+        with self._lock:
+            return dict(self._latest)
+
+    def history(self, name, seconds=None):
+        """[(timestamp, value)] for one metric, optionally limited to the last N seconds"""
+        with self._lock:
+            points = list(self._series.get(name, ()))
+        if seconds is not None and points:
+            cutoff = points[-1][0] - seconds
+            points = [p for p in points if p[0] >= cutoff]
+        return points
+
+    def names(self):
+        """Names of all sampled metrics"""
+        with self._lock:
+            return sorted(self._series)
+
+    def frame(self, names, seconds=None):
+        """History of several metrics as a time-indexed DataFrame for st.line_chart"""
+        columns = {}
+        for name in names:
+            points = self.history(name, seconds)
+            if points:
+                columns[name] = pd.Series([v for _, v in points], index=pd.to_datetime([t for t, _ in points], unit="s"))
+        return pd.DataFrame(columns)
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def get_sampler(interval=DEFAULT_INTERVAL, history=DEFAULT_HISTORY):
+    """Return the process-wide sampler, starting it on first use"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None or not _sampler.is_alive():
+            _sampler = MetricsSampler(interval=interval, history=history)
+            _sampler.sample()
+            _sampler.start()
+        return _sampler
+
+class ProcessSampler(threading.Thread):
+    """Background process table sampler with per-PID state between samples.
+
+    CPU and I/O rates are deltas against the previous sample of the same
+    process. Processes are keyed by (pid, create_time), so a reused PID
+    starts fresh. Short history is kept only for processes that recently
+    ranked in a top-N list, which bounds memory on hosts with many processes.
+    """
+
+    def __init__(self, interval=PROCESS_INTERVAL, history=PROCESS_HISTORY, tracked=100):
+        super().__init__(name="process-sampler", daemon=True)
+        self.interval = interval
+        self.history_size = history
+        self.tracked = tracked
+        self._lock = threading.Lock()
+        self._state = {}
+        self._snapshot = []
+        self._history = {}
+        self._stop_event = threading.Event()
+        self.last_sample_at = None
+        self.last_sample_s = None
+
+    def run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception:
+                pass
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self):
+        """Stop sampling after the current interval"""
+        self._stop_event.set()
+
+    def sample(self):
+        """Walk the process table once and compute rates against the previous walk"""
+        started = time.monotonic()
+        now = time.time()
+        cpu_count = psutil.cpu_count() or 1
+        state = {}
+        snapshot = []
+        for proc in psutil.process_iter(PROCESS_ATTRS, ad_value=None):
+            info = proc.info
+            key = (info["pid"], info["create_time"])
+            cpu_times = info["cpu_times"]
+            cpu_total = (cpu_times.user + cpu_times.system) if cpu_times else None
+            io = info["io_counters"]
+            io_total = (io.read_bytes + io.write_bytes) if io else None
+            previous = self._state.get(key)
+
+            cpu_percent = 0.0
+            io_rate = 0.0
+            if previous:
+                elapsed = max(now - previous[0], 1e-6)
+                if cpu_total is not None and previous[1] is not None:
+                    cpu_percent = max(cpu_total - previous[1], 0.0) / elapsed * 100
+                if io_total is not None and previous[2] is not None:
+                    io_rate = max(io_total - previous[2], 0) / elapsed
+            state[key] = (now, cpu_total, io_total)
+
+            memory = info["memory_info"]
+            snapshot.append({
+                "pid": info["pid"],
+                "name": info["name"],
+                "user": info["username"],
+                "cpu_percent": round(cpu_percent, 1),
+                "cpu_percent_of_host": round(cpu_percent / cpu_count, 1),
+                "rss_bytes": memory.rss if memory else 0,
+                "memory_percent": round(info["memory_percent"] or 0.0, 2),
+                "io_bytes_per_s": io_rate,
+                "threads": info["num_threads"],
+                "warm": previous is not None,
+                "key": key,
+            })
+
+        # Record history only for processes currently ranking near the top
+        tracked = set()
+        for key_fn in (TOP_KEYS["cpu"], TOP_KEYS["memory"]):
+            tracked.update(p["key"] for p in heapq.nlargest(self.tracked, snapshot, key=key_fn))
+        by_key = {p["key"]: p for p in snapshot}
+        with self._lock:
+            for key in tracked:
+                series = self._history.get(key)
+                if series is None:
+                    series = self._history[key] = deque(maxlen=self.history_size)
+                proc = by_key[key]
+                series.append((now, proc["cpu_percent"], proc["rss_bytes"]))
+            for key in [k for k in self._history if k not in state]:
+                del self._history[key]
+            self._state = state
+            self._snapshot = snapshot
+            self.last_sample_at = now
+            self.last_sample_s = time.monotonic() - started
+
+    def top(self, n=10, by="cpu"):
+        """Top-N processes by 'cpu', 'memory' or 'io' from the last sample"""
+        with self._lock:
+            snapshot = self._snapshot
+        return heapq.nlargest(n, snapshot, key=TOP_KEYS[by])
+
+    def count(self):
+        """Number of processes seen in the last sample"""
+        with self._lock:
+            return len(self._snapshot)
+
+    def process_history(self, pid):
+        """[(timestamp, cpu_percent, rss_bytes)] for the live process with this PID"""
+        with self._lock:
+            for key, series in self._history.items():
+                if key[0] == pid:
+                    return list(series)
+        return []
+
+_process_sampler = None
+
+def get_process_sampler(interval=PROCESS_INTERVAL):
+    """Return the process-wide process table sampler, starting it on first use"""
+    global _process_sampler
+    with _sampler_lock:
+        if _process_sampler is None or not _process_sampler.is_alive():
+            _process_sampler = ProcessSampler(interval=interval)
+            _process_sampler.start()
+        return _process_sampler
+
+def _parse_percent(text):
+    try:
+        return float(str(text).strip().rstrip("%"))
+    except ValueError:
+        return None
+
+class ContainerSampler(threading.Thread):
+    """Background `docker stats` sampler feeding container metrics into the host sampler.
+
+    Values are recorded as container.<name>.cpu.percent and
+    container.<name>.mem.percent, so they reach the same ring buffers and
+    listeners (store, detector, alert rules) as host metrics.
+    """
+
+    def __init__(self, interval=CONTAINER_INTERVAL):
+        super().__init__(name="container-sampler", daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self.last_error = None
+
+    def run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self):
+        """Stop sampling after the current interval"""
+        self._stop_event.set()
+
+    def sample(self):
+        """Run one `docker stats --no-stream` and record per-container CPU and memory"""
+        result = subprocess.run(["docker", "stats", "--no-stream", "--format", "{{json .}}"],
+                                capture_output=True, text=True, timeout=max(self.interval, 30))
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or "docker stats failed")
+        values = {}
+        for line in result.stdout.splitlines():
+            try:
+                stats = json.loads(line)
+            except ValueError:
+                continue
+            name = stats.get("Name") or stats.get("Container")
+            cpu, mem = _parse_percent(stats.get("CPUPerc", "")), _parse_percent(stats.get("MemPerc", ""))
+            if name and cpu is not None:
+                values[f"container.{name}.cpu.percent"] = cpu
+            if name and mem is not None:
+                values[f"container.{name}.mem.percent"] = mem
+        if values:
+            get_sampler().record(time.time(), values)
+
+_container_sampler = None
+
+def get_container_sampler(interval=CONTAINER_INTERVAL):
+    """Return the container sampler, starting it on first use; None when docker is not installed"""
+    global _container_sampler
+    if shutil.which("docker") is None:
+        return None
+    with _sampler_lock:
+        if _container_sampler is None or not _container_sampler.is_alive():
+            _container_sampler = ContainerSampler(interval=interval)
+            _container_sampler.start()
+        return _container_sampler
+
+TCP_STATES = {
+    "01": "ESTABLISHED", "02": "SYN_SENT", "03": "SYN_RECV", "04": "FIN_WAIT1", "05": "FIN_WAIT2",
+    "06": "TIME_WAIT", "07": "CLOSE", "08": "CLOSE_WAIT", "09": "LAST_ACK", "0A": "LISTEN",
+    "0B": "CLOSING", "0C": "NEW_SYN_RECV",
+}
+PROC_NET_TABLES = ["tcp", "tcp6", "udp", "udp6"]
+
+def _decode_proc_address(hex_address):
+    """'0100007F' / 32-char IPv6 from /proc/net/* (host byte order words) -> printable IP"""
+    raw = bytes.fromhex(hex_address)
+    if len(raw) == 4:
+        return socket.inet_ntop(socket.AF_INET, raw[::-1])
+    return socket.inet_ntop(socket.AF_INET6, b"".join(raw[i:i + 4][::-1] for i in range(0, 16, 4)))
+
+class ConnectionSampler(threading.Thread):
+    """Background socket table aggregation: counts by state, local port and remote peer.
+
+    On Linux the /proc/net tables are parsed directly and counted on the raw
+    hex fields. Only the top entries are decoded to addresses, and no
+    per-socket objects or inode-to-PID lookups are built. That keeps hosts
+    with 100k sockets cheap. Elsewhere it falls back to psutil.net_connections.
+    Totals are also recorded into the host sampler as net.connections.* metrics.
+    """
+
+    def __init__(self, interval=CONNECTION_INTERVAL, top=CONNECTION_TOP):
+        super().__init__(name="connection-sampler", daemon=True)
+        self.interval = interval
+        self.top = top
+        self._lock = threading.Lock()
+        self._latest = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception:
+                pass
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self):
+        """Stop sampling after the current interval"""
+        self._stop_event.set()
+
+    def _count_proc(self):
+        states, protocols, local_ports, remotes = Counter(), Counter(), Counter(), Counter()
+        for table in PROC_NET_TABLES:
+            try:
+                f = open(f"/proc/net/{table}")
+            except OSError:
+                continue
+            with f:
+                next(f, None)
+                is_tcp = table.startswith("tcp")
+                for line in f:
+                    fields = line.split(None, 4)
+                    if len(fields) < 4:
+                        continue
+                    local, remote, state = fields[1], fields[2], fields[3]
+                    state = TCP_STATES.get(state, state) if is_tcp else "UDP"
+                    states[state] += 1
+                    protocols[table] += 1
+                    local_ports[local[-4:]] += 1
+                    remote_address = remote[:-5]
+                    if remote_address.strip("0"):
+                        remotes[remote_address] += 1
+        return (states, protocols,
+                Counter({int(port, 16): n for port, n in local_ports.items()}),
+                [(_decode_proc_address(address), n) for address, n in remotes.most_common(self.top)])
+
+    def _count_psutil(self):
+        states, protocols, local_ports, remotes = Counter(), Counter(), Counter(), Counter()
+        for conn in psutil.net_connections(kind="inet"):
+            states[conn.status if conn.status != psutil.CONN_NONE else "UDP"] += 1
+            protocols[("tcp" if conn.type == socket.SOCK_STREAM else "udp") + ("6" if conn.family == socket.AF_INET6 else "")] += 1
+            if conn.laddr:
+                local_ports[conn.laddr.port] += 1
+            if conn.raddr:
+                remotes[conn.raddr.ip] += 1
+        return states, protocols, local_ports, remotes.most_common(self.top)
+
+    def sample(self):
+        """Aggregate the socket tables once"""
+        started = time.monotonic()
+        if psutil.LINUX and os.path.exists("/proc/net/tcp"):
+            states, protocols, local_ports, remotes = self._count_proc()
+        else:
+            states, protocols, local_ports, remotes = self._count_psutil()
+        now = time.time()
+        snapshot = {
+            "at": now,
+            "total": sum(states.values()),
+            "by_state": dict(states.most_common()),
+            "by_protocol": dict(protocols),
+            "by_local_port": local_ports.most_common(self.top),
+            "by_remote": remotes,
+            "elapsed_s": time.monotonic() - started,
+        }
+        with self._lock:
+            self._latest = snapshot
+        values = {"net.connections.total": snapshot["total"]}
+        for state in ("ESTABLISHED", "LISTEN", "TIME_WAIT", "CLOSE_WAIT", "SYN_RECV"):
+            values[f"net.connections.{state.lower()}"] = states.get(state, 0)
+        get_sampler().record(now, values)
+
+    def latest(self):
+        """Most recent aggregate (None until the first sample completes)"""
+        with self._lock:
+            return self._latest
+
+_connection_sampler = None
+
+def get_connection_sampler(interval=CONNECTION_INTERVAL):
+    """Return the connection sampler, starting it on first use"""
+    global _connection_sampler
+    with _sampler_lock:
+        if _connection_sampler is None or not _connection_sampler.is_alive():
+            _connection_sampler = ConnectionSampler(interval=interval)
+            _connection_sampler.start()
+        return _connection_sampler
@@ -0,0 +1,356 @@
+import os
+import re
+import mmap
+import time
+import atexit
+import struct
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from modules import app_paths, metrics_sampler
+
+RAW_RETENTION = 24 * 3600
+ROLLUP_RETENTION = 30 * 86400
+ROLLUP_STEP = 60
+RAW_CHUNK_POINTS = 60
+ROLLUP_CHUNK_POINTS = 30
+PURGE_INTERVAL = 3600
+CHUNK_CACHE_SIZE = 8192
+TIERS = {"raw": ("value",), "1m": ("avg", "min", "max")}
+# payload length, first/last timestamp (ms), point count, column count
+CHUNK_HEADER = struct.Struct("<IqqHH")
+_DOUBLE = struct.Struct(">d")
+_UINT64 = struct.Struct(">Q")
+
+class BitWriter:
+    """Append-only bit buffer backed by a Python int"""
+
+    def __init__(self):
+        self.value = 0
+        self.bits = 0
+
+    def write(self, bits, n):
+        self.value = (self.value << n) | (bits & ((1 << n) - 1))
+        self.bits += n
+
+    def to_bytes(self):
+        pad = -self.bits % 8
+        return (self.value << pad).to_bytes((self.bits + pad) // 8, "big")
+
+# delta-of-delta buckets: (prefix bits, prefix length, payload bits)
+_DOD_BUCKETS = [(0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12)]
+
+def _signed(value, n):
+    return value - (1 << n) if value >= 1 << (n - 1) else value
+
+def encode_timestamps(writer, timestamps):
+    """Delta-of-delta encode integer millisecond timestamps"""
+    writer.write(timestamps[0], 64)
+    prev, prev_delta = timestamps[0], 0
+    for ts in timestamps[1:]:
+        delta = ts - prev
+        dod = delta - prev_delta
+        if dod == 0:
+            writer.write(0, 1)
+        else:
+            for prefix, prefix_len, n in _DOD_BUCKETS:
+                if -(1 << (n - 1)) <= dod < (1 << (n - 1)):
+                    writer.write(prefix, prefix_len)
+                    writer.write(dod, n)
+                    break
+            else:
+                writer.write(0b1111, 4)
+                writer.write(dod, 32)
+        prev, prev_delta = ts, delta
+
+def decode_timestamps(data, count):
+    value, total, pos = int.from_bytes(data, "big"), len(data) * 8, 64
+    prev = value >> (total - 64)
+    timestamps = [prev]
+    prev_delta = 0
+    for _ in range(count - 1):
+        prefix = 0
+        while prefix < 4:
+            pos += 1
+            if not (value >> (total - pos)) & 1:
+                break
+            prefix += 1
+        n = (0, 7, 9, 12, 32)[prefix]
+        dod = 0
+        if n:
+            pos += n
+            dod = _signed((value >> (total - pos)) & ((1 << n) - 1), n)
+        prev_delta += dod
+        prev += prev_delta
+        timestamps.append(prev)
+    return timestamps
+
+def encode_values(writer, values):
+    """XOR-compress a float64 stream (Gorilla encoding)"""
+    prev = _UINT64.unpack(_DOUBLE.pack(values[0]))[0]
+    writer.write(prev, 64)
+    prev_lead, prev_trail = -1, 0
+    for value in values[1:]:
+        current = _UINT64.unpack(_DOUBLE.pack(value))[0]
+        xor = current ^ prev
+        if xor == 0:
+            writer.write(0, 1)
+        else:
+            writer.write(1, 1)
+            lead = min(64 - xor.bit_length(), 31)
+            trail = (xor & -xor).bit_length() - 1
+            if prev_lead >= 0 and lead >= prev_lead and trail >= prev_trail:
+                writer.write(0, 1)
+                writer.write(xor >> prev_trail, 64 - prev_lead - prev_trail)
+            else:
+                significant = 64 - lead - trail
+                writer.write(1, 1)
+                writer.write(lead, 5)
+                writer.write(significant - 1, 6)
+                writer.write(xor >> trail, significant)
+                prev_lead, prev_trail = lead, trail
+        prev = current
+
+def decode_values(data, count):
+    value, total = int.from_bytes(data, "big"), len(data) * 8
+    pos = 64
+    prev = value >> (total - 64)
+    values = np.empty(count, dtype=np.float64)
+    bits = np.empty(count, dtype=np.uint64)
+    bits[0] = prev
+    lead = trail = 0
+    for i in range(1, count):
+        pos += 1
+        if (value >> (total - pos)) & 1:
+            pos += 1
+            if (value >> (total - pos)) & 1:
+                pos += 11
+                header = (value >> (total - pos)) & 0x7FF
+                lead = header >> 6
+                trail = 64 - lead - ((header & 0x3F) + 1)
+            n = 64 - lead - trail
+            pos += n
+            prev ^= ((value >> (total - pos)) & ((1 << n) - 1)) << trail
+        bits[i] = prev
+    values[:] = bits.view(np.float64)
+    return values
+
+def encode_chunk(points):
+    """[(ts_ms, col1, col2, ...)] -> header + compressed payload.
+
+    Timestamps and each column are separate byte streams behind a table of
+    stream lengths, so a reader can decode just the column it needs.
+    """
+    streams = []
+    writer = BitWriter()
+    encode_timestamps(writer, [p[0] for p in points])
+    streams.append(writer.to_bytes())
+    columns = len(points[0]) - 1
+    for column in range(1, columns + 1):
+        writer = BitWriter()
+        encode_values(writer, [float(p[column]) for p in points])
+        streams.append(writer.to_bytes())
+    payload = struct.pack(f"<{len(streams)}I", *map(len, streams)) + b"".join(streams)
+    return CHUNK_HEADER.pack(len(payload), points[0][0], points[-1][0], len(points), columns) + payload
+
+def decode_chunk(payload, count, columns, column=0):
+    """(timestamps ms, values) for one column of an encoded chunk"""
+    lengths = struct.unpack_from(f"<{columns + 1}I", payload)
+    offset = 4 * (columns + 1)
+    timestamps = np.asarray(decode_timestamps(payload[offset:offset + lengths[0]], count), dtype=np.int64)
+    offset += sum(lengths[:column + 1])
+    return timestamps, decode_values(payload[offset:offset + lengths[column + 1]], count)
+
+def _series_dir(name):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name)
+
+def _day(timestamp):
+    return time.strftime("%Y%m%d", time.gmtime(timestamp))
+
+class MetricsStore:
+    """Embedded time-series store for sampled host metrics.
+
+    Points are buffered per series and appended as compressed chunks to one
+    file per series per UTC day. The raw tier keeps 24 h; a 1-minute tier
+    with avg/min/max keeps 30 days. Reads mmap the day files and decode only
+    chunks whose time range overlaps the query.
+    """
+
+    def __init__(self, root=None, raw_chunk=RAW_CHUNK_POINTS, rollup_chunk=ROLLUP_CHUNK_POINTS):
+        self.root = root or os.path.dirname(app_paths.data_path("tsdb", "raw"))
+        self.raw_chunk = raw_chunk
+        self.rollup_chunk = rollup_chunk
+        self._lock = threading.Lock()
+        self._pending = {"raw": {}, "1m": {}}
+        self._buckets = {}
+        self._last_purge = 0
+        self._chunk_cache = OrderedDict()
+
+    def record(self, timestamp, values):
+        """Sampler listener: buffer one sample and flush full chunks"""
+        ts_ms = int(round(timestamp * 1000))
+        minute = int(timestamp // ROLLUP_STEP) * ROLLUP_STEP
+        with self._lock:
+            for name, value in values.items():
+                value = float(value)
+                raw = self._pending["raw"].setdefault(name, [])
+                raw.append((ts_ms, value))
+                if len(raw) >= self.raw_chunk:
+                    self._write("raw", name, raw)
+                    raw.clear()
+
+                bucket = self._buckets.get(name)
+                if bucket is not None and bucket[0] != minute:
+                    self._close_bucket(name, bucket)
+                    bucket = None
+                if bucket is None:
+                    self._buckets[name] = [minute, value, 1, value, value]
+                else:
+                    bucket[1] += value
+                    bucket[2] += 1
+                    bucket[3] = min(bucket[3], value)
+                    bucket[4] = max(bucket[4], value)
+        if timestamp - self._last_purge > PURGE_INTERVAL:
+            self._last_purge = timestamp
+            self.purge(timestamp)
+
+    def _close_bucket(self, name, bucket):
+        minute, total, count, low, high = bucket
+        rollup = self._pending["1m"].setdefault(name, [])
+        rollup.append((minute * 1000, total / count, low, high))
+        if len(rollup) >= self.rollup_chunk:
+            self._write("1m", name, rollup)
+            rollup.clear()
+
+    def _write(self, tier, name, points):
+        directory = os.path.join(self.root, tier, _series_dir(name))
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, _day(points[0][0] / 1000) + ".chunks"), "ab") as f:
+            f.write(encode_chunk(points))
+
+    def flush(self):
+        """Write every buffered point, e.g. on shutdown"""
+        with self._lock:
+            for tier, series in self._pending.items():
+                for name, points in series.items():
+                    if points:
+                        self._write(tier, name, points)
+                        points.clear()
+
+    def purge(self, now=None):
+        """Delete day files that fall entirely outside each tier's retention"""
+        now = now or time.time()
+        for tier, retention in (("raw", RAW_RETENTION), ("1m", ROLLUP_RETENTION)):
+            cutoff = _day(now - retention - 86400)
+            tier_dir = os.path.join(self.root, tier)
+            if not os.path.isdir(tier_dir):
+                continue
+            for series in os.scandir(tier_dir):
+                if not series.is_dir():
+                    continue
+                for entry in os.scandir(series.path):
+                    if entry.name.endswith(".chunks") and entry.name[:8] < cutoff:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+
+    def _read_files(self, tier, name, start_ms, end_ms, column):
+        directory = os.path.join(self.root, tier, _series_dir(name))
+        if not os.path.isdir(directory):
+            return []
+        # Chunks are filed under the day of their first point, so include the day before start
+        first_day = _day(start_ms / 1000 - 86400)
+        last_day = _day(end_ms / 1000)
+        parts = []
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".chunks") or not first_day <= filename[:8] <= last_day:
+                continue
+            path = os.path.join(directory, filename)
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    offset = 0
+                    while offset + CHUNK_HEADER.size <= size:
+                        length, first, last, count, ncols = CHUNK_HEADER.unpack_from(data, offset)
+                        body = offset + CHUNK_HEADER.size
+                        if body + length > size:
+                            break  # torn write at the tail
+                        key = (path, offset, column)
+                        offset = body + length
+                        if last < start_ms or first > end_ms:
+                            continue
+                        # Written chunks never change, so decoded arrays are reusable across reruns
+                        decoded = self._chunk_cache.get(key)
+                        if decoded is None:
+                            decoded = decode_chunk(data[body:offset], count, ncols, column)
+                            with self._lock:
+                                self._chunk_cache[key] = decoded
+                                if len(self._chunk_cache) > CHUNK_CACHE_SIZE:
+                                    self._chunk_cache.popitem(last=False)
+                        parts.append(decoded)
+        return parts
+
+    def query(self, name, start, end=None, tier=None, column=None):
+        """(timestamps in seconds, values) for one series between start and end.
+
+        tier defaults to 'raw' when the range fits raw retention and '1m'
+        otherwise; column selects avg/min/max on the rollup tier (default avg).
+        """
+        end = end or time.time()
+        if tier is None:
+            tier = "raw" if start >= time.time() - RAW_RETENTION else "1m"
+        index = TIERS[tier].index(column) if column in TIERS[tier] else 0
+        start_ms, end_ms = int(start * 1000), int(end * 1000)
+        parts = self._read_files(tier, name, start_ms, end_ms, index)
+        with self._lock:
+            pending = list(self._pending[tier].get(name, ()))
+            bucket = self._buckets.get(name)
+            if tier == "1m" and bucket is not None:
+                pending.append((bucket[0] * 1000, bucket[1] / bucket[2], bucket[3], bucket[4]))
+        if pending:
+            parts.append((np.array([p[0] for p in pending], dtype=np.int64),
+                          np.array([p[index + 1] for p in pending], dtype=np.float64)))
+        if not parts:
+            return np.empty(0), np.empty(0)
+
+        ts = np.concatenate([p[0] for p in parts])
+        values = np.concatenate([p[1] for p in parts])
+        mask = (ts >= start_ms) & (ts <= end_ms)
+        return ts[mask] / 1000.0, values[mask]
+
+    def frame(self, names, seconds, column=None):
+        """Stored history of several metrics as a time-indexed DataFrame for st.line_chart"""
+        start = time.time() - seconds
+        series = {}
+        for name in names:
+            timestamps, values = self.query(name, start, column=column)
+            if len(timestamps):
+                series[name] = pd.Series(values, index=pd.to_datetime(timestamps, unit="s"))
+        return pd.DataFrame(series)
+
+    def disk_usage(self):
+        """{tier: bytes on disk}"""
+        usage = {}
+        for tier in TIERS:
+            total = 0
+            for dirpath, _, files in os.walk(os.path.join(self.root, tier)):
+                total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+            usage[tier] = total
+        return usage
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """Return the process-wide store, subscribed to the background metrics sampler"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MetricsStore()
+            atexit.register(_store.flush)
+        metrics_sampler.get_sampler().add_listener(_store.record)
+        return _store
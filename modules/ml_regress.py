@@ -1,15 +1,14 @@
 import streamlit as st
+import os
+import time
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score
 import seaborn as sns
 import matplotlib.pyplot as plt
+from modules import jobs, job_queue, regress_model, regress_data, regress_cube, regress_search, regress_plots
 
 # Note: Page config is handled by the main app
 # st.set_page_config(
@@ -70,10 +69,14 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+MAX_DISPLAY_ROWS = 10_000
+
 # Load and prepare data
 @st.cache_data
 def load_data():
-    # Sample data based on the provided dataset
+    # Sample data based on the provided dataset; the filler rows are seeded so the
+    # dataset (and its cached model) is the same across restarts
+    rng = np.random.RandomState(42)
     data = {
         'Job Title': ['Doctor', 'Software Engineer', 'Startup Founder', 'Teacher', 'IAS Officer', 
                      'Bank PO', 'Clerk', 'Government Officer'] * 8,
@@ -83,7 +86,7 @@ def load_data():
                           170851, 82917, 84872, 53258, 189161, 60928, 197607, 59180,
                           156261, 73829, 37080, 185790, 21659, 21201, 124463, 185323,
                           140972, 130771, 77997, 111074, 53517, 93048, 77885, 61073,
-                          158246, 124850, 169570, 44168, 47836, 134022, 123489, 134022] + [np.random.randint(20000, 200000) for _ in range(8)],
+                          158246, 124850, 169570, 44168, 47836, 134022, 123489, 134022] + [rng.randint(20000, 200000) for _ in range(8)],
         'Education': ['MBBS', 'B.Tech', 'MBA', 'B.A.', 'M.A.', 'M.Sc', 'Ph.D'] * 9 + ['B.Tech'],
         'City Tier': ['Tier-1', 'Tier-2', 'Tier-3'] * 21 + ['Tier-1'],
         'Expected Dowry (INR)': [1433000, 611000, 1271000, 1078000, 2709000, 2175000, 966000, 3214000,
@@ -92,13 +95,191 @@ def load_data():
                                 2810000, 1847000, 2524000, 1223000, 3812000, 860000, 3527000, 1484000,
                                 1974000, 1287000, 858000, 2846000, 730000, 409000, 2934000, 3399000,
                                 1612000, 2722000, 1446000, 2866000, 986000, 1596000, 1575000, 644000,
-                                1993000, 2658000, 2699000, 997000, 371000, 2052000, 1609000, 2052000] + [np.random.randint(300000, 5000000) for _ in range(8)]
+                                1993000, 2658000, 2699000, 997000, 371000, 2052000, 1609000, 2052000] + [rng.randint(300000, 5000000) for _ in range(8)]
     }
     return pd.DataFrame(data)
 
+def format_bytes(size):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+
+def breakdown(cube, by, target, stats, salary_col):
+    """Target statistics plus the average salary column per group, from the aggregate cube"""
+    by = [by] if isinstance(by, str) else by
+    return cube.table(by)[[(target, stat) for stat in stats] + [(salary_col, 'mean')]]
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def show_batch_scoring(pipeline):
+    """Score a whole CSV/Parquet file with the cached model in a background job"""
+    st.markdown("### 📦 Batch Scoring")
+    st.caption(f"The file needs the columns: {', '.join(pipeline.features)}. Rows with a missing value or a "
+               "label the model has not seen are kept with a blank prediction.")
+    source_type = st.radio("Input", ["Upload file", "Server path"], horizontal=True, key="score_source")
+    if source_type == "Upload file":
+        uploaded = st.file_uploader("CSV or Parquet file to score", type=["csv", "parquet", "pq"], key="score_upload")
+        source, name = uploaded, uploaded.name if uploaded is not None else None
+    else:
+        path = os.path.expanduser(st.text_input("File path on the server", key="score_path").strip())
+        source, name = path, path
+        if path and not os.path.isfile(path):
+            st.error(f"File not found: {path}")
+            name = None
+
+    if st.button("⚡ Score File", disabled=not name):
+        st.session_state.score_job = regress_model.submit_scoring(pipeline, source, name)
+
+    if st.session_state.get("score_job"):
+        score_job = jobs.show_job_progress(st.session_state.score_job)
+        result = job_queue.get_queue().result(score_job["id"]) if score_job and score_job["status"] == "succeeded" else None
+        if result:
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Rows", f"{result['rows']:,}")
+            with col2:
+                st.metric("Throughput", f"{result['rows_per_s']:,} rows/s")
+            with col3:
+                st.metric("Scoring Time", f"{result['seconds']}s")
+            with col4:
+                st.metric("Not Scored", f"{result['unscored']:,}")
+            if os.path.exists(result["path"]):
+                # The file is only read when the button is clicked
+                st.download_button(
+                    label=f"📥 Download Scored File ({format_bytes(os.path.getsize(result['path']))})",
+                    data=lambda: read_file(result["path"]),
+                    file_name=f"scored_{score_job['id']}.csv.gz",
+                    mime="application/gzip"
+                )
+            else:
+                st.warning("The scored file has been cleaned up; score the file again.")
+
+def show_leaderboard(result):
+    """Model search results: ranked table plus the accuracy/latency tradeoff"""
+    board = pd.DataFrame(result["rows"])
+    board.insert(0, "rank", range(1, len(board) + 1))
+    board["pareto"] = board["pareto"].map(lambda best: "⭐" if best else "")
+    st.markdown("### 🏆 Leaderboard")
+    st.caption(f"{result['samples']:,} rows · {result['folds']}-fold CV · {result['n_jobs']} worker(s) · "
+               f"searched in {result['wall_s']}s · ⭐ = no other candidate is both more accurate and faster")
+    st.dataframe(
+        board[["rank", "pareto", "model", "params", "mae", "mae_std", "r2", "fit_s", "latency_ms", "row_us", "peak_mb", "model_mb"]],
+        use_container_width=True, hide_index=True,
+        column_config={
+            "mae": st.column_config.NumberColumn("MAE", format="%.0f"),
+            "mae_std": st.column_config.NumberColumn("MAE ±", format="%.0f"),
+            "r2": st.column_config.NumberColumn("R²", format="%.3f"),
+            "fit_s": st.column_config.NumberColumn("Fit (s)", format="%.2f"),
+            "latency_ms": st.column_config.NumberColumn("1-row predict (ms)", format="%.2f"),
+            "row_us": st.column_config.NumberColumn("Batch predict (µs/row)", format="%.2f"),
+            "peak_mb": st.column_config.NumberColumn("Peak RSS growth (MB)", format="%.1f",
+                                                     help="Worker resident memory growth during fit and predict"),
+            "model_mb": st.column_config.NumberColumn("Model size (MB)", format="%.2f", help="Pickled fitted model"),
+        })
+    fig = px.scatter(board, x="latency_ms", y="mae", color="model", symbol="pareto", hover_data=["params", "r2", "fit_s"],
+                     log_x=True, title="Accuracy vs Prediction Latency (lower-left is better)",
+                     labels={"latency_ms": "1-row predict latency (ms)", "mae": "Mean Absolute Error"})
+    fig.update_traces(marker=dict(size=12))
+    fig.update_layout(height=400)
+    st.plotly_chart(fig, use_container_width=True)
+
+def numeric_input(label, series, key=None):
+    """number_input defaulting to the column median, stepping by a tenth of its magnitude"""
+    median = float(series.median())
+    step = float(10 ** max(0, int(np.log10(abs(median))) - 1)) if median else 1.0
+    return st.number_input(label, value=median, step=step, key=key)
+
+def select_dataset():
+    """Sidebar data source picker; returns a dataset dict {key, name, df, report} or None"""
+    st.sidebar.markdown("### 📂 Data Source")
+    source_type = st.sidebar.radio("Dataset", ["Sample dataset", "Upload file", "Server path"], key="regress_source")
+    if source_type == "Sample dataset":
+        df = load_data()
+        return {"key": regress_model.dataset_hash(df), "name": "Sample dataset", "df": df, "report": None}
+
+    if source_type == "Upload file":
+        uploaded = st.sidebar.file_uploader("CSV or Parquet file", type=["csv", "parquet", "pq"], key="regress_upload")
+        if uploaded is None:
+            return None
+        source, name, source_id = uploaded, uploaded.name, uploaded.file_id
+    else:
+        path = os.path.expanduser(st.sidebar.text_input("File path on the server", key="regress_path").strip())
+        if not path:
+            return None
+        if not os.path.isfile(path):
+            st.sidebar.error(f"File not found: {path}")
+            return None
+        source, name, source_id = path, path, None
+
+    try:
+        fmt = regress_data.detect_format(name)
+        columns = regress_data.read_columns(source, fmt)
+    except Exception as e:
+        st.sidebar.error(f"Cannot read {name}: {e}")
+        return None
+    # Loading only the needed columns is the biggest memory saving on wide files
+    selected = st.sidebar.multiselect("Columns to load", columns, default=columns, key=f"regress_columns_{name}")
+    if not selected:
+        st.sidebar.warning("Select at least one column")
+        return None
+
+    status = st.empty()
+    try:
+        with st.spinner(f"Loading {os.path.basename(name)}..."):
+            dataset = regress_data.load_dataset(
+                source, name, columns=selected if len(selected) < len(columns) else None, source_id=source_id,
+                progress=lambda rows: status.caption(f"📥 {rows:,} rows loaded..."))
+    except Exception as e:
+        st.sidebar.error(f"Failed to load {name}: {e}")
+        return None
+    finally:
+        status.empty()
+
+    report = dataset["report"]
+    with st.sidebar.expander("🧮 Memory Report"):
+        saved = 1 - report["bytes_after"] / report["bytes_before"] if report["bytes_before"] else 0
+        st.write(f"**Rows:** {report['rows']:,} · **Columns:** {report['columns']}")
+        st.write(f"**Plain load:** {format_bytes(report['bytes_before'])}")
+        st.write(f"**Compact:** {format_bytes(report['bytes_after'])} ({saved:.0%} smaller)")
+        st.write(f"**Load time:** {report['load_s']}s")
+        st.dataframe(pd.DataFrame(report["dtypes"].items(), columns=["Column", "Type"]), hide_index=True)
+    return dataset
+
+def select_roles(dataset):
+    """Sidebar column role pickers; returns {target, numeric, categorical} or None if invalid"""
+    df = dataset["df"]
+    defaults = regress_data.default_roles(df)
+    numeric_columns = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column].dtype)]
+    if not numeric_columns:
+        st.error("The dataset has no numeric column to analyze.")
+        return None
+    suffix = dataset["key"]
+
+    with st.sidebar.expander("🎯 Column Roles", expanded=dataset["report"] is not None):
+        target = st.selectbox("Target", numeric_columns,
+                              index=numeric_columns.index(defaults["target"]) if defaults["target"] in numeric_columns else 0,
+                              key=f"regress_target_{suffix}")
+        numeric_options = [column for column in numeric_columns if column != target]
+        numeric = st.multiselect("Numeric features", numeric_options,
+                                 default=[column for column in defaults["numeric"] if column in numeric_options],
+                                 key=f"regress_numeric_{suffix}")
+        categorical_options = [column for column in df.columns if column != target and column not in numeric]
+        categorical = st.multiselect("Categorical features", categorical_options,
+                                     default=[column for column in defaults["categorical"] if column in categorical_options],
+                                     key=f"regress_categorical_{suffix}")
+    roles = {"target": target, "numeric": numeric, "categorical": categorical}
+    try:
+        regress_data.validate_roles(df, roles)
+    except ValueError as e:
+        st.warning(f"🎯 {e} in the sidebar to continue.")
+        return None
+    return roles
+
 def run():
     # Main function to run the ML regression module
-    df = load_data()
 
     # Header
     st.markdown('<h1 class="main-header">💰 Dowry Analytics Dashboard</h1>', unsafe_allow_html=True)
@@ -108,43 +289,59 @@ def run():
     st.sidebar.markdown("## 🎛️ Dashboard Controls")
     st.sidebar.markdown("---")
 
+    dataset = select_dataset()
+    if dataset is None:
+        st.info("📂 Choose a CSV or Parquet file in the sidebar to start the analysis.")
+        return
+    df = dataset["df"]
+    roles = select_roles(dataset)
+    if roles is None:
+        return
+    target = roles["target"]
+    salary_col = roles["numeric"][0]
+    # The charts are laid out for three categorical dimensions; with fewer they are reused in order
+    dims = roles["categorical"]
+    job_col, edu_col, city_col = dims[0], dims[1 % len(dims)], dims[2 % len(dims)]
+    # Selectors and cube filters use each distinct dimension once
+    cube_dims = list(dict.fromkeys([job_col, edu_col, city_col]))
+    is_sample = dataset["report"] is None
+
+    def load_cube():
+        # Per-group statistics for every dimension combination, built once per dataset version
+        with st.spinner("Building aggregates..."):
+            return regress_cube.get_cube(df, dataset["key"], cube_dims, [target, salary_col])
+
     # Analysis type selection
     analysis_type = st.sidebar.selectbox(
         "📊 Select Analysis Type",
-        ["📈 Overview Dashboard", "🔍 Detailed Analysis", "🤖 Prediction Model", "📋 Data Explorer"]
+        ["📈 Overview Dashboard", "🔍 Detailed Analysis", "🤖 Prediction Model", "🏁 Model Selection", "📋 Data Explorer"]
     )
 
     if analysis_type == "📈 Overview Dashboard":
+        cube = load_cube()
+        
         # User Input Section
         st.markdown("### 📝 User Input for Analysis")
         col1, col2 = st.columns(2)
         
-        with col1:
-            job_title = st.selectbox("Select Job Title:", df['Job Title'].unique())
-            education = st.selectbox("Select Education Level:", df['Education'].unique())
+        filters = []
+        for i, dim in enumerate(cube_dims):
+            with col1 if i < 2 else col2:
+                filters.append((dim, st.selectbox(f"Select {dim}:", cube.values(dim))))
         
         with col2:
-            city_tier = st.selectbox("Select City Tier:", df['City Tier'].unique())
-            monthly_salary = st.number_input("Enter Monthly Salary (INR):", 
-                                           min_value=10000, 
-                                           max_value=500000, 
-                                           value=50000, 
-                                           step=10000)
-        
-        # Filter data based on user input
-        filtered_df = df[
-            (df['Job Title'] == job_title) &
-            (df['Education'] == education) &
-            (df['City Tier'] == city_tier)
-        ]
+            monthly_salary = numeric_input(f"Enter {salary_col}:", df[salary_col])
         
-        if len(filtered_df) > 0:
-            avg_expected_dowry = filtered_df['Expected Dowry (INR)'].mean()
-            st.success(f"📊 Based on your inputs, the average expected dowry is: ₹{avg_expected_dowry:,.0f}")
+        # Look up the selected combination in the cube
+        selected = cube.cell(filters)
+        
+        if selected is not None:
+            avg_expected_dowry = selected[(target, 'mean')]
+            st.success(f"📊 Based on your inputs, the average {target} is: {avg_expected_dowry:,.0f}")
         else:
             st.warning("⚠️ No data available for the selected combination. Showing overall statistics.")
-            avg_expected_dowry = df['Expected Dowry (INR)'].mean()
-            st.info(f"📊 Overall average expected dowry: ₹{avg_expected_dowry:,.0f}")
+            avg_expected_dowry = cube.overall()[(target, 'mean')]
+            st.info(f"📊 Overall average {target}: {avg_expected_dowry:,.0f}")
         
         st.markdown("---")
         
@@ -152,37 +349,37 @@ def run():
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            avg_dowry = df['Expected Dowry (INR)'].mean()
+            avg_dowry = cube.overall()[(target, 'mean')]
             st.markdown(f"""
             <div class="metric-card">
-                <h3>₹{avg_dowry:,.0f}</h3>
-                <p>Average Dowry</p>
+                <h3>{avg_dowry:,.0f}</h3>
+                <p>Average {target}</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col2:
-            max_dowry = df['Expected Dowry (INR)'].max()
+            max_dowry = cube.overall()[(target, 'max')]
             st.markdown(f"""
             <div class="metric-card">
-                <h3>₹{max_dowry:,.0f}</h3>
-                <p>Highest Dowry</p>
+                <h3>{max_dowry:,.0f}</h3>
+                <p>Highest {target}</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col3:
-            avg_salary = df['Monthly Salary'].mean()
+            avg_salary = cube.overall()[(salary_col, 'mean')]
             st.markdown(f"""
             <div class="metric-card">
-                <h3>₹{avg_salary:,.0f}</h3>
-                <p>Average Salary</p>
+                <h3>{avg_salary:,.0f}</h3>
+                <p>Average {salary_col}</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col4:
-            total_records = len(df)
+            total_records = int(cube.overall()[(target, 'count')])
             st.markdown(f"""
             <div class="metric-card">
-                <h3>{total_records}</h3>
+                <h3>{total_records:,}</h3>
                 <p>Total Records</p>
             </div>
             """, unsafe_allow_html=True)
@@ -193,27 +390,27 @@ def run():
         col1, col2 = st.columns(2)
         
         with col1:
-            st.subheader("💼 Dowry by Job Title")
-            job_dowry = df.groupby('Job Title')['Expected Dowry (INR)'].mean().sort_values(ascending=True)
+            st.subheader(f"💼 {target} by {job_col}")
+            job_dowry = cube.table([job_col], target, 'mean').sort_values(ascending=True)
             fig_job = px.bar(
                 x=job_dowry.values,
                 y=job_dowry.index,
                 orientation='h',
                 color=job_dowry.values,
                 color_continuous_scale='viridis',
-                title="Average Dowry Expectations by Profession"
+                title=f"Average {target} by {job_col}"
             )
             fig_job.update_layout(height=400, showlegend=False)
             st.plotly_chart(fig_job, use_container_width=True)
         
         with col2:
-            st.subheader("🎓 Education vs Dowry")
-            edu_dowry = df.groupby('Education')['Expected Dowry (INR)'].mean().sort_values(ascending=False)
+            st.subheader(f"🎓 {edu_col} vs {target}")
+            edu_dowry = cube.table([edu_col], target, 'mean').sort_values(ascending=False)
             fig_edu = px.pie(
                 values=edu_dowry.values,
                 names=edu_dowry.index,
                 color_discrete_sequence=px.colors.qualitative.Set3,
-                title="Dowry Distribution by Education Level"
+                title=f"{target} Distribution by {edu_col}"
             )
             fig_edu.update_layout(height=400)
             st.plotly_chart(fig_edu, use_container_width=True)
@@ -222,70 +419,77 @@ def run():
         col1, col2 = st.columns(2)
         
         with col1:
-            st.subheader("🏙️ City Tier Analysis")
-            tier_stats = df.groupby('City Tier').agg({
-                'Expected Dowry (INR)': ['mean', 'median', 'max'],
-                'Monthly Salary': 'mean'
-            }).round(0)
+            st.subheader(f"🏙️ {city_col} Analysis")
+            tier_stats = breakdown(cube, city_col, target, ['mean', 'median', 'max'], salary_col).round(0)
             
-            tier_data = df.groupby('City Tier')['Expected Dowry (INR)'].mean().reset_index()
+            tier_data = cube.table([city_col], target, 'mean').rename(target).reset_index()
             fig_tier = px.bar(
                 data_frame=tier_data,
-                x='City Tier',
-                y='Expected Dowry (INR)',
-                color='Expected Dowry (INR)',
+                x=city_col,
+                y=target,
+                color=target,
                 color_continuous_scale='viridis',
-                title="Average Dowry by City Tier"
+                title=f"Average {target} by {city_col}"
             )
             fig_tier.update_layout(height=400, showlegend=False)
             st.plotly_chart(fig_tier, use_container_width=True)
             
             # Display tier statistics
-            st.markdown("### 📊 Tier Statistics")
+            st.markdown(f"### 📊 {city_col} Statistics")
             st.dataframe(tier_stats, use_container_width=True)
         
         with col2:
-            st.subheader("💰 Salary vs Dowry Correlation")
-            fig_scatter = px.scatter(
-                data_frame=df,
-                x='Monthly Salary',
-                y='Expected Dowry (INR)',
-                color='Job Title',
-                size='Expected Dowry (INR)',
-                hover_data=['Education', 'City Tier'],
-                title="Salary vs Dowry Relationship"
+            st.subheader(f"💰 {salary_col} vs {target} Correlation")
+            # Large datasets are binned server-side so the figure stays small
+            fig_scatter = regress_plots.scatter(
+                df, dataset["key"],
+                x=salary_col,
+                y=target,
+                color=job_col,
+                hover=[edu_col, city_col],
+                title=f"{salary_col} vs {target} Relationship"
             )
-            fig_scatter.update_layout(height=400)
             st.plotly_chart(fig_scatter, use_container_width=True)
             
             # Correlation coefficient
-            correlation = df['Monthly Salary'].corr(df['Expected Dowry (INR)'])
+            correlation = df[salary_col].corr(df[target])
             st.metric("Correlation Coefficient", f"{correlation:.3f}")
 
     elif analysis_type == "🔍 Detailed Analysis":
         st.subheader("🔍 Detailed Analysis")
         
+        cube = load_cube()
+        
         # Detailed breakdowns
         col1, col2 = st.columns(2)
         
         with col1:
-            st.markdown("### 💼 Job Title Analysis")
-            job_analysis = df.groupby('Job Title').agg({
-                'Expected Dowry (INR)': ['mean', 'median', 'std', 'count'],
-                'Monthly Salary': 'mean'
-            }).round(0)
-            job_analysis.columns = ['Avg Dowry', 'Median Dowry', 'Std Dowry', 'Count', 'Avg Salary']
+            st.markdown(f"### 💼 {job_col} Analysis")
+            job_analysis = breakdown(cube, job_col, target, ['mean', 'median', 'std', 'count'], salary_col).round(0)
+            job_analysis.columns = ['Avg', 'Median', 'Std', 'Count', f'Avg {salary_col}']
             st.dataframe(job_analysis, use_container_width=True)
         
         with col2:
-            st.markdown("### 🎓 Education Analysis")
-            edu_analysis = df.groupby('Education').agg({
-                'Expected Dowry (INR)': ['mean', 'median', 'std', 'count'],
-                'Monthly Salary': 'mean'
-            }).round(0)
-            edu_analysis.columns = ['Avg Dowry', 'Median Dowry', 'Std Dowry', 'Count', 'Avg Salary']
+            st.markdown(f"### 🎓 {edu_col} Analysis")
+            edu_analysis = breakdown(cube, edu_col, target, ['mean', 'median', 'std', 'count'], salary_col).round(0)
+            edu_analysis.columns = ['Avg', 'Median', 'Std', 'Count', f'Avg {salary_col}']
             st.dataframe(edu_analysis, use_container_width=True)
         
+        # Drill-down into one value of a dimension
+        if len(cube.dims) > 1:
+            st.markdown("### 🔎 Drill-down")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                drill_dim = st.selectbox("Dimension", cube.dims, key="drill_dim")
+            with col2:
+                drill_value = st.selectbox("Value", cube.values(drill_dim), key=f"drill_value_{drill_dim}")
+            with col3:
+                by = st.selectbox("Break down by", [dim for dim in cube.dims if dim != drill_dim], key=f"drill_by_{drill_dim}")
+            drill = breakdown(cube, [drill_dim, by], target, ['mean', 'median', 'std', 'count', 'max'], salary_col)
+            drill = drill.xs(drill_value, level=drill_dim).round(0)
+            drill.columns = ['Avg', 'Median', 'Std', 'Count', 'Max', f'Avg {salary_col}']
+            st.dataframe(drill, use_container_width=True)
+        
         # Advanced visualizations
         st.markdown("### 📊 Advanced Visualizations")
         
@@ -293,26 +497,22 @@ def run():
         
         with col1:
             # Box plot for dowry distribution by job
-            fig_box = px.box(
-                data_frame=df,
-                x='Job Title',
-                y='Expected Dowry (INR)',
-                color='Job Title',
-                title="Dowry Distribution by Job Title"
+            fig_box = regress_plots.box(
+                df, dataset["key"],
+                x=job_col,
+                y=target,
+                title=f"{target} Distribution by {job_col}"
             )
-            fig_box.update_layout(height=400, xaxis_tickangle=-45)
             st.plotly_chart(fig_box, use_container_width=True)
         
         with col2:
             # Violin plot for salary distribution
-            fig_violin = px.violin(
-                data_frame=df,
-                x='City Tier',
-                y='Monthly Salary',
-                color='City Tier',
-                title="Salary Distribution by City Tier"
+            fig_violin = regress_plots.violin(
+                df, dataset["key"],
+                x=city_col,
+                y=salary_col,
+                title=f"{salary_col} Distribution by {city_col}"
             )
-            fig_violin.update_layout(height=400)
             st.plotly_chart(fig_violin, use_container_width=True)
         
         # Heatmap of correlations
@@ -333,83 +533,53 @@ def run():
     elif analysis_type == "🤖 Prediction Model":
         st.subheader("🤖 Machine Learning Prediction Model")
         
-        # Prepare data for ML
-        df_ml = df.copy()
-        
-        # Encode categorical variables
-        le_job = LabelEncoder()
-        le_edu = LabelEncoder()
-        le_city = LabelEncoder()
-        
-        df_ml['Job Title_encoded'] = le_job.fit_transform(df_ml['Job Title'])
-        df_ml['Education_encoded'] = le_edu.fit_transform(df_ml['Education'])
-        df_ml['City Tier_encoded'] = le_city.fit_transform(df_ml['City Tier'])
-        
-        # Select features
-        features = ['Monthly Salary', 'Job Title_encoded', 'Education_encoded', 'City Tier_encoded']
-        X = df_ml[features]
-        y = df_ml['Expected Dowry (INR)']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Train model
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-        model.fit(X_train, y_train)
-        
-        # Make predictions
-        y_pred = model.predict(X_test)
+        # Encoders, forest, metrics and importances are fitted once per dataset and cached on disk
+        with st.spinner("Loading model..."):
+            pipeline = regress_model.get_pipeline(
+                df, target, roles["numeric"], roles["categorical"], dataset_key=dataset["key"])
         
         # Model performance
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            mae = mean_absolute_error(y_test, y_pred)
-            st.metric("Mean Absolute Error", f"₹{mae:,.0f}")
+            st.metric("Mean Absolute Error", f"{pipeline.metrics['mae']:,.0f}")
         
         with col2:
-            r2 = r2_score(y_test, y_pred)
-            st.metric("R² Score", f"{r2:.3f}")
+            st.metric("R² Score", f"{pipeline.metrics['r2']:.3f}")
         
         with col3:
-            accuracy = (1 - abs(y_test - y_pred) / y_test).mean() * 100
-            st.metric("Accuracy", f"{accuracy:.1f}%")
-        
-        # Prediction interface
-        st.markdown("### 🎯 Make Predictions")
+            st.metric("Accuracy", f"{pipeline.metrics['accuracy']:.1f}%")
         
-        pred_col1, pred_col2 = st.columns(2)
-        
-        with pred_col1:
-            pred_salary = st.number_input("Monthly Salary (₹)", 
-                                        min_value=10000, 
-                                        max_value=500000, 
-                                        value=50000, 
-                                        step=1000)
-            pred_job = st.selectbox("Job Title", df['Job Title'].unique())
-            pred_edu = st.selectbox("Education", df['Education'].unique())
-        
-        with pred_col2:
-            pred_city = st.selectbox("City Tier", df['City Tier'].unique())
+        # Prediction interface; only this fragment reruns while the inputs change
+        def prediction_form():
+            st.markdown("### 🎯 Make Predictions")
             
-            if st.button("🚀 Predict Dowry"):
-                # Encode inputs
-                job_encoded = le_job.transform([pred_job])[0]
-                edu_encoded = le_edu.transform([pred_edu])[0]
-                city_encoded = le_city.transform([pred_city])[0]
-                
-                # Make prediction
-                prediction = model.predict([[pred_salary, job_encoded, edu_encoded, city_encoded]])[0]
+            pred_col1, pred_col2 = st.columns(2)
+            values = {}
+            
+            with pred_col1:
+                for column in pipeline.numeric:
+                    values[column] = numeric_input(column, df[column], key=f"pred_{column}")
+                for column in pipeline.categorical:
+                    values[column] = st.selectbox(column, list(pipeline.codes[column]), key=f"pred_{column}")
+            
+            with pred_col2:
+                started = time.perf_counter()
+                prediction = pipeline.predict_one(**values)
+                latency_ms = (time.perf_counter() - started) * 1000
                 
                 st.markdown(f"""
                 <div class="prediction-result">
-                    <h2>Predicted Dowry: ₹{prediction:,.0f}</h2>
+                    <h2>Predicted {target}: {prediction:,.0f}</h2>
                 </div>
                 """, unsafe_allow_html=True)
+                st.caption(f"⚡ Predicted in {latency_ms:.1f} ms (model trained in {pipeline.fit_seconds}s, cached)")
+        
+        st.fragment(prediction_form)()
         
         # Feature importance
-        feature_names = ['Monthly Salary', 'Job Title', 'Education', 'City Tier']
-        importance = model.feature_importances_
+        feature_names = list(pipeline.importances)
+        importance = list(pipeline.importances.values())
         
         fig_importance = px.bar(
             x=importance,
@@ -421,6 +591,45 @@ def run():
         )
         fig_importance.update_layout(height=300, showlegend=False)
         st.plotly_chart(fig_importance, use_container_width=True)
+        
+        show_batch_scoring(pipeline)
+
+    elif analysis_type == "🏁 Model Selection":
+        st.subheader("🏁 Model Selection")
+        st.markdown("Cross-validated search over several model families, compared on accuracy **and** prediction cost.")
+        
+        cpus = os.cpu_count() or 1
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            families = st.multiselect("Model families", list(regress_search.SEARCH_SPACE),
+                                      default=list(regress_search.SEARCH_SPACE))
+        with col2:
+            folds = st.selectbox("CV folds", [3, 5])
+        with col3:
+            n_jobs = st.number_input("Worker processes", min_value=1, max_value=cpus, value=cpus)
+        
+        grid = regress_search.candidates(families)
+        st.caption(f"{len(grid)} candidates × {folds} folds = {len(grid) * folds} fits "
+                   f"on up to {regress_search.MAX_SEARCH_ROWS:,} sampled rows")
+        search_key = regress_search.search_key(dataset["key"], target, roles["numeric"], roles["categorical"], families, folds)
+        leaderboard = regress_search.cached_results(search_key)
+        
+        if st.button("🚀 Run Search", disabled=not families):
+            st.session_state.model_search_job = regress_search.submit_search(
+                df, dataset["key"], target, roles["numeric"], roles["categorical"],
+                families=families, folds=folds, n_jobs=int(n_jobs))
+        
+        if st.session_state.get("model_search_job"):
+            search_job = jobs.show_job_progress(st.session_state.model_search_job)
+            if search_job and search_job["status"] == "succeeded":
+                result = job_queue.get_queue().result(search_job["id"])
+                if result and result["key"] == search_key:
+                    leaderboard = result
+        
+        if leaderboard:
+            show_leaderboard(leaderboard)
+        else:
+            st.info("Run the search to build the leaderboard for this dataset.")
 
     elif analysis_type == "📋 Data Explorer":
         st.subheader("📋 Data Explorer")
@@ -435,7 +644,7 @@ def run():
             st.write(f"**Date Range:** Sample Dataset")
             
             st.markdown("### 🔍 Data Types")
-            st.write(df.dtypes)
+            st.write(df.dtypes.astype(str))
         
         with col2:
             st.markdown("### 📈 Basic Statistics")
@@ -447,24 +656,26 @@ def run():
         # Search and filter options
         col1, col2 = st.columns(2)
         with col1:
-            search_job = st.selectbox("Filter by Job Title", ["All"] + list(df['Job Title'].unique()))
+            search_job = st.selectbox(f"Filter by {job_col}", ["All"] + list(df[job_col].dropna().unique()))
         with col2:
-            salary_range = st.slider("Salary Range (₹)", 
-                                    min_value=int(df['Monthly Salary'].min()), 
-                                    max_value=int(df['Monthly Salary'].max()),
-                                    value=(int(df['Monthly Salary'].min()), int(df['Monthly Salary'].max())))
+            salary_range = st.slider(f"{salary_col} Range", 
+                                    min_value=int(df[salary_col].min()), 
+                                    max_value=int(df[salary_col].max()),
+                                    value=(int(df[salary_col].min()), int(df[salary_col].max())))
         
         # Apply filters
         display_df = df.copy()
         if search_job != "All":
-            display_df = display_df[display_df['Job Title'] == search_job]
+            display_df = display_df[display_df[job_col] == search_job]
         
         display_df = display_df[
-            (display_df['Monthly Salary'] >= salary_range[0]) & 
-            (display_df['Monthly Salary'] <= salary_range[1])
+            (display_df[salary_col] >= salary_range[0]) & 
+            (display_df[salary_col] <= salary_range[1])
         ]
         
-        st.dataframe(display_df, use_container_width=True)
+        if len(display_df) > MAX_DISPLAY_ROWS:
+            st.caption(f"Showing the first {MAX_DISPLAY_ROWS:,} of {len(display_df):,} matching rows")
+        st.dataframe(display_df.head(MAX_DISPLAY_ROWS), use_container_width=True)
         
         # Download option
         csv = display_df.to_csv(index=False)
@@ -475,27 +686,28 @@ def run():
             mime="text/csv"
         )
 
-    # Insights section
-    st.markdown("---")
-    st.markdown("## 💡 Key Insights")
-
-    insight_col1, insight_col2 = st.columns(2)
-
-    with insight_col1:
-        st.markdown("""
-        <div class="insight-box">
-            <h4>🎯 Profession Impact</h4>
-            <p>IAS Officers and Doctors tend to have the highest dowry expectations, reflecting societal prestige associated with these professions.</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with insight_col2:
-        st.markdown("""
-        <div class="insight-box">
-            <h4>🎓 Education Correlation</h4>
-            <p>Higher education levels (Ph.D., MBBS, MBA) generally correlate with increased dowry expectations across all professions.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # Insights section (written for the sample dataset)
+    if is_sample:
+        st.markdown("---")
+        st.markdown("## 💡 Key Insights")
+
+        insight_col1, insight_col2 = st.columns(2)
+
+        with insight_col1:
+            st.markdown("""
+            <div class="insight-box">
+                <h4>🎯 Profession Impact</h4>
+                <p>IAS Officers and Doctors tend to have the highest dowry expectations, reflecting societal prestige associated with these professions.</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+        with insight_col2:
+            st.markdown("""
+            <div class="insight-box">
+                <h4>🎓 Education Correlation</h4>
+                <p>Higher education levels (Ph.D., MBBS, MBA) generally correlate with increased dowry expectations across all professions.</p>
+            </div>
+            """, unsafe_allow_html=True)
 
     # Footer
     st.markdown("---")
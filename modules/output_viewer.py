@@ -0,0 +1,136 @@
+import os
+import time
+import hashlib
+import tempfile
+import subprocess
+import streamlit as st
+from modules import log_explorer
+
+INLINE_LIMIT = 256 * 1024
+PAGE_SIZES = [100, 200, 500, 1000]
+SPOOL_MAX_AGE = 24 * 3600
+SESSION_KEY = "_output_viewer"
+
+def spool_dir():
+    path = os.path.join(tempfile.gettempdir(), f"ddash-output-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+def _cleanup():
+    """Remove spool files older than SPOOL_MAX_AGE"""
+    cutoff = time.time() - SPOOL_MAX_AGE
+    try:
+        with os.scandir(spool_dir()) as it:
+            for entry in it:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+
+def spool_text(text):
+    """Write text to a content-addressed spool file (reused if identical) and return its path"""
+    data = text.encode("utf-8", errors="replace") if isinstance(text, str) else text
+    path = os.path.join(spool_dir(), hashlib.sha1(data).hexdigest() + ".out")
+    if not os.path.exists(path):
+        _cleanup()
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return path
+
+def spool_command(command, timeout=60):
+    """Run a command with stdout and stderr written straight to a spool file.
+
+    The output never passes through Python memory. Returns (success, path);
+    timeouts and start errors are appended to the file.
+    """
+    _cleanup()
+    fd, path = tempfile.mkstemp(suffix=".out", dir=spool_dir())
+    try:
+        with os.fdopen(fd, "wb") as f:
+            result = subprocess.run(command, shell=isinstance(command, str), stdout=f, stderr=subprocess.STDOUT,
+                                    stdin=subprocess.DEVNULL, timeout=timeout)
+        return result.returncode == 0, path
+    except subprocess.TimeoutExpired:
+        with open(path, "ab") as f:
+            f.write(f"\n[timed out after {timeout}s]\n".encode())
+        return False, path
+    except OSError as e:
+        with open(path, "ab") as f:
+            f.write(str(e).encode())
+        return False, path
+
+def capture(key, output=None, path=None, title=None, language=None):
+    """Register output under a viewer key; show(key) renders it on this and later reruns.
+
+    Small text is kept in session state and shown inline; anything above
+    INLINE_LIMIT (or an already spooled path) is kept on disk and only a
+    path is stored in the session.
+    """
+    if path is None and output is not None and len(output) > INLINE_LIMIT:
+        path = spool_text(output)
+    entry = {"title": title, "language": language}
+    if path is not None:
+        entry["path"] = path
+        if os.path.getsize(path) <= INLINE_LIMIT:
+            with open(path, "rb") as f:
+                entry["text"] = f.read().decode("utf-8", errors="replace")
+    else:
+        entry["text"] = output or ""
+    st.session_state.setdefault(SESSION_KEY, {})[key] = entry
+
+def clear(key):
+    st.session_state.get(SESSION_KEY, {}).pop(key, None)
+
+def show(key):
+    """Render the output registered under key, if any"""
+    entry = st.session_state.get(SESSION_KEY, {}).get(key)
+    if entry is None:
+        return
+    if entry.get("title"):
+        st.caption(entry["title"])
+    if "text" in entry:
+        st.code(entry["text"] or "(no output)", language=entry["language"])
+        return
+    if not os.path.exists(entry["path"]):
+        st.warning("This output has expired from the spool; run the command again.")
+        clear(key)
+        return
+    show_file(entry["path"], key, entry["language"])
+
+def show_file(path, key, language=None):
+    """Windowed viewer over a large file: only the visible page of lines is sent to the browser"""
+    log = log_explorer.open_log(path)
+    total = log.line_count()
+    st.caption(f"📄 Large output: {total:,} lines · {log.size / 1024 / 1024:.1f} MB · paged from disk")
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        pattern = st.text_input("Search output", key=f"{key}_search")
+    with col2:
+        regex = st.checkbox("Regex", key=f"{key}_regex")
+    with col3:
+        page_size = st.selectbox("Lines per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    if pattern:
+        try:
+            search = log_explorer.search_log(path, pattern, regex=regex)
+        except Exception as e:
+            st.error(f"Invalid pattern: {e}")
+            return
+        match_page = st.number_input("Match page", min_value=1, value=1, key=f"{key}_match_page") - 1
+        rows = search.page(match_page, page_size)
+        found = f"{len(search.matches)}" if search.done else f"{len(search.matches)}+"
+        st.caption(f"{found} matching lines (showing page {match_page + 1})")
+    else:
+        pages = max(1, (total + page_size - 1) // page_size)
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, key=f"{key}_page") - 1
+        rows = log.read_lines(page * page_size, page_size)
+    if rows:
+        width = len(str(rows[-1][0] + 1))
+        st.code("\n".join(f"{number + 1:>{width}}  {text}" for number, text in rows), language=language)
+    else:
+        st.info("No lines to show.")
@@ -0,0 +1,302 @@
+import os
+import re
+import time
+import signal
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import yaml
+from modules import app_paths, job_queue, command_history
+
+DEFAULT_STEP_TIMEOUT = 600
+DEFAULT_PARALLEL = 8
+STEP_OUTPUT_CHARS = 20000
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+EXAMPLE_PIPELINE = """# Steps run as soon as everything they `needs` has succeeded; independent steps run in parallel
+name: example-release
+fail_fast: true        # stop starting new steps and kill running ones after the first failure
+max_parallel: 4
+steps:
+  - name: lint
+    run: echo linting && sleep 2
+  - name: test
+    run: echo testing && sleep 3
+    retries: 1         # re-run a failed step up to this many times
+    retry_delay: 2
+  - name: build
+    run: echo building && sleep 2
+    needs: [lint, test]
+    timeout: 900
+  - name: deploy
+    run: echo deploying
+    needs: [build]
+"""
+
+def pipeline_dir():
+    return os.path.dirname(app_paths.data_path("pipelines", "pipeline.yaml"))
+
+def parse_pipeline(text):
+    """Validate pipeline YAML and return a pipeline dict; raises ValueError"""
+    try:
+        data = yaml.safe_load(text) or {}
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("Pipeline must be a mapping with 'name' and 'steps'")
+    name = str(data.get("name", ""))
+    if not NAME_PATTERN.match(name):
+        raise ValueError("Pipeline needs a 'name' of letters, digits, '.', '_' or '-'")
+    steps = data.get("steps")
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("Pipeline needs a non-empty 'steps' list")
+    parsed = []
+    for i, step in enumerate(steps):
+        if not isinstance(step, dict) or not step.get("name") or not step.get("run"):
+            raise ValueError(f"Step #{i + 1} needs a 'name' and a 'run' command")
+        needs = step.get("needs", [])
+        parsed.append({
+            "name": str(step["name"]),
+            "run": str(step["run"]),
+            "needs": [str(n) for n in ([needs] if isinstance(needs, str) else needs)],
+            "timeout": float(step.get("timeout", DEFAULT_STEP_TIMEOUT)),
+            "retries": int(step.get("retries", 0)),
+            "retry_delay": float(step.get("retry_delay", 0)),
+            "cwd": os.path.expanduser(step["cwd"]) if step.get("cwd") else None,
+        })
+    names = [step["name"] for step in parsed]
+    duplicates = {n for n in names if names.count(n) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate step name(s): {', '.join(sorted(duplicates))}")
+    for step in parsed:
+        missing = [n for n in step["needs"] if n not in names]
+        if missing:
+            raise ValueError(f"Step '{step['name']}' needs unknown step(s): {', '.join(missing)}")
+    pipeline = {
+        "name": name,
+        "fail_fast": bool(data.get("fail_fast", True)),
+        "max_parallel": max(1, int(data.get("max_parallel", DEFAULT_PARALLEL))),
+        "steps": parsed,
+    }
+    stages(pipeline)
+    return pipeline
+
+def stages(pipeline):
+    """Topological levels: each stage only depends on earlier ones. Raises ValueError on a cycle."""
+    remaining = {step["name"]: set(step["needs"]) for step in pipeline["steps"]}
+    done, levels = set(), []
+    while remaining:
+        ready = sorted(name for name, needs in remaining.items() if needs <= done)
+        if not ready:
+            raise ValueError(f"Dependency cycle between: {', '.join(sorted(remaining))}")
+        levels.append(ready)
+        done.update(ready)
+        for name in ready:
+            del remaining[name]
+    return levels
+
+def critical_path(pipeline, durations):
+    """(length, step names) of the longest dependency chain by the given step durations"""
+    finish, previous = {}, {}
+    for level in stages(pipeline):
+        for name in level:
+            step = next(s for s in pipeline["steps"] if s["name"] == name)
+            before = max(step["needs"], key=lambda n: finish[n], default=None)
+            finish[name] = durations.get(name, 0) + (finish[before] if before else 0)
+            previous[name] = before
+    if not finish:
+        return 0.0, []
+    name = max(finish, key=finish.get)
+    length, chain = finish[name], []
+    while name:
+        chain.append(name)
+        name = previous[name]
+    return length, chain[::-1]
+
+# ----- storage -----
+def list_pipelines():
+    try:
+        return sorted(f[:-5] for f in os.listdir(pipeline_dir()) if f.endswith(".yaml"))
+    except OSError:
+        return []
+
+def load_pipeline_text(name):
+    with open(os.path.join(pipeline_dir(), f"{name}.yaml")) as f:
+        return f.read()
+
+def save_pipeline_text(text):
+    """Validate and persist pipeline YAML under its name; returns the parsed pipeline"""
+    pipeline = parse_pipeline(text)
+    path = os.path.join(pipeline_dir(), f"{pipeline['name']}.yaml")
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return pipeline
+
+def delete_pipeline(name):
+    try:
+        os.remove(os.path.join(pipeline_dir(), f"{name}.yaml"))
+    except OSError:
+        pass
+
+# ----- execution -----
+class PipelineRun:
+    """Executes one pipeline inside a job.
+
+    A step starts as soon as all of its `needs` have succeeded, on a thread
+    pool of max_parallel workers, so wall-clock time tracks the critical path
+    rather than the sum of the steps. Failed steps are retried per their
+    policy. With fail_fast the first final failure kills running steps and
+    skips everything not yet started; otherwise only its dependents are
+    skipped. Step output is interleaved into the job output with a
+    [step] prefix.
+    """
+
+    def __init__(self, pipeline, job):
+        self.pipeline = pipeline
+        self.job = job
+        self.steps = {step["name"]: step for step in pipeline["steps"]}
+        self.results = {name: {"step": name, "status": "pending", "attempts": 0, "exit_code": None,
+                               "started": None, "finished": None, "duration_s": None, "output": ""}
+                        for name in self.steps}
+        self._lock = threading.Lock()
+        self._processes = {}
+        self._aborted = False
+
+    def _log(self, name, line):
+        with self._lock:
+            self.job.log(f"[{name}] {line.rstrip()}")
+            result = self.results[name]
+            result["output"] = (result["output"] + line.rstrip("\n") + "\n")[-STEP_OUTPUT_CHARS:]
+
+    def _run_step(self, name):
+        step, result = self.steps[name], self.results[name]
+        result.update(status="running", started=time.time())
+        for attempt in range(step["retries"] + 1):
+            if self._aborted:
+                break
+            if attempt:
+                self._log(name, f"retry {attempt}/{step['retries']} after {step['retry_delay']}s")
+                time.sleep(step["retry_delay"])
+            result["attempts"] = attempt + 1
+            result["exit_code"] = self._execute(name, step)
+            if result["exit_code"] == 0:
+                break
+        # Set the final status only once retries are exhausted, so dependents are not skipped early
+        if result["exit_code"] == 0:
+            result["status"] = "succeeded"
+        else:
+            result["status"] = "cancelled" if self._aborted else "failed"
+        result["finished"] = time.time()
+        result["duration_s"] = round(result["finished"] - result["started"], 2)
+        return name
+
+    def _execute(self, name, step):
+        process = subprocess.Popen(step["run"], shell=True, cwd=step["cwd"], stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, text=True,
+                                   errors="replace", bufsize=1, start_new_session=True)
+        with self._lock:
+            self._processes[name] = process
+        timer = threading.Timer(step["timeout"], self._kill, args=(process,))
+        timer.daemon = True
+        timer.start()
+        started = time.monotonic()
+        try:
+            for line in process.stdout:
+                self._log(name, line)
+            process.wait()
+        finally:
+            timer.cancel()
+            with self._lock:
+                self._processes.pop(name, None)
+        if process.returncode < 0 and time.monotonic() - started >= step["timeout"]:
+            self._log(name, f"timed out after {step['timeout']:.0f}s")
+        return process.returncode
+
+    def _kill(self, process):
+        if process.poll() is None:
+            try:
+                os.killpg(process.pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    def _abort(self):
+        self._aborted = True
+        with self._lock:
+            processes = list(self._processes.values())
+        for process in processes:
+            self._kill(process)
+
+    def _ready(self):
+        """Pending steps whose dependencies all succeeded; pending dependents of failures become skipped"""
+        ready = []
+        for name, result in self.results.items():
+            if result["status"] != "pending":
+                continue
+            needs = [self.results[n]["status"] for n in self.steps[name]["needs"]]
+            if any(status in ("failed", "cancelled", "skipped") for status in needs):
+                result["status"] = "skipped"
+            elif all(status == "succeeded" for status in needs):
+                ready.append(name)
+        return ready
+
+    def execute(self):
+        started = time.time()
+        total = len(self.steps)
+        with ThreadPoolExecutor(max_workers=self.pipeline["max_parallel"]) as pool:
+            running = {}
+            while True:
+                if not self._aborted:
+                    for name in self._ready():
+                        if name not in running.values():
+                            running[pool.submit(self._run_step, name)] = name
+                if not running:
+                    break
+                done, _ = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    future.result()
+                    if self.results[name]["status"] == "failed" and self.pipeline["fail_fast"] and not self._aborted:
+                        self._log(name, "failed; fail_fast is set, stopping the pipeline")
+                        self._abort()
+                finished = sum(r["status"] not in ("pending", "running") for r in self.results.values())
+                active = [n for n, r in self.results.items() if r["status"] == "running"]
+                try:
+                    self.job.progress(finished / total, f"Running: {', '.join(active)}" if active else "")
+                except job_queue.JobCancelled:
+                    self._abort()
+        for result in self.results.values():
+            if result["status"] == "pending":
+                result["status"] = "skipped"
+        return self._summary(started)
+
+    def _summary(self, started):
+        durations = {name: r["duration_s"] or 0 for name, r in self.results.items()}
+        path_length, path = critical_path(self.pipeline, durations)
+        return {
+            "pipeline": self.pipeline["name"],
+            "success": all(r["status"] == "succeeded" for r in self.results.values()),
+            "wall_s": round(time.time() - started, 2),
+            "serial_s": round(sum(durations.values()), 2),
+            "critical_path_s": round(path_length, 2),
+            "critical_path": path,
+            "steps": list(self.results.values()),
+        }
+
+def run_pipeline_job(job, pipeline):
+    """Background job body: run the pipeline, record it in the command history, fail if any step failed"""
+    summary = PipelineRun(pipeline, job).execute()
+    output = "\n".join(f"=== {r['step']}: {r['status']} ({r['duration_s']}s, {r['attempts']} attempt(s)) ===\n{r['output']}"
+                       for r in summary["steps"])
+    command_history.get_history().append(f"[pipeline] {pipeline['name']}", summary["success"], output,
+                                         source="pipeline", duration_s=summary["wall_s"])
+    job.check_cancelled()
+    if not summary["success"]:
+        failed = [r["step"] for r in summary["steps"] if r["status"] == "failed"]
+        raise job_queue.JobFailed(f"Step(s) failed: {', '.join(failed)}", summary)
+    return summary
+
+def submit_pipeline(pipeline):
+    """Queue a pipeline run and return the job id"""
+    return job_queue.get_queue().submit(f"🔀 Pipeline {pipeline['name']}", run_pipeline_job, pipeline,
+                                        module="command_hub")
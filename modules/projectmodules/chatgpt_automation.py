@@ -2,7 +2,9 @@ import streamlit as st
 import requests
 import subprocess
 import os
+import socket
 from datetime import datetime
+from modules import metrics_sampler
 
 def run_command(command, timeout=30, shell=True):
     try:
@@ -43,14 +45,12 @@ def is_port_open(host, port):
 
 def get_system_metrics():
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        metrics = metrics_sampler.get_sampler().latest()
         return {
-            'CPU Usage': f"{cpu_percent:.1f}%",
-            'Memory Usage': f"{memory.percent:.1f}%",
-            'Disk Usage': f"{(disk.used/disk.total)*100:.1f}%",
-            'Available Memory': f"{memory.available / (1024**3):.1f} GB"
+            'CPU Usage': f"{metrics['cpu.percent']:.1f}%",
+            'Memory Usage': f"{metrics['mem.percent']:.1f}%",
+            'Disk Usage': f"{(metrics['disk.used_bytes']/metrics['disk.total_bytes'])*100:.1f}%",
+            'Available Memory': f"{metrics['mem.available_bytes'] / (1024**3):.1f} GB"
         }
     except Exception as e:
         return {'Error': str(e)}
@@ -2,7 +2,12 @@ import streamlit as st
 import subprocess
 import os
 import pandas as pd
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+import plotly.express as px
+from modules import fleet, command_history, command_scheduler, pipelines, job_queue, jobs, output_viewer
+
+HISTORY_PAGE_SIZE = 20
 
 def run_command(command, timeout=30, shell=True):
     try:
@@ -31,9 +36,62 @@ def run_command(command, timeout=30, shell=True):
             "stderr": str(e)
         }
 
+def execute_and_record(command, timeout=30):
+    """Run a command on this host, show its output and append it to the persistent history"""
+    started = time.monotonic()
+    result = run_command(command, timeout=timeout)
+    output = result['stdout'] if result['success'] else result['stderr']
+    command_history.get_history().append(command, result['success'], result['stdout'] + result['stderr'],
+                                         duration_s=round(time.monotonic() - started, 2))
+    if not result['success']:
+        st.error(f"❌ Command failed: {command}")
+    output_viewer.capture("command_hub_output", output, title=f"$ {command}", language="bash")
+    return result
+
+def select_fleet_targets():
+    """Pick inventory hosts by group for fleet execution"""
+    try:
+        hosts = fleet.load_inventory()
+    except ValueError as e:
+        st.error(f"Inventory error: {e} (edit it under Linux Tools → Fleet Overview)")
+        return []
+    all_groups = sorted({group for host in hosts for group in host["groups"]})
+    groups = st.multiselect("Fleet groups (empty = all hosts)", all_groups)
+    targets = fleet.select_hosts(hosts, groups=groups)
+    st.caption(f"{len(targets)} of {len(hosts)} inventory hosts")
+    return targets
+
+def run_fleet_command(command, hosts, timeout):
+    """Run a command on every selected host concurrently and stream results into one table"""
+    if not hosts:
+        st.warning("No fleet hosts selected")
+        return
+    progress = st.progress(0.0)
+    table = st.empty()
+    rows = []
+    
+    def on_result(row, done, total):
+        rows.append(row)
+        progress.progress(done / total, text=f"{done}/{total} hosts")
+        table.dataframe(fleet_result_frame(rows), use_container_width=True, hide_index=True)
+    
+    fleet.get_executor().run(hosts, command, timeout=timeout, on_result=on_result)
+    failed = [row for row in rows if not row["success"]]
+    if failed:
+        st.error(f"{len(failed)} of {len(rows)} hosts failed")
+    else:
+        st.success(f"Succeeded on all {len(rows)} hosts")
+    command_history.get_history().append(
+        f"[fleet:{len(hosts)} hosts] {command}", not failed,
+        "\n".join(f"=== {row['host']} (exit {row['exit_code']}) ===\n{row['stdout']}{row['stderr']}" for row in rows),
+        source="fleet", duration_s=max(row["duration_s"] for row in rows))
+
+def fleet_result_frame(rows):
+    frame = pd.DataFrame(rows)
+    frame["output"] = (frame["stdout"].where(frame["stdout"] != "", frame["stderr"])).str.strip()
+    return frame[["host", "success", "exit_code", "duration_s", "output"]].sort_values(["success", "host"])
+
 def command_hub_page():
-    if 'command_history' not in st.session_state:
-        st.session_state.command_history = []
     st.header("⚡ CommandHub - System Command Center")
     
     col1, col2 = st.columns([2, 1])
@@ -42,28 +100,14 @@ def command_hub_page():
         st.subheader("Command Execution")
         command_input = st.text_input("Enter Command", placeholder="e.g., ping google.com")
         timeout = st.number_input("Timeout (seconds)", min_value=1, max_value=300, value=30)
+        target = st.radio("Run on", ["This host", "Fleet"], horizontal=True)
+        fleet_hosts = select_fleet_targets() if target == "Fleet" else []
         if st.button("🚀 Execute Command"):
-            if command_input:
+            if command_input and target == "Fleet":
+                run_fleet_command(command_input, fleet_hosts, timeout)
+            elif command_input:
                 with st.spinner("Executing command..."):
-                    result = run_command(command_input, timeout=timeout)
-                    if result['success']:
-                        st.code(result['stdout'], language="bash")
-                        if 'command_history' not in st.session_state:
-                            st.session_state.command_history = []
-                        st.session_state.command_history.append({
-                            'command': command_input,
-                            'timestamp': datetime.now().isoformat(),
-                            'success': True,
-                            'output': result['stdout']
-                        })
-                    else:
-                        st.error(f"Error: {result['stderr']}")
-                        st.session_state.command_history.append({
-                            'command': command_input,
-                            'timestamp': datetime.now().isoformat(),
-                            'success': False,
-                            'output': result['stderr']
-                        })
+                    execute_and_record(command_input, timeout=timeout)
         
         st.write("**Quick Commands:**")
         quick_commands = {
@@ -78,33 +122,179 @@ def command_hub_page():
         for label, cmd in quick_commands.items():
             if st.button(label):
                 with st.spinner(f"Executing {label}..."):
-                    result = run_command(cmd)
-                    if result['success']:
-                        st.code(result['stdout'], language="bash")
-                        if 'command_history' not in st.session_state:
-                            st.session_state.command_history = []
-                        st.session_state.command_history.append({
-                            'command': cmd,
-                            'timestamp': datetime.now().isoformat(),
-                            'success': True,
-                            'output': result['stdout']
-                        })
-                    else:
-                        st.error(f"Error: {result['stderr']}")
-                        st.session_state.command_history.append({
-                            'command': cmd,
-                            'timestamp': datetime.now().isoformat(),
-                            'success': False,
-                            'output': result['stderr']
-                        })
+                    execute_and_record(cmd)
+        
+        output_viewer.show("command_hub_output")
     
     with col2:
-        st.subheader("Command History")
-        if st.session_state.command_history:
-            df = pd.DataFrame(st.session_state.command_history)
-            st.dataframe(df, use_container_width=True)
+        show_command_history()
+    
+    show_scheduled_commands()
+    show_pipelines()
+
+def show_command_history():
+    """Paginated history summaries; full output is read from disk only when opened"""
+    history = command_history.get_history()
+    st.subheader("Command History")
+    query = st.text_input("Filter commands", key="history_query")
+    col1, col2 = st.columns(2)
+    with col1:
+        status = st.selectbox("Status", ["All", "Succeeded", "Failed"], key="history_status")
+    with col2:
+        source = st.selectbox("Source", ["All", "manual", "fleet", "schedule", "pipeline"], key="history_source")
+    status_filter = {"All": None, "Succeeded": True, "Failed": False}[status]
+    # One pass over the index: the requested page is clamped to the last one by summaries()
+    page = st.session_state.get("history_page", 1) - 1
+    rows, total = history.summaries(page, HISTORY_PAGE_SIZE, query, status_filter, None if source == "All" else source)
+    if not total:
+        st.info("No commands executed yet.")
+        return
+    pages = (total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+    if page >= pages:
+        st.session_state.history_page = pages
+    st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key="history_page")
+    df = pd.DataFrame(rows)
+    df["time"] = pd.to_datetime(df["timestamp"], unit="s").dt.strftime("%Y-%m-%d %H:%M:%S")
+    st.dataframe(df[["id", "time", "command", "success", "source", "duration_s", "output_bytes"]],
+                 use_container_width=True, hide_index=True)
+    stats = history.stats()
+    st.caption(f"{total} matching of {stats['entries']} entries · {stats['output_bytes'] / 1024:.0f} KB output stored in {stats['data_bytes'] / 1024:.0f} KB")
+    entry_id = st.selectbox("Entry", [row["id"] for row in rows],
+                            format_func=lambda entry_id: next(f"#{r['id']} {r['command'][:50]}" for r in rows if r["id"] == entry_id))
+    if st.button("📄 Show Output"):
+        output = history.output(entry_id)
+        if output is None:
+            st.warning("That entry has been removed from the history")
+        else:
+            output_viewer.capture("command_history_output", output, title=f"#{entry_id}", language="bash")
+    output_viewer.show("command_history_output")
+    if st.button("🗑️ Clear History"):
+        history.clear()
+        st.rerun()
+
+def show_scheduled_commands():
+    """Create and manage cron and one-off schedules that run in the background"""
+    scheduler = command_scheduler.get_scheduler()
+    st.subheader("⏰ Scheduled Commands")
+    st.caption("Schedules run in the background job queue (see the Jobs page) whether or not this page is open. Times use the server's local clock.")
+    
+    with st.expander("➕ New Schedule"):
+        name = st.text_input("Name", placeholder="Nightly cleanup")
+        command = st.text_input("Command", placeholder="docker system prune -f")
+        kind = st.radio("Repeat", ["Recurring (cron)", "Once"], horizontal=True)
+        if kind == "Recurring (cron)":
+            cron = st.text_input("Cron expression", value="*/15 * * * *",
+                                 help="minute hour day-of-month month day-of-week, e.g. `0 2 * * 1-5`, or @hourly/@daily/@weekly")
+            run_at = None
+            try:
+                upcoming = command_scheduler.CronExpression(cron).next_after(datetime.now())
+                st.caption(f"Next run: {upcoming:%Y-%m-%d %H:%M}" if upcoming else "Never matches")
+            except command_scheduler.CronError as e:
+                st.caption(f"⚠️ {e}")
         else:
-            st.info("No commands executed yet.")
-        if st.button("🗑️ Clear History"):
-            st.session_state.command_history = []
-            st.rerun()
\ No newline at end of file
+            cron = None
+            soon = datetime.now() + timedelta(minutes=5)
+            col1, col2 = st.columns(2)
+            with col1:
+                run_date = st.date_input("Date", value=soon.date())
+            with col2:
+                run_time = st.time_input("Time", value=soon.time().replace(second=0, microsecond=0))
+            run_at = datetime.combine(run_date, run_time)
+        schedule_timeout = st.number_input("Timeout (seconds)", min_value=1, max_value=86400,
+                                           value=command_scheduler.DEFAULT_TIMEOUT, key="schedule_timeout")
+        if st.button("⏰ Add Schedule"):
+            if name and command:
+                try:
+                    scheduler.add(name, command, cron=cron, run_at=run_at, timeout=schedule_timeout)
+                    st.success(f"Schedule '{name}' added")
+                except ValueError as e:
+                    st.error(str(e))
+            else:
+                st.warning("Please enter a name and command")
+    
+    schedules = scheduler.schedules()
+    if not schedules:
+        st.info("No scheduled commands.")
+        return
+    df = pd.DataFrame(schedules)
+    df["when"] = df["cron"].fillna("once")
+    df["next_run"] = df["next_run"].map(lambda t: f"{t:%Y-%m-%d %H:%M}" if t is not None else "—")
+    df["last_run"] = df["last_run"].map(lambda t: datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S") if t else "—")
+    st.dataframe(df[["name", "command", "when", "enabled", "next_run", "last_run", "last_success", "runs"]],
+                 use_container_width=True, hide_index=True)
+    schedule_id = st.selectbox("Schedule", [s["id"] for s in schedules],
+                               format_func=lambda schedule_id: next(s["name"] for s in schedules if s["id"] == schedule_id))
+    selected = next(s for s in schedules if s["id"] == schedule_id)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("▶️ Run Now"):
+            scheduler.run_now(schedule_id)
+            st.success("Submitted to the job queue")
+    with col2:
+        if st.button("⏸️ Disable" if selected["enabled"] else "▶️ Enable"):
+            scheduler.set_enabled(schedule_id, not selected["enabled"])
+            st.rerun()
+    with col3:
+        if st.button("🗑️ Remove Schedule"):
+            scheduler.remove(schedule_id)
+            st.rerun()
+
+def show_pipelines():
+    """Edit, save and run YAML-defined command DAGs"""
+    st.subheader("🔀 Pipelines")
+    st.caption("Steps declare `needs`; independent steps run in parallel, so a pipeline takes about as long as its critical path.")
+    
+    saved = pipelines.list_pipelines()
+    choice = st.selectbox("Pipeline", ["➕ New pipeline"] + saved, key="pipeline_choice")
+    initial = pipelines.EXAMPLE_PIPELINE if choice == "➕ New pipeline" else pipelines.load_pipeline_text(choice)
+    text = st.text_area("Pipeline YAML", value=initial, height=320, key=f"pipeline_yaml_{choice}")
+    
+    try:
+        pipeline = pipelines.parse_pipeline(text)
+        stage_text = " → ".join(" ∥ ".join(stage) for stage in pipelines.stages(pipeline))
+        st.caption(f"Stages: {stage_text}")
+    except ValueError as e:
+        pipeline = None
+        st.error(str(e))
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("💾 Save Pipeline", disabled=pipeline is None):
+            pipelines.save_pipeline_text(text)
+            st.success(f"Saved '{pipeline['name']}'")
+    with col2:
+        if st.button("▶️ Run Pipeline", disabled=pipeline is None):
+            st.session_state.pipeline_job = pipelines.submit_pipeline(pipeline)
+    with col3:
+        if choice != "➕ New pipeline" and st.button("🗑️ Delete Pipeline"):
+            pipelines.delete_pipeline(choice)
+            st.rerun()
+    
+    if st.session_state.get("pipeline_job"):
+        pipeline_job = jobs.show_job_progress(st.session_state.pipeline_job)
+        if pipeline_job and pipeline_job["status"] in ("succeeded", "failed"):
+            summary = job_queue.get_queue().result(pipeline_job["id"])
+            if summary:
+                show_pipeline_summary(summary)
+
+def show_pipeline_summary(summary):
+    """Per-step timing table and a Gantt chart of one pipeline run"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Wall Clock", f"{summary['wall_s']:.1f}s")
+    with col2:
+        st.metric("Sum of Steps", f"{summary['serial_s']:.1f}s")
+    with col3:
+        st.metric("Critical Path", f"{summary['critical_path_s']:.1f}s", help=" → ".join(summary["critical_path"]))
+    steps = pd.DataFrame(summary["steps"])
+    st.dataframe(steps[["step", "status", "attempts", "exit_code", "duration_s"]], use_container_width=True, hide_index=True)
+    ran = steps.dropna(subset=["started", "finished"]).copy()
+    if not ran.empty:
+        ran["start"] = pd.to_datetime(ran["started"], unit="s")
+        ran["end"] = pd.to_datetime(ran["finished"], unit="s")
+        fig = px.timeline(ran, x_start="start", x_end="end", y="step", color="status",
+                          color_discrete_map={"succeeded": "#2ca02c", "failed": "#d62728", "cancelled": "#7f7f7f"})
+        fig.update_yaxes(autorange="reversed")
+        st.plotly_chart(fig, use_container_width=True)
+    step = st.selectbox("Step output", steps["step"].tolist(), key="pipeline_step_output")
+    st.code(steps.set_index("step").loc[step, "output"] or "(no output)", language="bash")
@@ -1,7 +1,9 @@
 import streamlit as st
 import subprocess
 import os
+import shutil
 from datetime import datetime
+from modules import job_queue, jobs
 
 def run_command(command, timeout=30, shell=True):
     try:
@@ -30,15 +32,18 @@ def run_command(command, timeout=30, shell=True):
             "stderr": str(e)
         }
 
-def clone_microservices_repo(repo_url, clone_dir):
-    try:
-        if os.path.exists(clone_dir):
-            run_command(f"rm -rf {clone_dir}")
-        result = run_command(f"git clone {repo_url} {clone_dir}")
-        return result['success']
-    except Exception as e:
-        st.error(f"Error cloning repository: {str(e)}")
-        return False
+def clone_microservices_repo(job, repo_url, clone_dir):
+    """Background job: replace clone_dir with a fresh clone of repo_url"""
+    if os.path.exists(clone_dir):
+        job.progress(0.05, f"Removing existing {clone_dir}")
+        shutil.rmtree(clone_dir)
+    job.progress(0.1, "Cloning repository...")
+    # No terminal is attached to the job, so fail instead of waiting for credentials
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    exit_code = job.run_command(["git", "clone", "--progress", repo_url, clone_dir], env=env)
+    if exit_code != 0:
+        raise RuntimeError(f"git clone exited with code {exit_code}")
+    return clone_dir
 
 def microservices_page():
     st.header("🏛️ Containerized Microservices Architecture")
@@ -50,11 +55,12 @@ def microservices_page():
         repo_url = st.text_input("Git Repository URL", value="git@github.com:Dubeysatvik123/Three_Tier_Microservice.git")
         clone_dir = st.text_input("Clone Directory", value="./microservices")
         if st.button("📥 Clone Repository"):
-            with st.spinner("Cloning repository..."):
-                if clone_microservices_repo(repo_url, clone_dir):
-                    st.success("✅ Repository cloned successfully!")
-                else:
-                    st.error("❌ Failed to clone repository")
+            st.session_state.microservices_clone_job = job_queue.get_queue().submit(
+                f"git clone {repo_url}", clone_microservices_repo, repo_url, clone_dir, module="project")
+        if st.session_state.get("microservices_clone_job"):
+            clone_job = jobs.show_job_progress(st.session_state.microservices_clone_job)
+            if clone_job and clone_job["status"] == "succeeded":
+                st.success("✅ Repository cloned successfully!")
     
     with col2:
         st.subheader("Docker Compose Operations")
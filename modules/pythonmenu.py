@@ -18,6 +18,7 @@ from datetime import datetime
 import webbrowser
 import urllib.parse
 from bs4 import BeautifulSoup
+from modules import metrics_sampler, metrics_store
 
 
 def run():
@@ -66,27 +67,15 @@ def show_system_tools():
     
     st.subheader("📈 RAM Usage Over Time")
     
-    if 'ram_history' not in st.session_state:
-        st.session_state.ram_history = []
-    
-    st.session_state.ram_history.append({
-        'time': datetime.now().strftime('%H:%M:%S'),
-        'usage': ram.percent
-    })
-    
-    if len(st.session_state.ram_history) > 20:
-        st.session_state.ram_history = st.session_state.ram_history[-20:]
-    
-    if st.session_state.ram_history:
-        times = [entry['time'] for entry in st.session_state.ram_history]
-        usage = [entry['usage'] for entry in st.session_state.ram_history]
-        
-        chart_data = {
-            'Time': times,
-            'RAM Usage %': usage
-        }
-        
-        st.line_chart(chart_data)
+    sampler = metrics_sampler.get_sampler()
+    ram_ranges = {"Last 5 minutes": 300, "Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400}
+    ram_range = st.selectbox("History range:", list(ram_ranges))
+    if ram_ranges[ram_range] <= 300:
+        ram_history = sampler.frame(["mem.percent", "swap.percent"], seconds=300)
+    else:
+        ram_history = metrics_store.get_store().frame(["mem.percent", "swap.percent"], ram_ranges[ram_range])
+    if not ram_history.empty:
+        st.line_chart(ram_history.rename(columns={"mem.percent": "RAM Usage %", "swap.percent": "Swap Usage %"}))
     
     st.subheader("🖥️ System Information")
     
@@ -95,19 +84,18 @@ def show_system_tools():
     with col1:
         st.write("**CPU Information:**")
         st.write(f"CPU Count: {psutil.cpu_count()}")
-        st.write(f"CPU Usage: {psutil.cpu_percent(interval=1)}%")
+        metrics = sampler.latest()
+        st.write(f"CPU Usage: {metrics['cpu.percent']:.1f}%")
         
         st.write("**Disk Information:**")
-        disk = psutil.disk_usage('/')
-        st.write(f"Total: {disk.total / (1024**3):.2f} GB")
-        st.write(f"Used: {disk.used / (1024**3):.2f} GB")
-        st.write(f"Free: {disk.free / (1024**3):.2f} GB")
+        st.write(f"Total: {metrics['disk.total_bytes'] / (1024**3):.2f} GB")
+        st.write(f"Used: {metrics['disk.used_bytes'] / (1024**3):.2f} GB")
+        st.write(f"Free: {metrics['disk.free_bytes'] / (1024**3):.2f} GB")
 
     with col2:
         st.write("**Network Information:**")
-        network = psutil.net_io_counters()
-        st.write(f"Bytes Sent: {network.bytes_sent / (1024**2):.2f} MB")
-        st.write(f"Bytes Received: {network.bytes_recv / (1024**2):.2f} MB")
+        st.write(f"Bytes Sent: {metrics.get('net.bytes_sent', 0) / (1024**2):.2f} MB")
+        st.write(f"Bytes Received: {metrics.get('net.bytes_recv', 0) / (1024**2):.2f} MB")
         
         st.write("**Boot Time:**")
         boot_time = datetime.fromtimestamp(psutil.boot_time())
@@ -0,0 +1,92 @@
+import time
+import threading
+from itertools import combinations
+from collections import OrderedDict
+import pandas as pd
+
+STATS = ["mean", "median", "std", "count", "max"]
+MAX_CACHED_CUBES = 8
+
+class AggregateCube:
+    """Per-group statistics of a dataset for every combination of its dimensions.
+
+    For each subset of the dimensions (including the empty one, the grand
+    total) the measures are aggregated with STATS once, at build time.
+    Breakdown tables and filters on dimension values are then index
+    lookups on small frames instead of groupbys and boolean masks over
+    every row.
+    """
+
+    def __init__(self, df, dims, measures):
+        started = time.perf_counter()
+        self.dims = list(dict.fromkeys(dims))
+        self.measures = list(dict.fromkeys(measures))
+        self._tables = {}
+        for size in range(1, len(self.dims) + 1):
+            for subset in combinations(self.dims, size):
+                self._tables[subset] = df.groupby(list(subset), observed=True, sort=True)[self.measures].agg(STATS)
+        total = df[self.measures].agg(STATS)
+        # Same (measure, stat) column layout as the grouped tables, one row
+        self._tables[()] = pd.DataFrame([total.T.stack()], index=["All"])
+        self.build_seconds = round(time.perf_counter() - started, 3)
+
+    def _key(self, dims):
+        dims = list(dict.fromkeys(dims))
+        unknown = [dim for dim in dims if dim not in self.dims]
+        if unknown:
+            raise KeyError(f"Not a cube dimension: {', '.join(unknown)}")
+        return tuple(dim for dim in self.dims if dim in dims)
+
+    def table(self, by, measure=None, stats=None):
+        """Aggregates grouped by the given dimensions (any order; empty for the grand total)"""
+        table = self._tables[self._key(by)]
+        if measure is not None:
+            table = table[measure]
+            if stats is not None:
+                table = table[stats]
+        elif stats is not None:
+            table = table.loc[:, (slice(None), stats)]
+        return table
+
+    def values(self, dim):
+        """Distinct values of a dimension, in sorted order"""
+        return self._tables[(dim,)].index.tolist()
+
+    def cell(self, filters):
+        """Aggregates for the rows matching (dimension, value) pairs; None if no row matches"""
+        wanted = {}
+        for dim, value in filters:
+            # The same dimension filtered on two different values matches nothing
+            if wanted.setdefault(dim, value) != value:
+                return None
+        filters = wanted
+        key = self._key(filters)
+        table = self._tables[key]
+        if not key:
+            return table.iloc[0]
+        index = tuple(filters[dim] for dim in key)
+        try:
+            row = table.loc[index if len(index) > 1 else index[0]]
+        except KeyError:
+            return None
+        return row
+
+    def overall(self):
+        return self._tables[()].iloc[0]
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def get_cube(df, dataset_key, dims, measures):
+    """Cube for this dataset version and dimension/measure choice; built once and cached"""
+    key = (dataset_key, tuple(dict.fromkeys(dims)), tuple(dict.fromkeys(measures)))
+    with _cache_lock:
+        cube = _cache.get(key)
+        if cube is None:
+            cube = AggregateCube(df, dims, measures)
+            _cache[key] = cube
+            while len(_cache) > MAX_CACHED_CUBES:
+                _cache.popitem(last=False)
+        else:
+            _cache.move_to_end(key)
+        return cube
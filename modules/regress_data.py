@@ -0,0 +1,229 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+CHUNK_ROWS = 250_000
+HASH_BLOCK = 1024 * 1024
+# Text columns with at most this share of distinct values (in the first chunk) become categoricals
+CATEGORY_MAX_RATIO = 0.5
+MAX_CATEGORY_LEVELS = 1000
+MAX_CACHED_DATASETS = 3
+SAMPLE_ROLES = {
+    "target": "Expected Dowry (INR)",
+    "numeric": ["Monthly Salary"],
+    "categorical": ["Job Title", "Education", "City Tier"],
+}
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+_hash_memo = OrderedDict()
+
+def content_hash(source, source_id=None):
+    """SHA-1 of a file path or binary file object, read in blocks.
+
+    Paths are remembered by (path, size, mtime) and file objects by the
+    caller's source_id, so a rerun does not re-read an unchanged file.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        source_id = (os.path.abspath(source), stat.st_size, stat.st_mtime_ns)
+    if source_id is not None and source_id in _hash_memo:
+        return _hash_memo[source_id]
+    digest = hashlib.sha1()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                digest.update(block)
+    else:
+        _rewind(source)
+        for block in iter(lambda: source.read(HASH_BLOCK), b""):
+            digest.update(block)
+        _rewind(source)
+    if source_id is not None:
+        _hash_memo[source_id] = digest.hexdigest()
+        if len(_hash_memo) > 64:
+            _hash_memo.popitem(last=False)
+    return digest.hexdigest()
+
+def detect_format(name):
+    lower = str(name).lower()
+    if lower.endswith((".parquet", ".pq")):
+        return "parquet"
+    if lower.endswith((".csv", ".csv.gz", ".txt")):
+        return "csv"
+    raise ValueError(f"Unsupported file type: {name} (use CSV or Parquet)")
+
+def read_columns(source, fmt):
+    """Column names from the header / schema without loading any rows"""
+    _rewind(source)
+    try:
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            return list(pq.ParquetFile(source).schema_arrow.names)
+        return list(pd.read_csv(source, nrows=0).columns)
+    finally:
+        _rewind(source)
+
+def read_chunks(source, fmt, columns=None, chunk_rows=CHUNK_ROWS):
+    """Yield the file as DataFrames of up to chunk_rows rows"""
+    _rewind(source)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        with pd.read_csv(source, usecols=columns, chunksize=chunk_rows, low_memory=False) as reader:
+            yield from reader
+
+def _downcast(series):
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(series.dtype):
+        # Whole-number floats (e.g. an int column with no gaps read as float) become ints again
+        values = series.to_numpy()
+        if (len(values) and not np.isnan(values).any() and np.abs(values).max() < 2 ** 53
+                and np.array_equal(values, np.round(values))):
+            return pd.to_numeric(series.astype(np.int64), downcast="integer")
+    return series
+
+def _as_labels(series):
+    """Categorical with text categories, whatever dtype this chunk was read with.
+
+    A chunk where the column is blank (read as float) or holds only numbers
+    (read as int) must still yield string categories; only the small
+    category index is converted, not every value.
+    """
+    series = series.astype("category")
+    categories = series.cat.categories
+    if pd.api.types.is_float_dtype(categories.dtype) and np.array_equal(categories, np.round(categories)):
+        categories = categories.astype(np.int64)
+    return series.cat.rename_categories(categories.astype(str))
+
+def _compact(chunk, category_columns):
+    for column in chunk.columns:
+        if column in category_columns:
+            chunk[column] = _as_labels(chunk[column])
+        else:
+            chunk[column] = _downcast(chunk[column])
+    return chunk
+
+def _category_columns(chunk):
+    """Categorical columns chosen from the first chunk, so every chunk is typed the same way"""
+    chosen = set()
+    for column in chunk.columns:
+        dtype = chunk[column].dtype
+        if (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+                or isinstance(dtype, pd.CategoricalDtype)):
+            distinct = chunk[column].nunique(dropna=True)
+            if distinct <= MAX_CATEGORY_LEVELS and distinct <= max(1, len(chunk) * CATEGORY_MAX_RATIO):
+                chosen.add(column)
+    return chosen
+
+def _combine(chunks, category_columns):
+    """Concatenate compacted chunks, unifying categories so categoricals survive the concat"""
+    if not chunks:
+        return pd.DataFrame()
+    for column in category_columns:
+        # Chunks where the column is entirely blank have no categories to contribute
+        filled = [chunk[column] for chunk in chunks if len(chunk[column].cat.categories)]
+        if not filled:
+            continue
+        categories = union_categoricals(filled, ignore_order=True).categories
+        for chunk in chunks:
+            chunk[column] = chunk[column].cat.set_categories(categories)
+    df = pd.concat(chunks, ignore_index=True, copy=False)
+    # Chunks may have downcast the same column to different widths
+    for column in df.columns:
+        if column not in category_columns:
+            df[column] = _downcast(df[column])
+    return df
+
+def ingest(source, fmt, columns=None, chunk_rows=CHUNK_ROWS, progress=None):
+    """Stream a CSV/Parquet file into a compact DataFrame; returns (df, report).
+
+    Rows are read chunk_rows at a time and each chunk is compacted (text
+    columns to categoricals, integers downcast) before the next one is
+    read, so peak memory stays near the compact size plus one raw chunk
+    instead of the full uncompacted frame. The report compares the memory
+    a plain pandas read would have used with the compact result.
+    """
+    started = time.perf_counter()
+    compacted, category_columns = [], None
+    rows, bytes_before = 0, 0
+    for chunk in read_chunks(source, fmt, columns, chunk_rows):
+        bytes_before += int(chunk.memory_usage(deep=True).sum())
+        if category_columns is None:
+            category_columns = _category_columns(chunk)
+        compacted.append(_compact(chunk, category_columns))
+        rows += len(chunk)
+        if progress:
+            progress(rows)
+    df = _combine(compacted, category_columns or set())
+    report = {
+        "rows": len(df),
+        "columns": len(df.columns),
+        "bytes_before": bytes_before,
+        "bytes_after": int(df.memory_usage(deep=True).sum()),
+        "load_s": round(time.perf_counter() - started, 2),
+        "dtypes": {column: str(dtype) for column, dtype in df.dtypes.items()},
+    }
+    return df, report
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def load_dataset(source, name, columns=None, source_id=None, progress=None):
+    """Dataset dict {key, name, df, report} for a file path or uploaded file.
+
+    Keyed by the file's content hash (plus the selected columns): loading
+    the same bytes again, under any name, is served from memory. The key
+    doubles as the dataset version for downstream caches.
+    """
+    fmt = detect_format(name)
+    spec = ",".join(columns) if columns else "*"
+    key = hashlib.sha1(f"{content_hash(source, source_id)}:{spec}".encode()).hexdigest()[:20]
+    with _cache_lock:
+        dataset = _cache.get(key)
+        if dataset is not None:
+            _cache.move_to_end(key)
+            return dataset
+    df, report = ingest(source, fmt, columns=columns, progress=progress)
+    dataset = {"key": key, "name": os.path.basename(str(name)), "df": df, "report": report}
+    with _cache_lock:
+        _cache[key] = dataset
+        while len(_cache) > MAX_CACHED_DATASETS:
+            _cache.popitem(last=False)
+    return dataset
+
+def default_roles(df):
+    """Best-guess {target, numeric, categorical}: the sample layout if present, else by dtype"""
+    if all(column in df.columns for column in [SAMPLE_ROLES["target"]] + SAMPLE_ROLES["numeric"] + SAMPLE_ROLES["categorical"]):
+        return {role: (list(value) if isinstance(value, list) else value) for role, value in SAMPLE_ROLES.items()}
+    numeric = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column].dtype)]
+    categorical = [column for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)]
+    return {
+        "target": numeric[-1] if numeric else None,
+        "numeric": numeric[:-1],
+        "categorical": categorical,
+    }
+
+def validate_roles(df, roles):
+    """Raise ValueError unless the roles name a numeric target and at least one numeric and one categorical feature"""
+    target = roles.get("target")
+    if target not in df.columns or not pd.api.types.is_numeric_dtype(df[target].dtype):
+        raise ValueError("Choose a numeric target column")
+    if not roles.get("numeric") or not roles.get("categorical"):
+        raise ValueError("Choose at least one numeric and one categorical feature")
+    overlap = {target} & (set(roles["numeric"]) | set(roles["categorical"]))
+    if overlap or set(roles["numeric"]) & set(roles["categorical"]):
+        raise ValueError("A column can only have one role")
+    for column in roles["numeric"]:
+        if not pd.api.types.is_numeric_dtype(df[column].dtype):
+            raise ValueError(f"'{column}' is not numeric")
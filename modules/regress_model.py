@@ -0,0 +1,235 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import LabelEncoder
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import mean_absolute_error, r2_score
+from modules import app_paths, job_queue, regress_data
+
+MEMORY_CACHE_SIZE = 8
+PREDICTION_CACHE_SIZE = 4096
+SCORE_CHUNK_ROWS = 100_000
+MAX_SCORED_FILES = 5
+DEFAULT_PARAMS = {"n_estimators": 100, "random_state": 42, "test_size": 0.2, "max_train_rows": 50_000}
+
+def dataset_hash(df):
+    """Content hash of a DataFrame (values, column names and order)"""
+    digest = hashlib.sha1(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+class RegressionPipeline:
+    """Fitted encoders + random forest + held-out metrics for one dataset.
+
+    Categorical features are label-encoded, numeric ones are passed through;
+    columns are ordered numeric first. Each encoder is also kept as a plain
+    label -> code dict so a single prediction is a dict lookup and an
+    average over the fitted trees on a NumPy row, with no pandas or
+    refitting involved.
+    Repeated inputs are answered from a small memo.
+    """
+
+    def __init__(self, target, numeric, categorical, params):
+        self.target = target
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.params = dict(params)
+        self.encoders = {}
+        self.codes = {}
+        self.model = None
+        self.metrics = {}
+        self.importances = {}
+        self.fit_seconds = None
+        self._memo = OrderedDict()
+
+    @property
+    def features(self):
+        return self.numeric + self.categorical
+
+    def fit(self, df):
+        started = time.perf_counter()
+        df = df.dropna(subset=self.features + [self.target])
+        # Large datasets are fitted on a fixed random sample to bound fit time and memory
+        if len(df) > self.params["max_train_rows"]:
+            df = df.sample(self.params["max_train_rows"], random_state=self.params["random_state"])
+        columns = [df[column].to_numpy(dtype=np.float64) for column in self.numeric]
+        for column in self.categorical:
+            encoder = LabelEncoder()
+            columns.append(encoder.fit_transform(df[column]).astype(np.float64))
+            self.encoders[column] = encoder
+            self.codes[column] = {label: code for code, label in enumerate(encoder.classes_)}
+        X = np.column_stack(columns)
+        y = df[self.target].to_numpy(dtype=np.float64)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=self.params["test_size"], random_state=self.params["random_state"])
+        self.model = RandomForestRegressor(n_estimators=self.params["n_estimators"],
+                                           random_state=self.params["random_state"], n_jobs=-1)
+        self.model.fit(X_train, y_train)
+        y_pred = self.model.predict(X_test)
+        self.metrics = {
+            "mae": float(mean_absolute_error(y_test, y_pred)),
+            "r2": float(r2_score(y_test, y_pred)),
+            "accuracy": float((1 - np.abs(y_test - y_pred) / y_test).mean() * 100),
+        }
+        self.importances = dict(zip(self.features, self.model.feature_importances_.tolist()))
+        self.fit_seconds = round(time.perf_counter() - started, 3)
+        return self
+
+    def encode(self, df):
+        """Vectorized encoding of a frame: (float32 feature matrix, mask of the rows that can be scored).
+
+        Labels not seen in training and missing or non-numeric values
+        leave their row unscorable instead of failing the batch.
+        """
+        columns, valid = [], np.ones(len(df), dtype=bool)
+        for column in self.numeric:
+            values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            valid &= ~np.isnan(values)
+            columns.append(values)
+        for column in self.categorical:
+            codes = pd.Categorical(df[column], categories=self.encoders[column].classes_).codes
+            valid &= codes >= 0
+            columns.append(codes)
+        return np.column_stack(columns).astype(np.float32), valid
+
+    def predict_frame(self, df):
+        """Predictions for every row of a frame; NaN where the row cannot be scored"""
+        X, valid = self.encode(df)
+        predictions = np.full(len(df), np.nan)
+        if valid.any():
+            predictions[valid] = self.model.predict(X[valid])
+        return predictions
+
+    def predict_one(self, **values):
+        """Predict one row given feature values by column name; raises KeyError for an unseen label"""
+        key = tuple(values[column] for column in self.features)
+        cached = self._memo.get(key)
+        if cached is not None:
+            self._memo.move_to_end(key)
+            return cached
+        row = [float(values[column]) for column in self.numeric]
+        row += [self.codes[column][values[column]] for column in self.categorical]
+        # Averaging the fitted trees directly skips the forest's per-call parallel dispatch
+        # (~10 ms for one row); trees split on float32, as in RandomForestRegressor.predict
+        X = np.array([row], dtype=np.float32)
+        prediction = float(np.mean([tree.tree_.predict(X)[0, 0] for tree in self.model.estimators_]))
+        self._memo[key] = prediction
+        if len(self._memo) > PREDICTION_CACHE_SIZE:
+            self._memo.popitem(last=False)
+        return prediction
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_memo"] = OrderedDict()
+        return state
+
+def _prune_scored(directory, keep):
+    files = sorted((entry.stat().st_mtime, entry.path) for entry in os.scandir(directory) if entry.is_file())
+    for _, path in files[:-keep] if keep else files:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def score_file(job, pipeline, source, name, chunk_rows=SCORE_CHUNK_ROWS):
+    """Background job body: score a CSV/Parquet file chunk by chunk into a gzipped CSV.
+
+    Only one chunk of input and output is in memory at a time, so file size
+    is bounded by disk rather than RAM. Each output row is the input row
+    plus the prediction, left blank where a label is unseen or a value is
+    missing. Returns {path, rows, scored, unscored, seconds, rows_per_s}.
+    """
+    fmt = regress_data.detect_format(name)
+    missing = [column for column in pipeline.features if column not in regress_data.read_columns(source, fmt)]
+    if missing:
+        raise ValueError(f"Missing feature column(s): {', '.join(missing)}")
+    output_column = f"Predicted {pipeline.target}"
+    directory = os.path.dirname(app_paths.data_path("scored", "scored.csv.gz"))
+    _prune_scored(directory, keep=MAX_SCORED_FILES - 1)
+    path = os.path.join(directory, f"{job.id}.csv.gz")
+
+    own_handle = isinstance(source, (str, os.PathLike))
+    handle = open(source, "rb") if own_handle else source
+    size = os.fstat(handle.fileno()).st_size if own_handle else len(source.getbuffer())
+    total_rows = None
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        total_rows = pq.ParquetFile(handle).metadata.num_rows
+    started = time.perf_counter()
+    rows = scored = 0
+    try:
+        with gzip.open(path, "wt", compresslevel=3, newline="") as out:
+            for chunk in regress_data.read_chunks(handle, fmt, chunk_rows=chunk_rows):
+                predictions = pipeline.predict_frame(chunk)
+                chunk[output_column] = predictions
+                chunk.to_csv(out, header=rows == 0, index=False)
+                rows += len(chunk)
+                scored += int(np.count_nonzero(~np.isnan(predictions)))
+                rate = rows / max(time.perf_counter() - started, 1e-9)
+                done = rows / total_rows if total_rows else handle.tell() / max(size, 1)
+                job.progress(done, f"{rows:,} rows scored · {rate:,.0f} rows/s")
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    finally:
+        if own_handle:
+            handle.close()
+    seconds = time.perf_counter() - started
+    return {"path": path, "rows": rows, "scored": scored, "unscored": rows - scored,
+            "seconds": round(seconds, 2), "rows_per_s": round(rows / max(seconds, 1e-9))}
+
+def submit_scoring(pipeline, source, name):
+    """Queue batch scoring of a file and return the job id"""
+    return job_queue.get_queue().submit(f"📦 Score {os.path.basename(str(name))}", score_file, pipeline, source, name,
+                                        module="ml_regress")
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _model_path(key):
+    return app_paths.data_path("models", f"regress-{key}.joblib")
+
+def get_pipeline(df, target, numeric, categorical, dataset_key=None, **params):
+    """Fitted pipeline for this dataset and hyperparameters.
+
+    Looked up in memory, then on disk (joblib), and only fitted when
+    neither has it; the fit is persisted so a restarted dashboard starts warm.
+    Pass the dataset's content key when known to skip hashing the frame.
+    """
+    params = {**DEFAULT_PARAMS, **params}
+    spec = json.dumps({"target": target, "numeric": list(numeric), "categorical": list(categorical),
+                       "params": params}, sort_keys=True)
+    key = hashlib.sha1(((dataset_key or dataset_hash(df)) + spec).encode()).hexdigest()[:20]
+    with _cache_lock:
+        pipeline = _cache.get(key)
+        if pipeline is not None:
+            _cache.move_to_end(key)
+            return pipeline
+        path = _model_path(key)
+        try:
+            pipeline = joblib.load(path)
+        except Exception:
+            pipeline = None
+        if not isinstance(pipeline, RegressionPipeline):
+            pipeline = RegressionPipeline(target, numeric, categorical, params).fit(df)
+            tmp = path + ".tmp"
+            try:
+                joblib.dump(pipeline, tmp, compress=3)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+        _cache[key] = pipeline
+        if len(_cache) > MEMORY_CACHE_SIZE:
+            _cache.popitem(last=False)
+        return pipeline
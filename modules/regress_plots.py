@@ -0,0 +1,147 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Above this many rows figures are built from server-side aggregates instead of raw points
+ROW_THRESHOLD = 5_000
+DENSITY_BINS = 100
+TREND_BINS = 40
+MAX_TREND_GROUPS = 10
+# Box and violin plots draw at most this many groups (the most frequent ones)
+MAX_PLOT_GROUPS = 25
+VIOLIN_POINTS = 80
+VIOLIN_WIDTH = 0.4
+MAX_CACHED_FIGURES = 32
+COLORS = px.colors.qualitative.Plotly
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cached(key, build):
+    """Figure for key (dataset version + chart parameters), built once"""
+    with _cache_lock:
+        fig = _cache.get(key)
+        if fig is not None:
+            _cache.move_to_end(key)
+            return fig
+    fig = build()
+    with _cache_lock:
+        _cache[key] = fig
+        while len(_cache) > MAX_CACHED_FIGURES:
+            _cache.popitem(last=False)
+    return fig
+
+def _centers(edges):
+    return np.round((edges[:-1] + edges[1:]) / 2, 2)
+
+def _groups(series):
+    """Group labels in display order (categoricals keep their category order)"""
+    values = series.dropna().unique()
+    return list(values.sort_values()) if isinstance(series.dtype, pd.CategoricalDtype) else sorted(values)
+
+def _top_groups(df, x, title):
+    """Rows of the MAX_PLOT_GROUPS most frequent x groups, and the title noting the cap if it applied"""
+    counts = df[x].value_counts()
+    if len(counts) <= MAX_PLOT_GROUPS:
+        return df, title
+    top = counts.head(MAX_PLOT_GROUPS).index
+    return df[df[x].isin(top)], f"{title} (top {MAX_PLOT_GROUPS} of {len(counts):,} {x} values)"
+
+def scatter(df, dataset_key, x, y, color, hover, title, height=400):
+    """Scatter of y against x. Large data: a log-density heatmap plus per-group binned means as WebGL lines."""
+    def build():
+        if len(df) <= ROW_THRESHOLD:
+            fig = px.scatter(data_frame=df, x=x, y=y, color=color, size=y, hover_data=hover, title=title)
+            fig.update_layout(height=height)
+            return fig
+        data = df[[x, y, color]].dropna()
+        xv, yv = data[x].to_numpy(dtype=np.float64), data[y].to_numpy(dtype=np.float64)
+        counts, xedges, yedges = np.histogram2d(xv, yv, bins=DENSITY_BINS)
+        counts = counts.T
+        # Empty cells stay transparent; the log scale keeps sparse regions visible next to dense ones
+        z = np.full(counts.shape, np.nan)
+        np.log10(counts, out=z, where=counts > 0)
+        fig = go.Figure(go.Heatmap(
+            x=_centers(xedges), y=_centers(yedges), z=np.round(z, 2), customdata=counts.astype(np.int64),
+            colorscale="Viridis", colorbar=dict(title="log₁₀ rows"), name="density",
+            hovertemplate=f"{x}: %{{x}}<br>{y}: %{{y}}<br>rows: %{{customdata}}<extra></extra>"))
+
+        edges = np.linspace(xv.min(), xv.max(), TREND_BINS + 1)
+        bins = np.clip(np.digitize(xv, edges) - 1, 0, TREND_BINS - 1)
+        means = data[y].groupby([data[color], bins], observed=True).mean()
+        top = data[color].value_counts().head(MAX_TREND_GROUPS).index
+        centers = _centers(edges)
+        for i, group in enumerate(group for group in _groups(data[color]) if group in top):
+            trend = means.loc[group]
+            fig.add_trace(go.Scattergl(x=centers[trend.index], y=np.round(trend.to_numpy(), 2), mode="lines+markers",
+                                       name=str(group), line=dict(color=COLORS[i % len(COLORS)])))
+        fig.update_layout(height=height, title=f"{title} ({len(data):,} rows, binned)", xaxis_title=x, yaxis_title=y,
+                          legend_title_text=f"Mean {y} by {color}")
+        return fig
+    return _cached((dataset_key, "scatter", x, y, color, tuple(hover), title, height), build)
+
+def box(df, dataset_key, x, y, title, height=400):
+    """Box plot of y per x group. Large data: boxes from precomputed quartiles, whiskers and means."""
+    def build():
+        data, shown_title = _top_groups(df[[x, y]].dropna(), x, title)
+        if len(df) <= ROW_THRESHOLD:
+            fig = px.box(data_frame=data, x=x, y=y, color=x, title=shown_title)
+            fig.update_layout(height=height, xaxis_tickangle=-45)
+            return fig
+        grouped = data.groupby(x, observed=True)[y]
+        quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+        q1, q3 = grouped.transform("quantile", 0.25), grouped.transform("quantile", 0.75)
+        # Whiskers end at the most extreme values within 1.5 IQR, as in Plotly's own box plots
+        inside = data[y].between(q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+        whiskers = data[inside].groupby(x, observed=True)[y].agg(["min", "max"])
+        outliers = (~inside).groupby(data[x], observed=True).sum()
+        means = grouped.mean()
+        fig = go.Figure()
+        for i, group in enumerate(_groups(data[x])):
+            fig.add_trace(go.Box(
+                x=[str(group)], name=str(group), q1=[quartiles.loc[group, 0.25]], median=[quartiles.loc[group, 0.5]],
+                q3=[quartiles.loc[group, 0.75]], lowerfence=[whiskers.loc[group, "min"]],
+                upperfence=[whiskers.loc[group, "max"]], mean=[means.loc[group]],
+                marker_color=COLORS[i % len(COLORS)],
+                hovertext=f"{int(outliers.loc[group]):,} outliers not drawn"))
+        fig.update_layout(height=height, xaxis_tickangle=-45, title=f"{shown_title} ({len(data):,} rows, precomputed)",
+                          xaxis_title=x, yaxis_title=y)
+        return fig
+    return _cached((dataset_key, "box", x, y, title, height), build)
+
+def violin(df, dataset_key, x, y, title, height=400):
+    """Violin plot of y per x group. Large data: shapes from per-group smoothed histograms over all rows."""
+    def build():
+        data, shown_title = _top_groups(df[[x, y]].dropna(), x, title)
+        if len(df) <= ROW_THRESHOLD:
+            fig = px.violin(data_frame=data, x=x, y=y, color=x, title=shown_title)
+            fig.update_layout(height=height)
+            return fig
+        grouped = data.groupby(x, observed=True)[y]
+        quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+        groups = _groups(data[x])
+        kernel = np.array([1, 4, 6, 4, 1]) / 16
+        fig = go.Figure()
+        for i, group in enumerate(groups):
+            values = grouped.get_group(group).to_numpy(dtype=np.float64)
+            density, edges = np.histogram(values, bins=VIOLIN_POINTS)
+            density = np.convolve(density, kernel, mode="same")
+            width = density / density.max() * VIOLIN_WIDTH if density.max() else density
+            grid = _centers(edges)
+            color = COLORS[i % len(COLORS)]
+            fig.add_trace(go.Scatter(
+                x=np.round(np.concatenate([i + width, (i - width)[::-1]]), 3), y=np.concatenate([grid, grid[::-1]]),
+                fill="toself", mode="lines", line=dict(color=color), name=str(group), hoveron="fills",
+                text=f"{group}: median {quartiles.loc[group, 0.5]:,.0f}", hoverinfo="text"))
+            # Interquartile bar and median tick, like the inner box of a violin
+            fig.add_trace(go.Scatter(x=[i, i], y=[quartiles.loc[group, 0.25], quartiles.loc[group, 0.75]], mode="lines",
+                                     line=dict(color="black", width=4), showlegend=False, hoverinfo="skip"))
+            fig.add_trace(go.Scatter(x=[i], y=[quartiles.loc[group, 0.5]], mode="markers",
+                                     marker=dict(color="white", size=6), showlegend=False, hoverinfo="skip"))
+        fig.update_layout(height=height, title=f"{shown_title} ({len(data):,} rows, precomputed)", xaxis_title=x, yaxis_title=y,
+                          xaxis=dict(tickvals=list(range(len(groups))), ticktext=[str(group) for group in groups]))
+        return fig
+    return _cached((dataset_key, "violin", x, y, title, height), build)
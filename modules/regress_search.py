@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import threading
+from itertools import product
+import numpy as np
+import psutil
+from joblib import Parallel, delayed
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge, ElasticNet
+from sklearn.model_selection import KFold
+from sklearn.metrics import mean_absolute_error, r2_score
+from modules import app_paths, job_queue
+
+MAX_SEARCH_ROWS = 50_000
+LATENCY_REPEATS = 20
+RSS_POLL_SECONDS = 0.005
+# Bumped when the measured columns change, so stored leaderboards are not reused
+RESULTS_VERSION = 2
+# Hyperparameter grid per model family
+SEARCH_SPACE = {
+    "RandomForest": {"n_estimators": [50, 100], "max_depth": [None, 12]},
+    "HistGradientBoosting": {"learning_rate": [0.05, 0.1], "max_leaf_nodes": [15, 31]},
+    "Ridge": {"alpha": [0.1, 1.0, 10.0]},
+    "ElasticNet": {"alpha": [0.1, 1.0], "l1_ratio": [0.2, 0.8]},
+}
+
+def _estimator(family, params, numeric, categorical, random_state):
+    """Preprocessing + model: linear models get one-hot and scaling, trees get ordinal codes"""
+    if family in ("Ridge", "ElasticNet"):
+        preprocess = ColumnTransformer([
+            ("numeric", StandardScaler(), numeric),
+            ("categorical", OneHotEncoder(handle_unknown="ignore"), categorical),
+        ])
+        model = Ridge(**params) if family == "Ridge" else ElasticNet(max_iter=5000, **params)
+    else:
+        preprocess = ColumnTransformer([
+            ("numeric", "passthrough", numeric),
+            ("categorical", OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1), categorical),
+        ])
+        if family == "RandomForest":
+            model = RandomForestRegressor(random_state=random_state, **params)
+        else:
+            model = HistGradientBoostingRegressor(random_state=random_state, **params)
+    return make_pipeline(preprocess, model)
+
+def candidates(families=None):
+    """[(family, params)] for every grid point of the chosen families"""
+    result = []
+    for family, grid in SEARCH_SPACE.items():
+        if families and family not in families:
+            continue
+        for values in product(*grid.values()):
+            result.append((family, dict(zip(grid.keys(), values))))
+    return result
+
+class _PeakRSS:
+    """Highest resident set size of this process above its starting RSS, polled from a thread.
+
+    RSS covers native allocations (e.g. sklearn's tree arrays) that
+    tracemalloc cannot see. Memory freed by an earlier task and reused
+    without growing the process is not counted, so this is a lower bound.
+    """
+
+    def __enter__(self):
+        self._process = psutil.Process()
+        self.start = self.peak = self._process.memory_info().rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+        return self
+
+    def _poll(self):
+        while not self._stop.wait(RSS_POLL_SECONDS):
+            self.peak = max(self.peak, self._process.memory_info().rss)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._process.memory_info().rss)
+
+    @property
+    def delta(self):
+        return self.peak - self.start
+
+def _evaluate(index, fold, estimator, X, y, train, test):
+    """Fit and score one candidate on one fold (runs in a worker process)"""
+    with _PeakRSS() as memory:
+        started = time.perf_counter()
+        estimator.fit(X.iloc[train], y[train])
+        fit_s = time.perf_counter() - started
+        started = time.perf_counter()
+        y_pred = estimator.predict(X.iloc[test])
+        batch_s = time.perf_counter() - started
+    row = X.iloc[test[:1]]
+    timings = []
+    for _ in range(LATENCY_REPEATS):
+        started = time.perf_counter()
+        estimator.predict(row)
+        timings.append(time.perf_counter() - started)
+    return {
+        "index": index,
+        "fold": fold,
+        "fit_s": fit_s,
+        "row_us": batch_s / len(test) * 1e6,
+        "latency_ms": float(np.median(timings)) * 1000,
+        "peak_mb": memory.delta / 1024 / 1024,
+        "model_mb": len(pickle.dumps(estimator, protocol=pickle.HIGHEST_PROTOCOL)) / 1024 / 1024,
+        "mae": float(mean_absolute_error(y[test], y_pred)),
+        "r2": float(r2_score(y[test], y_pred)),
+    }
+
+def _pareto(rows):
+    """Flag candidates no other candidate beats on both MAE and single-row latency"""
+    for row in rows:
+        row["pareto"] = not any(
+            other["mae"] <= row["mae"] and other["latency_ms"] <= row["latency_ms"]
+            and (other["mae"] < row["mae"] or other["latency_ms"] < row["latency_ms"])
+            for other in rows)
+    return rows
+
+def _results_path(key):
+    return app_paths.data_path("models", f"search-{key}.json")
+
+def search_key(dataset_key, target, numeric, categorical, families, folds):
+    spec = json.dumps({"dataset": dataset_key, "target": target, "numeric": list(numeric),
+                       "categorical": list(categorical), "families": sorted(families or SEARCH_SPACE),
+                       "folds": folds, "space": SEARCH_SPACE, "max_rows": MAX_SEARCH_ROWS,
+                       "version": RESULTS_VERSION}, sort_keys=True)
+    return hashlib.sha1(spec.encode()).hexdigest()[:20]
+
+def cached_results(key):
+    """Stored leaderboard for a search key, or None"""
+    try:
+        with open(_results_path(key)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def run_search_job(job, df, dataset_key, target, numeric, categorical, families=None, folds=3, n_jobs=-1,
+                   random_state=42):
+    """Background job body: cross-validated grid search over the model families; returns the leaderboard.
+
+    Every (candidate, fold) pair is an independent task on a process pool of
+    n_jobs workers. Each reports fit time, batch and single-row predict
+    latency, the worker's peak RSS growth, fitted model size, MAE and R2;
+    candidates are ranked by mean MAE and those on the MAE/latency Pareto
+    front are flagged. The leaderboard is stored by dataset hash and
+    search spec, so the same search is answered from disk.
+    """
+    key = search_key(dataset_key, target, numeric, categorical, families, folds)
+    cached = cached_results(key)
+    if cached is not None:
+        job.log("Loaded stored results for this dataset and search")
+        return cached
+
+    data = df.dropna(subset=list(numeric) + list(categorical) + [target])
+    if len(data) > MAX_SEARCH_ROWS:
+        data = data.sample(MAX_SEARCH_ROWS, random_state=random_state)
+    X = data[list(numeric) + list(categorical)]
+    y = data[target].to_numpy(dtype=np.float64)
+    grid = candidates(families)
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=random_state).split(X))
+    tasks = [delayed(_evaluate)(index, fold, _estimator(family, params, list(numeric), list(categorical), random_state),
+                                X, y, train, test)
+             for index, (family, params) in enumerate(grid)
+             for fold, (train, test) in enumerate(splits)]
+    job.log(f"{len(grid)} candidates x {folds} folds on {len(data):,} rows, n_jobs={n_jobs}")
+
+    started = time.perf_counter()
+    scores = []
+    for score in Parallel(n_jobs=n_jobs, return_as="generator_unordered")(tasks):
+        scores.append(score)
+        family, params = grid[score["index"]]
+        job.progress(len(scores) / len(tasks), f"{family} {params} fold {score['fold'] + 1}")
+
+    rows = []
+    for index, (family, params) in enumerate(grid):
+        folds_scores = [s for s in scores if s["index"] == index]
+        rows.append({
+            "model": family,
+            "params": json.dumps(params),
+            "mae": float(np.mean([s["mae"] for s in folds_scores])),
+            "mae_std": float(np.std([s["mae"] for s in folds_scores])),
+            "r2": float(np.mean([s["r2"] for s in folds_scores])),
+            "fit_s": float(np.mean([s["fit_s"] for s in folds_scores])),
+            "latency_ms": float(np.mean([s["latency_ms"] for s in folds_scores])),
+            "row_us": float(np.mean([s["row_us"] for s in folds_scores])),
+            "peak_mb": float(max(s["peak_mb"] for s in folds_scores)),
+            "model_mb": float(np.mean([s["model_mb"] for s in folds_scores])),
+        })
+    rows = _pareto(sorted(rows, key=lambda row: row["mae"]))
+    result = {"key": key, "rows": rows, "samples": len(data), "folds": folds, "n_jobs": n_jobs,
+              "wall_s": round(time.perf_counter() - started, 2), "finished": time.time()}
+    path = _results_path(key)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp, path)
+    return result
+
+def submit_search(df, dataset_key, target, numeric, categorical, families=None, folds=3, n_jobs=-1):
+    """Queue a model search and return the job id"""
+    return job_queue.get_queue().submit(
+        "🏁 Model search", run_search_job, df, dataset_key, target, list(numeric), list(categorical),
+        families=families, folds=folds, n_jobs=n_jobs, module="ml_regress")
@@ -9,7 +9,7 @@ import re
 import json
 import asyncio
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Callable
 from dataclasses import dataclass
 from enum import Enum
 import mimetypes
@@ -18,6 +18,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from modules import job_queue, jobs
 
 # LangChain imports
 try:
@@ -112,14 +113,10 @@ class FilePathExtractor:
             path = Path(path_str).resolve()
             
             # Validate path exists
-            if path.exists():
-                return path
-            else:
-                st.warning(f"Path does not exist: {path}")
-                return None
+            # Unresolvable paths are reported by analyze_prompt via extracted_paths
+            return path if path.exists() else None
                 
-        except Exception as e:
-            st.error(f"Error resolving path '{path_str}': {e}")
+        except Exception:
             return None
 
 class FileScanner:
@@ -185,13 +182,12 @@ class FileScanner:
                 error=f"Failed to scan file: {str(e)}"
             )
     
-    def scan_directory(self, dir_path: Path, max_files: int = 1000) -> List[FileInfo]:
-        """Recursively scan directory for supported files"""
+    def scan_directory(self, dir_path: Path, max_files: int = 1000,
+                       report: Optional[Callable[[float, str], None]] = None) -> List[FileInfo]:
+        """Recursively scan directory for supported files; report(fraction, message) tracks progress"""
         files = []
         processed = 0
-        
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+        report = report or (lambda fraction, message: None)
         
         try:
             all_items = list(dir_path.rglob('*'))
@@ -199,7 +195,7 @@ class FileScanner:
             
             for i, item in enumerate(all_items):
                 if processed >= max_files:
-                    st.warning(f"Reached maximum file limit ({max_files})")
+                    report(1.0, f"Reached maximum file limit ({max_files})")
                     break
                 
                 if item.is_file():
@@ -216,14 +212,11 @@ class FileScanner:
                     
                     # Update progress
                     progress = min(processed / min(max_files, total_items), 1.0)
-                    progress_bar.progress(progress)
-                    status_text.text(f"Scanning: {item.name} ({processed}/{min(max_files, total_items)})")
+                    report(progress, f"Scanning: {item.name} ({processed}/{min(max_files, total_items)})")
                     
         except Exception as e:
-            st.error(f"Error scanning directory {dir_path}: {e}")
+            report(1.0, f"Error scanning directory {dir_path}: {e}")
         
-        progress_bar.empty()
-        status_text.empty()
         return files
 
 class AnalysisAgent:
@@ -455,8 +448,14 @@ class MultiAgentCodeAnalyzer:
         else:
             return AnalysisType.ERROR, []
     
-    async def analyze_prompt(self, prompt: str) -> Dict[str, Any]:
-        """Main analysis method"""
+    async def analyze_prompt(self, prompt: str,
+                             report: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """Main analysis method; report(fraction, message) receives progress updates.
+
+        Runs in a background job, so progress goes through the callback
+        rather than Streamlit elements.
+        """
+        report = report or (lambda fraction, message: None)
         # Determine analysis type and extract paths
         analysis_type, paths = self.determine_analysis_type(prompt)
         
@@ -470,20 +469,22 @@ class MultiAgentCodeAnalyzer:
         all_files = []
         for path in paths:
             if analysis_type == AnalysisType.SINGLE_FILE:
-                st.info(f"📄 Analyzing single file: {path}")
+                report(0.0, f"📄 Analyzing single file: {path}")
                 file_info = self.file_scanner.scan_file(path)
                 all_files.append(file_info)
             else:  # DIRECTORY
-                st.info(f"📁 Scanning directory: {path}")
-                dir_files = self.file_scanner.scan_directory(path)
+                report(0.0, f"📁 Scanning directory: {path}")
+                # Scanning takes the first 30% of the progress bar, the agents the rest
+                dir_files = self.file_scanner.scan_directory(
+                    path, report=lambda fraction, message: report(0.3 * fraction, message))
                 all_files.extend(dir_files)
         
         # Filter supported files
         supported_files = [f for f in all_files if f.is_supported and f.content]
-        st.success(f"✅ Found {len(supported_files)} supported files out of {len(all_files)} total")
+        report(0.3, f"✅ Found {len(supported_files)} supported files out of {len(all_files)} total")
         
         # Run multi-agent analysis
-        st.info("🤖 Running multi-agent analysis...")
+        report(0.3, "🤖 Running multi-agent analysis...")
         analysis_results = []
         
         context = {
@@ -493,23 +494,16 @@ class MultiAgentCodeAnalyzer:
             "paths": [str(p) for p in paths]
         }
         
-        # Create progress bar for agents
-        agent_progress = st.progress(0)
-        agent_status = st.empty()
-        
         # Run agents sequentially with progress updates
         for i, agent in enumerate(self.agents):
-            agent_status.text(f"Running {agent.name}...")
+            report(0.3 + 0.7 * i / len(self.agents), f"Running {agent.name}...")
             try:
                 result = await agent.analyze(all_files, context)
                 analysis_results.append(result)
             except Exception as e:
                 analysis_results.append({"error": str(e)})
             
-            agent_progress.progress((i + 1) / len(self.agents))
-        
-        agent_progress.empty()
-        agent_status.empty()
+            report(0.3 + 0.7 * (i + 1) / len(self.agents), f"Finished {agent.name}")
         
         # Compile final report
         return {
@@ -569,6 +563,10 @@ def create_file_size_chart(all_files):
     fig.update_xaxes(tickangle=45)
     return fig
 
+def run_analysis_job(job, analyzer: "MultiAgentCodeAnalyzer", prompt: str) -> Dict[str, Any]:
+    """Background job running the async multi-agent analysis in a worker thread"""
+    return asyncio.run(analyzer.analyze_prompt(prompt, report=job.progress))
+
 def run():
     """Main function to run the testing agent module"""
     main()
@@ -653,17 +651,20 @@ def main():
     # Analysis button
     if st.button("🚀 Start Analysis", type="primary", disabled=not prompt.strip()):
         if prompt.strip():
-            try:
-                # Run analysis
-                with st.spinner("Running analysis..."):
-                    results = asyncio.run(st.session_state.analyzer.analyze_prompt(prompt))
-                
-                # Store results in session state
-                st.session_state.results = results
-                
-            except Exception as e:
-                st.error(f"❌ Analysis failed: {e}")
-                return
+            # Run analysis in the background job pool; the page polls for progress
+            st.session_state.analysis_job = job_queue.get_queue().submit(
+                f"Code analysis: {prompt.strip()[:60]}", run_analysis_job,
+                st.session_state.analyzer, prompt, module="testingagent")
+    
+    if st.session_state.get("analysis_job"):
+        analysis_job = jobs.show_job_progress(st.session_state.analysis_job)
+        if analysis_job is None or analysis_job["status"] in ("failed", "cancelled", "interrupted"):
+            # The failure is shown above for this run only, so a later rerun is not stuck on it
+            st.session_state.analysis_job = None
+        elif analysis_job["status"] == "succeeded":
+            # Store results in session state
+            st.session_state.results = job_queue.get_queue().result(analysis_job["id"])
+            st.session_state.analysis_job = None
     
     # Display results
     if 'results' in st.session_state: